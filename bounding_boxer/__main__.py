@@ -0,0 +1,11 @@
+# __main__.py
+# Einstieg für "python -m bounding_boxer"; die Module liegen flach in diesem Ordner
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
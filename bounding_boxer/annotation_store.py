@@ -0,0 +1,359 @@
+# annotation_store.py
+from collections.abc import Iterable
+
+import numpy as np
+
+# (id, label, x, y, w, h)
+Box = tuple[int, str, int, int, int, int]
+
+
+class AnnotationStore:
+    """
+    Spaltenorientierter Speicher aller Boxen eines Projekts.
+
+    Basis sind int32-Arrays id/x/y/w/h und ein uint8-Array mit dem
+    Label-Code (Index in labels), nach Frame sortiert. Welche Zeilen zu
+    welchem Frame gehören, steht im Index: sortierte Frames und Offsets,
+    Frame i belegt [offsets[i], offsets[i+1]). Die Spalten können auch
+    Views in eine memory-mapped Projektdatei sein. Bearbeitete Frames
+    liegen als Tupel-Listen in einem Overlay und werden gesammelt per
+    compact() in die Arrays übernommen. Zuletzt gelesene Frames werden
+    ebenfalls als Liste gehalten, damit wiederholte Zugriffe nichts kosten.
+    """
+    def __init__(self, labels: Iterable[str] = (), overlay_frames: int = 64):
+        # Label-Code -> Label (Codes der bekannten Klassen sind stabil)
+        self.labels: list[str] = []
+        self._codes: dict[str, int] = {}
+        for label in labels:
+            self.intern(label)
+        self.overlay_frames = overlay_frames
+        self._set_columns(
+            np.empty(0, np.int32), np.zeros(1, np.int64),
+            *(np.empty(0, np.int32) for _ in range(5)), np.empty(0, np.uint8)
+        )
+        # Frames, die ohne Boxen gespeichert sind (z.B. alle Boxen gelöscht)
+        self._empty: set[int] = set()
+        # Frame -> Boxen als Liste (bearbeitet oder zuletzt gelesen)
+        self._overlay: dict[int, list[Box]] = {}
+        # Frames im Overlay, deren Stand noch nicht in den Arrays steht
+        self._dirty: set[int] = set()
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Iterable[tuple[int, Iterable[Box]]],
+        labels: Iterable[str] = (),
+        overlay_frames: int = 64
+    ) -> 'AnnotationStore':
+        """Baut den Speicher aus (frame, boxes)-Paaren auf, ohne Umweg über das Overlay."""
+        store = cls(labels, overlay_frames)
+        columns: list[list[int]] = [[] for _ in range(7)]
+        for frame, boxes in frames:
+            count = 0
+            for _id, label, x, y, w, h in boxes:
+                for column, value in zip(columns, (frame, _id, x, y, w, h, store.intern(label))):
+                    column.append(value)
+                count += 1
+            if not count:
+                store._empty.add(frame)
+        arrays = [np.array(c, np.int32) for c in columns[:6]] + [np.array(columns[6], np.uint8)]
+        order = np.argsort(arrays[0], kind="stable")
+        frame, *rest = (a[order] for a in arrays)
+        frames, counts = np.unique(frame, return_counts=True)
+        store._set_columns(frames, np.concatenate([[0], np.cumsum(counts)]), *rest)
+        return store
+
+    @classmethod
+    def from_columns(
+        cls,
+        frames: np.ndarray,
+        counts: np.ndarray,
+        columns: dict[str, np.ndarray],
+        labels: Iterable[str],
+        overlay_frames: int = 64
+    ) -> 'AnnotationStore':
+        """
+        Übernimmt fertige Spalten id/x/y/w/h/label (z.B. Views in eine
+        memory-mapped Datei) ohne sie zu lesen. frames ist aufsteigend,
+        Frames mit count 0 gelten als leere Einträge.
+        """
+        store = cls(labels, overlay_frames)
+        filled = counts > 0
+        store._empty = set(frames[~filled].tolist())
+        store._set_columns(
+            frames[filled].astype(np.int32), np.concatenate([[0], np.cumsum(counts[filled])]),
+            *(columns[name] for name in ("id", "x", "y", "w", "h", "label"))
+        )
+        return store
+
+    def intern(self, label: str) -> int:
+        """Gibt den Code eines Labels zurück und legt ihn bei Bedarf an."""
+        code = self._codes.get(label)
+        if code is None:
+            if len(self.labels) > np.iinfo(np.uint8).max:
+                raise ValueError(f"Zu viele Label-Klassen (max. {np.iinfo(np.uint8).max + 1}).")
+            code = len(self.labels)
+            self.labels.append(label)
+            self._codes[label] = code
+        return code
+
+    def __contains__(self, frame: int) -> bool:
+        """True, wenn für den Frame ein (ggf. leerer) Eintrag existiert."""
+        if frame in self._dirty or frame in self._empty:
+            return True
+        return self._slice(frame) is not None
+
+    def __len__(self) -> int:
+        """Anzahl aller Boxen im Projekt."""
+        count = int(self._offsets[-1])
+        for frame in self._dirty:
+            span = self._slice(frame)
+            count += len(self._overlay[frame]) - (span[1] - span[0] if span else 0)
+        return count
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der Spalten-Arrays in Bytes."""
+        return sum(a.nbytes for a in self._columns()) + self._frames.nbytes + self._offsets.nbytes
+
+    # --- Zugriff pro Frame ---
+
+    def get(self, frame: int) -> list[Box]:
+        """Boxen eines Frames als Liste (id, label, x, y, w, h); die Liste nicht verändern."""
+        boxes = self._overlay.get(frame)
+        if boxes is None:
+            boxes = self._materialize(frame)
+            self._overlay[frame] = boxes
+            self._evict()
+        return boxes
+
+    def set(self, frame: int, boxes: Iterable[Box]) -> None:
+        """Ersetzt alle Boxen eines Frames."""
+        boxes = list(boxes)
+        for box in boxes:
+            self.intern(box[1])
+        self._overlay[frame] = boxes
+        self._dirty.add(frame)
+        if len(self._dirty) > self.overlay_frames:
+            self.compact()
+
+    def append(self, frame: int, box: Box) -> int:
+        """Hängt eine Box an und gibt ihre Position im Frame zurück."""
+        boxes = self._editable(frame)
+        self.intern(box[1])
+        boxes.append(box)
+        return len(boxes) - 1
+
+    def replace(self, frame: int, pos: int, box: Box) -> None:
+        """Ersetzt die Box an Position pos."""
+        self.intern(box[1])
+        self._editable(frame)[pos] = box
+
+    def discard(self, frames: Iterable[int], _id: int, label: str) -> None:
+        """
+        Entfernt die Box (id, label) aus allen gegebenen Frames. Bearbeitete
+        Frames werden im Overlay gefiltert, alle übrigen mit einer einzigen
+        Aktualisierung der Spalten-Arrays (ohne compact()).
+        """
+        code = self._codes.get(label)
+        if code is None:
+            return
+        stored = []
+        for frame in frames:
+            if frame in self._dirty:
+                boxes = self._overlay[frame]
+                boxes[:] = [b for b in boxes if b[0] != _id or b[1] != label]
+            else:
+                self._overlay.pop(frame, None)
+                stored.append(frame)
+        # Zeilenbereiche der gespeicherten Frames, dort die Box des Tracks suchen
+        i = np.searchsorted(self._frames, np.array(stored, np.int32))
+        i = i[i < len(self._frames)]
+        i = i[np.isin(self._frames[i], stored)]
+        counts = np.diff(self._offsets)
+        sizes = counts[i]
+        rows = np.repeat(self._offsets[i] - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        hit = (self._id[rows] == _id) & (self._label[rows] == code)
+        if not hit.any():
+            return
+        np.subtract.at(counts, np.repeat(i, sizes)[hit], 1)
+        keep = np.ones(len(self._id), bool)
+        keep[rows[hit]] = False
+        filled = counts > 0
+        self._empty.update(self._frames[~filled].tolist())
+        self._set_columns(
+            self._frames[filled], np.concatenate([[0], np.cumsum(counts[filled])]),
+            *(column[keep] for column in self._columns())
+        )
+
+    def frame_arrays(self, frame: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Boxen eines Frames als Arrays (ids, Label-Codes, Geometrie n x 4 mit
+        x, y, w, h) in derselben Reihenfolge wie get().
+        """
+        if frame in self._dirty:
+            boxes = self._overlay[frame]
+            ids = np.fromiter((b[0] for b in boxes), np.int32, len(boxes))
+            codes = np.fromiter((self._codes[b[1]] for b in boxes), np.uint8, len(boxes))
+            geo = np.array([b[2:] for b in boxes], np.int32).reshape(-1, 4)
+            return ids, codes, geo
+        span = self._slice(frame)
+        start, end = span if span else (0, 0)
+        geo = np.stack([self._x[start:end], self._y[start:end], self._w[start:end], self._h[start:end]], axis=1)
+        return self._id[start:end], self._label[start:end], geo
+
+    # --- Projektweite Abfragen ---
+
+    def compact(self) -> None:
+        """Übernimmt alle bearbeiteten Frames in die Spalten-Arrays."""
+        if not self._dirty:
+            return
+        # Pro bearbeitetem Frame: zu ersetzender Bereich [start, end) und neue Zeilen
+        cuts: list[tuple[int, int, np.ndarray]] = []
+        for frame in sorted(self._dirty):
+            boxes = self._overlay[frame]
+            if boxes:
+                self._empty.discard(frame)
+            else:
+                self._empty.add(frame)
+            span = self._slice(frame)
+            if span is None:
+                at = int(self._offsets[np.searchsorted(self._frames, frame)])
+                span = (at, at)
+            rows = np.array(
+                [(_id, x, y, w, h, self._codes[label]) for _id, label, x, y, w, h in boxes],
+                np.int64
+            ).reshape(-1, 6)
+            cuts.append((*span, rows))
+        # Jede Spalte mit einer einzigen Kopie neu zusammensetzen
+        columns = []
+        for c, old in enumerate(self._columns()):
+            pieces = []
+            prev = 0
+            for start, end, rows in cuts:
+                pieces.append(old[prev:start])
+                pieces.append(rows[:, c].astype(old.dtype))
+                prev = end
+            pieces.append(old[prev:])
+            columns.append(np.concatenate(pieces))
+        # Index: bearbeitete Frames mit ihrer neuen Anzahl ersetzen
+        dirty = np.array(sorted(self._dirty), np.int32)
+        counts = np.diff(self._offsets)
+        keep = ~np.isin(self._frames, dirty)
+        new_counts = np.array([len(self._overlay[f]) for f in dirty.tolist()], np.int64)
+        frames = np.concatenate([self._frames[keep], dirty[new_counts > 0]])
+        counts = np.concatenate([counts[keep], new_counts[new_counts > 0]])
+        order = np.argsort(frames, kind="stable")
+        self._set_columns(frames[order], np.concatenate([[0], np.cumsum(counts[order])]), *columns)
+        self._dirty.clear()
+        self._evict()
+
+    def detach(self) -> None:
+        """Kopiert memory-mapped Spalten in den Arbeitsspeicher (die Datei kann danach ersetzt werden)."""
+        self._set_columns(self._frames, self._offsets, *(np.array(c) for c in self._columns()))
+
+    def snapshot(self) -> 'AnnotationStore':
+        """
+        Unveränderlicher Stand für andere Threads. Die Arrays werden nie an Ort
+        und Stelle geändert, daher genügt es, sie nach compact() zu teilen.
+        """
+        self.compact()
+        copy = AnnotationStore(self.labels, self.overlay_frames)
+        copy._set_columns(self._frames, self._offsets, *self._columns())
+        copy._empty = set(self._empty)
+        return copy
+
+    def index(self) -> tuple[np.ndarray, np.ndarray]:
+        """(Frames, Anzahl Boxen) für alle Frames mit Eintrag, auch leere; passend zu columns()."""
+        self.compact()
+        frames, counts = self._frames, np.diff(self._offsets)
+        if self._empty:
+            frames = np.concatenate([frames, np.array(sorted(self._empty), np.int32)])
+            counts = np.concatenate([counts, np.zeros(len(self._empty), np.int64)])
+            order = np.argsort(frames, kind="stable")
+            frames, counts = frames[order], counts[order]
+        return frames, counts
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Alle Boxen des Projekts als Spalten (nach Frame sortiert)."""
+        self.compact()
+        frame = np.repeat(self._frames, np.diff(self._offsets))
+        return dict(zip(("frame", "id", "x", "y", "w", "h", "label"), (frame, *self._columns())))
+
+    def frames(self) -> list[int]:
+        """Alle Frames mit Eintrag (auch leere), aufsteigend."""
+        return sorted(set(self._frames.tolist()) | self._empty | self._dirty)
+
+    def items(self) -> Iterable[tuple[int, list[Box]]]:
+        """(frame, boxes) für alle Frames mit Eintrag, aufsteigend; füllt das Overlay nicht."""
+        self.compact()
+        for frame in self.frames():
+            boxes = self._overlay.get(frame)
+            yield frame, boxes if boxes is not None else self._materialize(frame)
+
+    def labeled_frames(self) -> list[int]:
+        """Frames mit mindestens einer Box, aufsteigend (ohne Kompaktierung)."""
+        frames = self._frames
+        if self._dirty:
+            frames = frames[~np.isin(frames, np.fromiter(self._dirty, np.int32, len(self._dirty)))]
+            edited = [f for f in self._dirty if self._overlay[f]]
+            frames = np.union1d(frames, np.array(edited, np.int32))
+        return frames.tolist()
+
+    def label_counts(self) -> dict[str, int]:
+        """Anzahl Boxen pro Label im gesamten Projekt."""
+        self.compact()
+        counts = np.bincount(self._label, minlength=len(self.labels))
+        return {label: int(n) for label, n in zip(self.labels, counts) if n}
+
+    def counts_per_frame(self) -> tuple[np.ndarray, np.ndarray]:
+        """(Frames, Anzahl Boxen) für alle Frames mit Boxen."""
+        self.compact()
+        return self._frames, np.diff(self._offsets)
+
+    # --- intern ---
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return self._id, self._x, self._y, self._w, self._h, self._label
+
+    def _set_columns(self, frames, offsets, _id, x, y, w, h, label) -> None:
+        self._frames = frames
+        self._offsets = offsets.astype(np.int64)
+        self._id, self._x, self._y, self._w, self._h, self._label = _id, x, y, w, h, label
+
+    def _slice(self, frame: int) -> tuple[int, int] | None:
+        i = int(np.searchsorted(self._frames, frame))
+        if i >= len(self._frames) or self._frames[i] != frame:
+            return None
+        return int(self._offsets[i]), int(self._offsets[i + 1])
+
+    def _materialize(self, frame: int) -> list[Box]:
+        span = self._slice(frame)
+        if span is None:
+            return []
+        start, end = span
+        labels = self.labels
+        return [
+            (_id, labels[code], x, y, w, h)
+            for _id, code, x, y, w, h in zip(
+                self._id[start:end].tolist(), self._label[start:end].tolist(),
+                self._x[start:end].tolist(), self._y[start:end].tolist(),
+                self._w[start:end].tolist(), self._h[start:end].tolist()
+            )
+        ]
+
+    def _editable(self, frame: int) -> list[Box]:
+        if frame not in self._dirty and len(self._dirty) >= self.overlay_frames:
+            self.compact()
+        boxes = self.get(frame)
+        self._overlay[frame] = boxes
+        self._dirty.add(frame)
+        return boxes
+
+    def _evict(self) -> None:
+        """Verwirft gelesene (nicht bearbeitete) Listen, wenn das Overlay zu groß wird."""
+        excess = len(self._overlay) - self.overlay_frames
+        if excess <= 0:
+            return
+        for frame in [f for f in self._overlay if f not in self._dirty][:excess]:
+            del self._overlay[frame]
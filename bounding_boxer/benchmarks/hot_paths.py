@@ -0,0 +1,432 @@
+# benchmarks/hot_paths.py
+"""
+Benchmarks der heißen Pfade: Dekodieren (VideoLoader.get_frame sequentiell,
+zufällig und aus dem Cache), Zeichnen (Canvas.paintEvent mit N Boxen bei
+mehreren Zoomstufen), Hover-Tests (Canvas.mouseMoveEvent) sowie Laden und
+Speichern von Projekten mit 10^3 bis 10^6 Boxen (JSON und .bbxp).
+Vor der Cache-Messung wird geprüft, dass get_frame den Frame ohne Kopie
+als QImage liefert; sonst bricht der Lauf mit einem Fehler ab.
+
+Läuft ohne Bildschirm (Qt-Plattform offscreen) mit synthetischen Videos und
+Projekten in einem temporären Arbeitsordner; Zufallsdaten sind geseedet.
+Ergebnisse gehen als JSON nach --output und lassen sich mit --compare gegen
+einen früheren Lauf vergleichen (Exit-Code 1 bei Verschlechterung).
+
+    python benchmarks/hot_paths.py [--groups decode render hover persistence]
+        [--boxes 1000 10000 100000 1000000] [--output results.json]
+        [--compare baseline.json --max-regression 1.25] [--quick] [--profile]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parent.parent
+GROUPS = ("decode", "render", "hover", "persistence")
+
+
+def timed(func, repeat: int, warmup: int = 1, setup=None) -> list[float]:
+    """Laufzeiten (ms) von func; setup läuft vor jedem Aufruf außerhalb der Messung."""
+    times = []
+    for i in range(warmup + repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def summarize(name: str, times: list[float], **params) -> dict:
+    """Kennzahlen einer Messreihe (ms)."""
+    ordered = sorted(times)
+    return {
+        "name": name,
+        "params": params,
+        "n": len(ordered),
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "min_ms": ordered[0],
+        "max_ms": ordered[-1],
+    }
+
+
+def result_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+# --- synthetische Daten ---
+
+def make_video(path: Path, frames: int, size: tuple[int, int], fps: float = 25.0) -> Path:
+    """Schreibt ein Testvideo (mp4v) mit bewegtem Rauschen, damit der Decoder echte Arbeit hat."""
+    import cv2
+    w, h = size
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    if not writer.isOpened():
+        raise RuntimeError(f"VideoWriter für {path} nicht verfügbar")
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    for i in range(frames):
+        frame = np.roll(base, i * 4, axis=1)
+        cv2.rectangle(frame, (i % w, h // 3), (i % w + 80, h // 3 + 80), (0, 255, 0), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def make_store(frames: int, per_frame: int, size: tuple[int, int], seed: int = 0):
+    """
+    AnnotationStore mit per_frame Tracks, die in jedem der frames Frames einen
+    Keyframe haben (ungünstigster Fall für Speichern und Laden).
+    """
+    from annotation_store import AnnotationStore
+    from config import LABEL_CLASSES
+    rng = np.random.default_rng(seed)
+    labels = list(LABEL_CLASSES)
+    total = frames * per_frame
+    w, h = size
+    bw = rng.integers(8, max(9, w // 8), total, dtype=np.int32)
+    bh = rng.integers(8, max(9, h // 8), total, dtype=np.int32)
+    columns = {
+        "id": np.tile(np.arange(1, per_frame + 1, dtype=np.int32), frames),
+        "x": (rng.random(total) * (w - bw)).astype(np.int32),
+        "y": (rng.random(total) * (h - bh)).astype(np.int32),
+        "w": bw,
+        "h": bh,
+        "label": np.tile((np.arange(per_frame) % len(labels)).astype(np.uint8), frames),
+    }
+    return AnnotationStore.from_columns(
+        np.arange(frames, dtype=np.int32), np.full(frames, per_frame, np.int64), columns, labels
+    )
+
+
+def make_project(video: Path, path: Path, frames: int, per_frame: int, size: tuple[int, int]):
+    from project_manager import ProjectManager
+    pm = ProjectManager(video, path)
+    pm.boxes = make_store(frames, per_frame, size)
+    pm.label_counters = {label: per_frame for label in pm.boxes.labels}
+    return pm
+
+
+def check_zero_copy(loader, index: int, level: int) -> None:
+    """
+    Prüft, dass get_frame einen gecachten Frame ohne Kopie liefert: Das QImage
+    muss auf den Puffer des Arrays im FrameCache zeigen. (constBits statt bits:
+    bits() löst selbst eine Kopie aus.)
+    """
+    image = loader.get_frame(index, level)
+    frame = loader.cache.get((index, level))
+    if image is None or frame is None or int(image.constBits()) != frame.__array_interface__["data"][0]:
+        raise RuntimeError(f"get_frame({index}, {level}) liefert eine Kopie statt einer View auf den Cache")
+
+
+# --- Gruppen ---
+
+def bench_decode(workdir: Path, args) -> list[dict]:
+    from frame_index import FrameIndex
+    from frame_reader import index_path
+    from video_loader import VideoLoader
+    size = tuple(args.video_size)
+    video = make_video(workdir / "data" / "input" / "bench.mp4", args.video_frames, size)
+    # Index vorab bauen: sonst entsteht er im Hintergrund und verfälscht die Messung
+    FrameIndex.build(video).save(index_path(video))
+    rng = np.random.default_rng(1)
+    results = []
+    for level in (0, 1):
+        loader = VideoLoader()
+        loader.open(video)
+        # Nur Dekodieren und Cache messen, nicht den Frame-Speicher auf der Festplatte
+        loader.store = None
+        count = loader.frame_count()
+
+        def sequential():
+            for i in range(count):
+                loader.get_frame(i, level)
+
+        times = timed(sequential, max(1, args.repeat // 2), setup=loader.cache.clear)
+        results.append(summarize("decode.sequential", [t / count for t in times],
+                                 level=level, frames=count, size=f"{size[0]}x{size[1]}"))
+
+        picks = iter(rng.integers(0, count, 10**6).tolist())
+        times = timed(lambda: loader.get_frame(next(picks), level), args.repeat * 10, setup=loader.cache.clear)
+        results.append(summarize("decode.random", times, level=level, size=f"{size[0]}x{size[1]}"))
+
+        loader.get_frame(0, level)
+        check_zero_copy(loader, 0, level)
+        times = timed(lambda: loader.get_frame(0, level), args.repeat * 20)
+        results.append(summarize("decode.cached", times, level=level, size=f"{size[0]}x{size[1]}"))
+    return results
+
+
+class _Host:
+    """Fenster mit Canvas und project-Attribut, wie es der Canvas über window() erwartet."""
+    def __init__(self, project, image_size: tuple[int, int], widget_size: tuple[int, int]):
+        from PyQt5.QtWidgets import QVBoxLayout, QWidget
+        from canvas import Canvas
+        self.window = QWidget()
+        self.window.project = project
+        layout = QVBoxLayout(self.window)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.canvas = Canvas()
+        layout.addWidget(self.canvas)
+        self.window.resize(*widget_size)
+        self.window.show()
+        self.image_size = image_size
+        self.canvas.set_image(self.frame(0), 0, image_size)
+
+    def frame(self, seed: int):
+        """Zufälliger Frame als QImage (wie vom VideoLoader, ohne Kopie)."""
+        from video_loader import frame_to_qimage
+        w, h = self.image_size
+        return frame_to_qimage(np.random.default_rng(seed + 2).integers(0, 256, (h, w, 3), dtype=np.uint8))
+
+    def zoom(self, scale: float | None) -> str:
+        """Setzt den Zoom (None: ins Fenster einpassen) und gibt ihn als Text zurück."""
+        if scale is None:
+            self.canvas.fit_to_window()
+        else:
+            self.canvas.scale_factor = scale
+            self.canvas.offset_x = self.canvas.offset_y = 0.0
+        return f"{self.canvas.scale_factor:.2f}"
+
+    def close(self) -> None:
+        self.window.close()
+
+
+def _render_projects(workdir: Path, args):
+    size = tuple(args.video_size)
+    for count in args.render_boxes:
+        pm = make_project(workdir / "bench.mp4", None, 1, count, size)
+        yield count, pm
+
+
+def bench_render(workdir: Path, args) -> list[dict]:
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance()
+    results = []
+    for count, pm in _render_projects(workdir, args):
+        host = _Host(pm, tuple(args.video_size), tuple(args.widget_size))
+        app.processEvents()
+        canvas = host.canvas
+        for scale in (None, 1.0, 4.0):
+            zoom = host.zoom(scale)
+            # Voll: statische Ebene neu (wie nach Frame-Wechsel oder Zoom)
+            canvas.repaint()
+
+            def invalidate():
+                canvas._layer_key = None
+
+            times = timed(canvas.repaint, args.repeat * 10, setup=invalidate)
+            results.append(summarize("render.paint_full", times, boxes=count, zoom=zoom))
+            # Nur Overlay: Hover/Selektion ändert sich, Ebene bleibt
+            times = timed(canvas.repaint, args.repeat * 10)
+            results.append(summarize("render.paint_overlay", times, boxes=count, zoom=zoom))
+            # Neuer Frame: Hintergrund-Kacheln aus dem neuen Bild, Ebene neu
+            frames = [host.frame(i) for i in range(2)]
+            turn = iter(range(10**6))
+
+            def next_frame():
+                canvas.set_image(frames[next(turn) % 2], 0, tuple(args.video_size))
+
+            times = timed(canvas.repaint, args.repeat * 10, setup=next_frame)
+            results.append(summarize("render.paint_new_frame", times, boxes=count, zoom=zoom))
+        host.close()
+    return results
+
+
+def bench_hover(workdir: Path, args) -> list[dict]:
+    from PyQt5.QtCore import QEvent, QPoint, Qt
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance()
+    rng = np.random.default_rng(3)
+    results = []
+    for count, pm in _render_projects(workdir, args):
+        host = _Host(pm, tuple(args.video_size), tuple(args.widget_size))
+        app.processEvents()
+        canvas = host.canvas
+        for scale in (None, 4.0):
+            zoom = host.zoom(scale)
+            w, h = canvas.width(), canvas.height()
+            points = iter(zip(rng.integers(0, w, 10**6).tolist(), rng.integers(0, h, 10**6).tolist()))
+
+            def move(pos: QPoint):
+                canvas.mouseMoveEvent(QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, Qt.NoButton, Qt.NoModifier))
+                # Zusammengefasste Bewegung sofort verarbeiten (sonst erst im nächsten Bildschirm-Frame)
+                canvas._flush_move()
+                # Dabei angeforderte Teil-Neuzeichnung mitmessen
+                app.processEvents()
+
+            app.processEvents()
+            times = timed(lambda: move(QPoint(*next(points))), args.repeat * 40, warmup=5)
+            results.append(summarize("hover.mouse_move", times, boxes=count, zoom=zoom))
+
+            # Jede Bewegung wechselt die gehoverte Box (linker Rand der nächsten sichtbaren Box)
+            borders = []
+            for _, _, x, y, bw, bh in pm.get_bboxes(0):
+                p = canvas.image_to_widget(x, y + bh // 2)
+                if p and 0 <= p.x() < w and 0 <= p.y() < h:
+                    borders.append(p)
+            if borders:
+                cycle = iter(borders * (args.repeat * 40 // len(borders) + 2))
+                times = timed(lambda: move(next(cycle)), args.repeat * 40, warmup=5)
+                results.append(summarize("hover.change", times, boxes=count, zoom=zoom))
+        host.close()
+    return results
+
+
+def bench_persistence(workdir: Path, args) -> list[dict]:
+    from project_format import BBXP_SUFFIX
+    from project_manager import ProjectManager
+    size = tuple(args.video_size)
+    video = workdir / "data" / "input" / "bench.mp4"
+    results = []
+    for total in args.boxes:
+        per_frame = min(total, args.boxes_per_frame)
+        frames = max(1, total // per_frame)
+        for suffix in (".json", BBXP_SUFFIX):
+            path = workdir / "data" / "projects" / f"bench{total}_boxes{suffix}"
+            pm = make_project(video, path, frames, per_frame, size)
+            repeat = args.repeat if total < 10**6 else max(1, args.repeat // 3)
+            params = dict(boxes=frames * per_frame, per_frame=per_frame, format=suffix.lstrip("."))
+            times = timed(pm.save_project, repeat)
+            pm.close()
+            results.append(summarize("persistence.save", times, bytes=path.stat().st_size, **params))
+
+            loaded = []
+
+            def load():
+                loaded.append(ProjectManager.load_project(path))
+
+            def release():
+                while loaded:
+                    loaded.pop().close()
+
+            times = timed(load, repeat, setup=release)
+            results.append(summarize("persistence.load", times, **params))
+            # Erster Zugriff auf einen Frame (bei .bbxp erst hier gelesen)
+            times = timed(lambda: loaded[-1].get_bboxes(frames // 2), 1, warmup=0)
+            results.append(summarize("persistence.first_frame", times, **params))
+            release()
+    return results
+
+
+BENCHMARKS = {
+    "decode": bench_decode,
+    "render": bench_render,
+    "hover": bench_hover,
+    "persistence": bench_persistence,
+}
+
+
+def environment() -> dict:
+    import cv2
+    from profiling import profiler
+    from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "profiling": profiler.enabled,
+    }
+
+
+def compare(results: list[dict], baseline: list[dict], max_regression: float) -> list[str]:
+    """Gibt den Vergleich der Mediane aus und liefert die Verschlechterungen über max_regression."""
+    old = {result_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        key = result_key(result)
+        if key not in old or not old[key]["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old[key]["median_ms"]
+        marker = "  <-- langsamer" if ratio > max_regression else ""
+        print(f"{key:<72} {old[key]['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms  x{ratio:5.2f}{marker}")
+        if ratio > max_regression:
+            regressions.append(key)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--repeat", type=int, default=5, help="Grundanzahl Wiederholungen pro Messung")
+    parser.add_argument("--video-size", type=int, nargs=2, default=(1920, 1080), metavar=("W", "H"))
+    parser.add_argument("--video-frames", type=int, default=120)
+    parser.add_argument("--widget-size", type=int, nargs=2, default=(1280, 720), metavar=("W", "H"))
+    parser.add_argument("--render-boxes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="Boxen im Frame für render und hover")
+    parser.add_argument("--boxes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6],
+                        help="Boxen pro Projekt für persistence")
+    parser.add_argument("--boxes-per-frame", type=int, default=100)
+    parser.add_argument("--quick", action="store_true", help="Kleine Größen für einen schnellen Probelauf")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mit eingeschalteter Zeitmessung (Overhead prüfen, Messpunkte mit ausgeben)")
+    parser.add_argument("--output", type=Path, help="Ergebnisse als JSON")
+    parser.add_argument("--compare", type=Path, help="Früheres Ergebnis (JSON) zum Vergleich")
+    parser.add_argument("--max-regression", type=float, default=1.25,
+                        help="Erlaubter Faktor auf den Median beim Vergleich")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat = min(args.repeat, 2)
+        args.video_frames = min(args.video_frames, 30)
+        args.render_boxes = [b for b in args.render_boxes if b <= 1000] or [100]
+        args.boxes = [b for b in args.boxes if b <= 10**4] or [10**3]
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, str(APP_DIR))
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    from profiling import profiler
+    profiler.enabled = args.profile
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Arbeitsordner wie bei der GUI: data/… liegt relativ zum aktuellen Ordner
+        workdir = Path(tmp)
+        for folder in ("input", "projects"):
+            (workdir / "data" / folder).mkdir(parents=True)
+        os.chdir(workdir)
+        try:
+            for group in args.groups:
+                start = time.perf_counter()
+                group_results = BENCHMARKS[group](workdir, args)
+                results.extend(group_results)
+                print(f"{group}: {len(group_results)} Messungen in {time.perf_counter() - start:.1f} s")
+        finally:
+            os.chdir(cwd)
+    app.quit()
+
+    for result in results:
+        print(f"{result_key(result):<72} median {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms")
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "results": results}
+    if args.profile:
+        report["profile"] = profiler.stats()
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    regressions = []
+    if args.compare:
+        print()
+        regressions = compare(results, json.loads(args.compare.read_text())["results"], args.max_regression)
+        for key in regressions:
+            print(f"FEHLER: {key} langsamer als erlaubt (x{args.max_regression})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
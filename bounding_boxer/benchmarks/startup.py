@@ -0,0 +1,123 @@
+# benchmarks/startup.py
+"""
+Startzeit der GUI bis zum ersten Zeichnen des Hauptfensters (time to first
+paint), gemessen in frischen Prozessen ab dem Prozessstart. Prüft gegen ein
+Zeitbudget und darauf, dass OpenCV und die Projektliste das erste Zeichnen
+nicht verzögern. Exit-Code 1 bei Überschreitung (Regressionstest).
+
+    python benchmarks/startup.py [--runs 5] [--projects 2000] [--budget-ms 800]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+# Median der Zeit bis zum ersten Zeichnen (ms); Richtwert für einen Desktop-Rechner
+STARTUP_BUDGET_MS = 800
+
+
+def child(spawned: float) -> None:
+    """Läuft im Messprozess: baut das Hauptfenster und meldet die Zeiten als JSON."""
+    start = time.perf_counter()
+    sys.path.insert(0, str(APP_DIR))
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    import main
+    imported = time.perf_counter()
+    window = main.MainWindow()
+    constructed = time.perf_counter()
+    result = {}
+
+    def lazy_loaded(name: str) -> bool:
+        module = sys.modules.get(name)
+        return module is not None and type(module).__name__ != "_LazyModule"
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and not result:
+                now = time.perf_counter()
+                result.update(
+                    process_start_ms=(time.time() - spawned) * 1000 - (now - start) * 1000,
+                    import_ms=(imported - start) * 1000,
+                    construct_ms=(constructed - imported) * 1000,
+                    first_paint_ms=(now - start) * 1000,
+                    cv2_loaded=lazy_loaded("cv2"),
+                    projects_listed=window.project_table.rowCount(),
+                )
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    paint_filter = FirstPaint()
+    window.installEventFilter(paint_filter)
+    window.show()
+    app.exec_()
+    # Katalog im Hintergrund fertig abgleichen lassen (für die Vollständigkeit)
+    if window.catalog_sync:
+        window.catalog_sync.wait()
+        app.processEvents()
+    result["projects_total"] = window.project_table.rowCount()
+    window.close()
+    print(json.dumps(result))
+
+
+def measure(workdir: Path) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", repr(time.time())],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--projects", type=int, default=2000, help="Anzahl Projektdateien im Testordner")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(float(args.child))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Arbeitsordner wie bei der GUI, mit vielen (leeren) Projektdateien
+        projects = Path(tmp) / "data" / "projects"
+        projects.mkdir(parents=True)
+        for i in range(args.projects):
+            (projects / f"video{i:05d}_boxes.json").write_text("{}")
+        runs = [measure(Path(tmp)) for _ in range(args.runs)]
+
+    keys = ("process_start_ms", "import_ms", "construct_ms", "first_paint_ms")
+    median = {key: statistics.median(r[key] for r in runs) for key in keys}
+    total = median["process_start_ms"] + median["first_paint_ms"]
+    problems = []
+    if total > args.budget_ms:
+        problems.append(f"Zeit bis zum ersten Zeichnen {total:.0f} ms > Budget {args.budget_ms:.0f} ms")
+    if any(r["cv2_loaded"] for r in runs):
+        problems.append("OpenCV wurde vor dem ersten Zeichnen geladen")
+    if any(r["projects_total"] != args.projects for r in runs):
+        problems.append("Projektliste unvollständig")
+    if args.json:
+        print(json.dumps({"median": median, "total_ms": total, "runs": runs, "problems": problems}))
+    else:
+        for key in keys:
+            print(f"{key:>18}: {median[key]:8.1f}")
+        print(f"{'total_ms':>18}: {total:8.1f}  (Budget {args.budget_ms:.0f} ms)")
+        listed = statistics.median(r["projects_listed"] for r in runs)
+        print(f"Projekte beim ersten Zeichnen: {listed:.0f} von {args.projects}")
+        for problem in problems:
+            print(f"FEHLER: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,27 @@
 # canvas.py
 
 from PyQt5.QtWidgets import QWidget, QSizePolicy
-from PyQt5.QtGui import QPainter, QPixmap, QPen, QColor, QBrush
-from PyQt5.QtCore import Qt, QRect, QPoint
+from PyQt5.QtGui import QPainter, QImage, QPixmap, QPen, QColor, QBrush, QStaticText, QFont, QFontMetrics
+from PyQt5.QtCore import Qt, QRect, QRectF, QPoint, QTimer, pyqtSignal
+import time
+from collections import OrderedDict
+import numpy as np
 from config import (
+    LABEL_CLASSES,
+    PROXY_LEVELS,
+    SMOOTH_RENDER_DELAY_MS,
+    TILE_SIZE,
+    TILE_CACHE_TILES,
+    BOX_DETAIL_MIN_PX
+)
+from profiling import profiled, profiler
+from styles import (
     BOUNDING_BOX_PEN,
     DRAWING_BOX_PEN,
     PRESELECTED_BOX_PEN,
     SELECTED_BOX_PEN,
-    LABEL_CLASSES
+    PROPOSAL_BOX_PEN,
+    label_color
 )
 
 class Canvas(QWidget):
@@ -18,9 +31,16 @@ class Canvas(QWidget):
     - Hover- und Selektionszustände
     - Verschieben, Skalieren über Handles
     - Löschen per Entf-Taste
+    Das Bild kann eine verkleinerte Proxy-Stufe sein; alle Koordinaten
+    beziehen sich auf die volle Auflösung (image_size).
     """
     CORNER_SIZE = 6
     HANDLE_TOLERANCE = CORNER_SIZE * 2
+    # Maximale Anzahl gecachter Label-Texte
+    LABEL_CACHE_SIZE = 10000
+
+    # Feinere Proxy-Stufe nötig (z.B. nach dem Hineinzoomen)
+    level_needed = pyqtSignal(int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -29,7 +49,23 @@ class Canvas(QWidget):
         self.setFocusPolicy(Qt.StrongFocus)
 
         # Bild und View
-        self.original_pixmap: QPixmap | None = None
+        self.original_image: QImage | None = None
+        # Volle Auflösung des Frames und Proxy-Stufe des gehaltenen Bildes
+        self.image_size: tuple[int, int] = (0, 0)
+        self.image_level = 0
+        # Geglättet skalierte Hintergrund-Kacheln (LRU):
+        # (cacheKey, scale_factor, tx, ty) -> QPixmap
+        self._tiles: OrderedDict[tuple[int, float, int, int], QPixmap] = OrderedDict()
+        # scale_factor, zu dem zuletzt Kacheln gerendert wurden
+        self._tile_scale: float | None = None
+        # Unskalierte Pixmap des Frames für das schnelle Zeichnen beim Zoomen/Pannen
+        # (nur dann angelegt; Kacheln entstehen ohne Kopie direkt aus dem QImage)
+        self._source_cache: tuple[int, QPixmap] | None = None
+        self._interacting = False
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(SMOOTH_RENDER_DELAY_MS)
+        self._idle_timer.timeout.connect(self._end_interaction)
         self.scale_factor = 1.0
         self.offset_x = 0.0
         self.offset_y = 0.0
@@ -44,8 +80,9 @@ class Canvas(QWidget):
         self.end_pos: QPoint | None = None
 
         # Edit State
-        self.hovered_box_id: int | None = None
-        self.selected_box_id: int | None = None
+        # Boxen als (Label, ID); IDs werden pro Label vergeben
+        self.hovered_box: tuple[str, int] | None = None
+        self.selected_box: tuple[str, int] | None = None
         self.hovered_corner: int | None = None
         self.resizing = False
         self.moving = False
@@ -57,79 +94,368 @@ class Canvas(QWidget):
         # Label für neue Box
         self.current_label: str | None = None
 
-    def set_pixmap(self, pixmap: QPixmap):
-        self.original_pixmap = pixmap
+        # Zusammengefasste Mausbewegungen: nur die letzte Position wird verarbeitet
+        self._pending_move: QPoint | None = None
+        self._last_move = 0.0
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.timeout.connect(self._process_move)
+
+        # Statische Ebene: Hintergrund und alle Boxen außer der gerade gezogenen;
+        # Hover und Auswahl werden als Overlay darübergezeichnet
+        self._layer: QPixmap | None = None
+        self._layer_key: tuple | None = None
+        self._layer_revision: int | None = None
+
+        # Pen und Handle-Brush pro Label-Klasse, einmalig aus LABEL_CLASSES
+        self._class_styles: dict[str, tuple[QPen, QBrush]] = {}
+        for key in LABEL_CLASSES:
+            pen = QPen(label_color(key))
+            pen.setWidth(BOUNDING_BOX_PEN.width())
+            self._class_styles[key] = (pen, QBrush(pen.color()))
+        fallback = QPen(Qt.red)
+        fallback.setWidth(BOUNDING_BOX_PEN.width())
+        self._fallback_style = (fallback, QBrush(fallback.color()))
+        self._selected_style = (SELECTED_BOX_PEN, QBrush(SELECTED_BOX_PEN.color()))
+        self._preselected_style = (PRESELECTED_BOX_PEN, QBrush(PRESELECTED_BOX_PEN.color()))
+        # (label, id) -> vorbereiteter Label-Text
+        self._label_cache: dict[tuple[str, int], QStaticText] = {}
+
+        # Leistungsanzeige (HUD): Zeilen werden von refresh_hud() vorbereitet
+        self.show_hud = False
+        self._hud_lines: list[str] = []
+        self._hud_font = QFont("monospace")
+        self._hud_font.setStyleHint(QFont.Monospace)
+        self._hud_rect = QRect()
+        # Bereich des letzten refresh_hud()-Updates (alte und neue Anzeige)
+        self._hud_update = QRect()
+
+    def set_image(self, image: QImage, level: int = 0, full_size: tuple[int, int] | None = None):
+        # Referenz halten: das QImage zeigt ohne Kopie auf den Frame-Puffer
+        self.original_image = image
+        self._tiles.clear()
+        self._source_cache = None
+        self.image_level = level
+        self.image_size = full_size or (image.width(), image.height())
         #self.scale_factor = 1.0
         #self.offset_x = self.offset_y = 0.0
         self.update()
 
+    def _begin_interaction(self):
+        """Zoom/Pan/Drag läuft: Hintergrund bis zur Ruhe nur schnell skalieren."""
+        self._interacting = True
+        self._idle_timer.start()
+
+    def _end_interaction(self):
+        self._interacting = False
+        self.update()
+
+    @staticmethod
+    def level_for_scale(scale_factor: float) -> int:
+        """Gröbste Proxy-Stufe, deren Auflösung bei scale_factor noch ausreicht."""
+        level = 0
+        while level < PROXY_LEVELS and scale_factor <= 1 / (2 ** (level + 1)):
+            level += 1
+        return level
+
+    def required_level(self) -> int:
+        return self.level_for_scale(self.scale_factor)
+
     def fit_to_window(self):
-        if not self.original_pixmap:
+        if not self.original_image:
             return
-        ow, oh = self.original_pixmap.width(), self.original_pixmap.height()
+        ow, oh = self.image_size
         w, h = self.width(), self.height()
         self.scale_factor = min(w/ow, h/oh)
         self.offset_x = self.offset_y = 0.0
         self.update()
 
     def paintEvent(self, event):
+        # Neuzeichnen nur der Leistungsanzeige (refresh_hud) nicht als canvas.paint messen
+        if not profiler.enabled or self._hud_update.contains(event.rect()):
+            self._paint(event)
+            return
+        start = time.perf_counter()
+        self._paint(event)
+        profiler.record("canvas.paint", start, time.perf_counter())
+
+    def _paint(self, event):
         painter = QPainter(self)
-        # Hintergrund zeichnen
-        if self.original_pixmap:
-            ow, oh = self.original_pixmap.width(), self.original_pixmap.height()
-            sw, sh = ow*self.scale_factor, oh*self.scale_factor
-            scaled = self.original_pixmap.scaled(int(sw), int(sh), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            w, h = self.width(), self.height()
-            x0 = (w-scaled.width())//2 + int(self.offset_x)
-            y0 = (h-scaled.height())//2 + int(self.offset_y)
-            painter.drawPixmap(x0, y0, scaled)
-
-            # Alle Boxen zeichnen
+        if self.original_image:
             proj = getattr(self.window(), 'project', None)
+            editing = self._editing_positions(proj)
+            # Statische Ebene (Hintergrund + alle Boxen außer der gerade gezogenen) nur bei
+            # Bedarf neu aufbauen; Hover und Auswahl ändern sie nicht
+            key = self._layer_state(proj, editing)
+            revision = proj.revision if proj else None
+            if self._layer is None or self._layer_key != key or self._layer_revision != revision:
+                self._render_layer(proj, editing)
+                self._layer_key = key
+                self._layer_revision = revision
+            dpr = self._layer.devicePixelRatio()
+            r = event.rect()
+            painter.drawPixmap(QRectF(r), self._layer, QRectF(r.x()*dpr, r.y()*dpr, r.width()*dpr, r.height()*dpr))
+
+            # Overlay: ausgewählte und gehoverte Box über ihrer Darstellung in der Ebene
             if proj:
-                for idx, (bid, label, x, y, bw, bh) in enumerate(proj.get_bboxes(proj.current_frame)):
-                    p1 = self.image_to_widget(x, y)
-                    p2 = self.image_to_widget(x+bw, y+bh)
-                    if not (p1 and p2):
-                        continue
-                    rect = QRect(p1, p2).normalized()
-                    # Pen bestimmen
-                    if self.selected_box_id == bid and self.hovered_corner is not None:
-                        pen = PRESELECTED_BOX_PEN
-                    elif self.selected_box_id == bid:
-                        pen = SELECTED_BOX_PEN
-                    elif self.hovered_box_id == bid:
-                        pen = PRESELECTED_BOX_PEN
-                    else:
-                        info = LABEL_CLASSES.get(label)
-                        pen = QPen(info['color']) if info else QPen(Qt.red)
-                        pen.setWidth(BOUNDING_BOX_PEN.width())
-                    painter.setPen(pen)
-                    painter.drawRect(rect)
-                    # Handles für selected
-                    if self.selected_box_id == bid:
-                        brush = QBrush(pen.color())
-                        for ci, corner in enumerate([rect.topLeft(), rect.topRight(), rect.bottomLeft(), rect.bottomRight()]):
-                            # Handle nur farbig gefüllt
-                            painter.fillRect(
-                                corner.x()-self.CORNER_SIZE//2,
-                                corner.y()-self.CORNER_SIZE//2,
-                                self.CORNER_SIZE, self.CORNER_SIZE,
-                                brush
-                            )
-                    # Label
-                    text = f"{label}#{bid}"
-                    fm = painter.fontMetrics()
-                    painter.drawText(rect.bottomLeft()+QPoint(2, fm.height()+2), text)
+                boxes = proj.get_bboxes(proj.current_frame)
+                fm = painter.fontMetrics()
+                for pos in sorted(editing | self._active_positions(proj)):
+                    self._draw_box(painter, fm, boxes[pos])
+                # Vorschläge der Propagation (nicht Teil der statischen Ebene)
+                proposals = proj.get_proposals(proj.current_frame)
+                if proposals:
+                    painter.setPen(PROPOSAL_BOX_PEN)
+                    painter.drawRects(*[self._box_widget_rect(*b[2:]) for b in proposals])
         # Neue Box während Zeichnen
         if self.start_pos and self.end_pos and not (self.resizing or self.moving):
             painter.setPen(DRAWING_BOX_PEN)
             painter.drawRect(QRect(self.start_pos, self.end_pos).normalized())
+        if self.show_hud and self._hud_lines:
+            self._draw_hud(painter)
+
+    def set_hud_visible(self, visible: bool):
+        self.show_hud = visible
+        self.refresh_hud()
+
+    def refresh_hud(self):
+        """Übernimmt p50/p95/max der Messpunkte in die Leistungsanzeige und zeichnet nur diese neu."""
+        self._hud_lines = [f"{'Messpunkt':<22}{'p50':>8}{'p95':>8}{'max':>8}{'n':>8}  ms"] + [
+            f"{name:<22}{s['p50']:8.2f}{s['p95']:8.2f}{s['max']:8.2f}{s['count']:8d}"
+            for name, s in profiler.stats().items()
+        ]
+        fm = QFontMetrics(self._hud_font)
+        width = max(fm.horizontalAdvance(line) for line in self._hud_lines) + 12
+        old = self._hud_rect
+        self._hud_rect = QRect(8, 8, width, fm.lineSpacing() * len(self._hud_lines) + 8)
+        self._hud_update = old.united(self._hud_rect)
+        self.update(self._hud_update)
+
+    def _draw_hud(self, painter: QPainter):
+        painter.fillRect(self._hud_rect, QColor(0, 0, 0, 170))
+        painter.setFont(self._hud_font)
+        painter.setPen(Qt.white)
+        fm = painter.fontMetrics()
+        x, y = self._hud_rect.left() + 6, self._hud_rect.top() + 4 + fm.ascent()
+        for line in self._hud_lines:
+            painter.drawText(x, y, line)
+            y += fm.lineSpacing()
+
+    def _active_positions(self, proj) -> frozenset[int]:
+        """Listenpositionen der ausgewählten und der gehoverten Box im aktuellen Frame."""
+        if not proj:
+            return frozenset()
+        index = proj.spatial_index(proj.current_frame)
+        keys = (self.selected_box, self.hovered_box)
+        return frozenset(p for p in (index.position_of(*key) for key in keys if key is not None) if p is not None)
+
+    def _editing_positions(self, proj) -> frozenset[int]:
+        """Listenposition der Box, die gerade verschoben oder skaliert wird (nicht in der Ebene)."""
+        if proj and (self.moving or self.resizing) and self.edit_idx is not None:
+            return frozenset((self.edit_idx,))
+        return frozenset()
+
+    def _layer_state(self, proj, editing: frozenset[int]) -> tuple:
+        """Alles außer der Box-Revision, wovon der Inhalt der statischen Ebene abhängt."""
+        fast = self._interacting and self._tile_scale != self.scale_factor
+        return (
+            self.original_image.cacheKey(), self.image_size,
+            self.scale_factor, self.offset_x, self.offset_y,
+            self.width(), self.height(), self.devicePixelRatioF(), fast,
+            id(proj), proj.current_frame if proj else None, editing
+        )
+
+    @profiled("canvas.layer")
+    def _render_layer(self, proj, editing: frozenset[int]):
+        """Zeichnet Hintergrund und alle Boxen außer der gerade bearbeiteten in die statische Ebene."""
+        dpr = self.devicePixelRatioF()
+        size = self.size() * dpr
+        if self._layer is None or self._layer.size() != size:
+            self._layer = QPixmap(size)
+        self._layer.setDevicePixelRatio(dpr)
+        self._layer.fill(self.palette().color(self.backgroundRole()))
+        painter = QPainter(self._layer)
+        painter.setFont(self.font())
+        self._draw_background(painter)
+        if proj:
+            ids, codes, geo = proj.frame_arrays(proj.current_frame)
+            if editing:
+                keep = np.ones(len(ids), bool)
+                keep[list(editing)] = False
+                ids, codes, geo = ids[keep], codes[keep], geo[keep]
+            self._draw_boxes(painter, ids, codes, geo, proj.boxes.labels)
+        painter.end()
+
+    @profiled("canvas.boxes")
+    def _draw_boxes(self, painter: QPainter, ids: np.ndarray, codes: np.ndarray, geo: np.ndarray, labels: list[str]):
+        """
+        Zeichnet Boxen gebündelt: Widget-Koordinaten werden mit NumPy für alle
+        Boxen auf einmal berechnet, Rechtecke pro Label-Klasse gesammelt und
+        mit einem drawRects-Aufruf pro Pen gezeichnet. Boxen außerhalb des
+        Widgets entfallen, sehr kleine Boxen bekommen kein Label.
+        ids, codes und geo (x, y, w, h) kommen aus ProjectManager.frame_arrays.
+        """
+        if not len(ids):
+            return
+        s = self.scale_factor
+        ow, oh = self.image_size
+        x0 = (self.width() - ow*s)/2 + self.offset_x
+        y0 = (self.height() - oh*s)/2 + self.offset_y
+        w, h = self.width(), self.height()
+        fm = painter.fontMetrics()
+        geo = geo.astype(np.float64)
+        # Wie image_to_widget: int() schneidet Richtung 0 ab
+        left = (x0 + geo[:, 0]*s).astype(np.int64)
+        top = (y0 + geo[:, 1]*s).astype(np.int64)
+        right = (x0 + (geo[:, 0] + geo[:, 2])*s).astype(np.int64)
+        bottom = (y0 + (geo[:, 1] + geo[:, 3])*s).astype(np.int64)
+        in_view = (left <= w) & (top <= h)
+        rect_visible = in_view & (right >= 0) & (bottom >= 0)
+        # Das Label liegt unter der Box und kann auch sichtbar sein, wenn sie es nicht ist
+        text_y = bottom + 2 + fm.height() - fm.ascent()
+        detail = (in_view & (right - left >= BOX_DETAIL_MIN_PX) & (bottom - top >= BOX_DETAIL_MIN_PX)
+                  & (text_y + fm.height() >= 0))
+        groups = [(labels[code], codes == code) for code in np.unique(codes).tolist()]
+        # Erst alle Rahmen, dann alle Labels, damit Labels nicht verdeckt werden
+        for label, of_label in groups:
+            idx = np.flatnonzero(of_label & rect_visible)
+            if len(idx):
+                painter.setPen(self._class_styles.get(label, self._fallback_style)[0])
+                painter.drawRects(*[
+                    QRect(l, t, r - l + 1, b - t + 1)
+                    for l, t, r, b in zip(left[idx].tolist(), top[idx].tolist(),
+                                          right[idx].tolist(), bottom[idx].tolist())
+                ])
+        for label, of_label in groups:
+            painter.setPen(self._class_styles.get(label, self._fallback_style)[0])
+            for i in np.flatnonzero(of_label & detail).tolist():
+                text = self._static_label(label, int(ids[i]))
+                tx = int(left[i]) + 2
+                if tx + text.size().width() >= 0:
+                    painter.drawStaticText(tx, int(text_y[i]), text)
 
+    def _box_widget_rect(self, x: int, y: int, bw: int, bh: int) -> QRect:
+        return QRect(self.image_to_widget(x, y), self.image_to_widget(x+bw, y+bh)).normalized()
+
+    def _static_label(self, label: str, bid: int) -> QStaticText:
+        text = self._label_cache.get((label, bid))
+        if text is None:
+            if len(self._label_cache) >= self.LABEL_CACHE_SIZE:
+                self._label_cache.clear()
+            text = QStaticText(f"{label}#{bid}")
+            text.setTextFormat(Qt.PlainText)
+            text.prepare(font=self.font())
+            self._label_cache[(label, bid)] = text
+        return text
+
+    def _draw_box(self, painter: QPainter, fm, box: tuple[int, str, int, int, int, int]):
+        """Zeichnet eine einzelne (aktive) Box inklusive Zustand und Handles."""
+        bid, label, x, y, bw, bh = box
+        key = (label, bid)
+        rect = self._box_widget_rect(x, y, bw, bh)
+        # Pen bestimmen
+        if self.selected_box == key and self.hovered_corner is not None:
+            pen, brush = self._preselected_style
+        elif self.selected_box == key:
+            pen, brush = self._selected_style
+        elif self.hovered_box == key:
+            pen, brush = self._preselected_style
+        else:
+            pen, brush = self._class_styles.get(label, self._fallback_style)
+        painter.setPen(pen)
+        painter.drawRect(rect)
+        if rect.width() < BOX_DETAIL_MIN_PX or rect.height() < BOX_DETAIL_MIN_PX:
+            return
+        # Handles für selected
+        if self.selected_box == key:
+            for corner in [rect.topLeft(), rect.topRight(), rect.bottomLeft(), rect.bottomRight()]:
+                # Handle nur farbig gefüllt
+                painter.fillRect(
+                    corner.x()-self.CORNER_SIZE//2,
+                    corner.y()-self.CORNER_SIZE//2,
+                    self.CORNER_SIZE, self.CORNER_SIZE,
+                    brush
+                )
+        # Label
+        painter.drawStaticText(rect.bottomLeft()+QPoint(2, 2 + fm.height() - fm.ascent()), self._static_label(label, bid))
+
+    def _dirty_rect(self, proj, key: tuple[str, int] | None) -> QRect:
+        """
+        Widget-Bereich, den die Box key = (Label, ID) inklusive Rahmen, Handles
+        und Label belegt (leeres QRect, wenn es die Box nicht gibt).
+        """
+        if key is None or not proj or not self.original_image:
+            return QRect()
+        pos = proj.spatial_index(proj.current_frame).position_of(*key)
+        if pos is None:
+            return QRect()
+        bid, label, x, y, bw, bh = proj.get_bboxes(proj.current_frame)[pos]
+        rect = self._box_widget_rect(x, y, bw, bh)
+        fm = self.fontMetrics()
+        text = QRect(
+            rect.left(), rect.bottom(),
+            int(self._static_label(label, bid).size().width()) + 4, fm.height() + fm.descent() + 4
+        )
+        m = self.CORNER_SIZE
+        return rect.adjusted(-m, -m, m, m).united(text)
+
+    @profiled("canvas.background")
+    def _draw_background(self, painter: QPainter):
+        """
+        Zeichnet den Frame kachelweise: nur die im Widget sichtbaren Kacheln
+        werden geglättet skaliert und in einem kleinen LRU-Cache gehalten.
+        Speicher und Zeichenzeit hängen so von der Widget-Größe ab, nicht
+        vom Zoom. Kacheln werden direkt aus dem QImage gerendert, das ohne
+        Kopie auf den Frame-Puffer zeigt. Solange gezoomt wird, zeichnet der
+        Painter eine erst dafür angelegte Pixmap schnell (ohne Glättung) skaliert.
+        """
+        ow, oh = self.image_size
+        sw, sh = int(ow*self.scale_factor), int(oh*self.scale_factor)
+        w, h = self.width(), self.height()
+        x0 = (w-sw)//2 + int(self.offset_x)
+        y0 = (h-sh)//2 + int(self.offset_y)
+        image_key = self.original_image.cacheKey()
+        if self._interacting and self._tile_scale != self.scale_factor:
+            if not self._source_cache or self._source_cache[0] != image_key:
+                self._source_cache = (image_key, QPixmap.fromImage(self.original_image))
+            source = self._source_cache[1]
+            painter.drawPixmap(QRectF(x0, y0, sw, sh), source, QRectF(source.rect()))
+            return
+        self._tile_scale = self.scale_factor
+        # Sichtbarer Ausschnitt in skalierten Bildkoordinaten
+        vis = QRect(-x0, -y0, w, h).intersected(QRect(0, 0, sw, sh))
+        if vis.isEmpty():
+            return
+        for ty in range(vis.top() // TILE_SIZE, vis.bottom() // TILE_SIZE + 1):
+            for tx in range(vis.left() // TILE_SIZE, vis.right() // TILE_SIZE + 1):
+                key = (image_key, self.scale_factor, tx, ty)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    tile = self._render_tile(self.original_image, sw, sh, tx, ty)
+                    self._tiles[key] = tile
+                    if len(self._tiles) > TILE_CACHE_TILES:
+                        self._tiles.popitem(last=False)
+                else:
+                    self._tiles.move_to_end(key)
+                painter.drawPixmap(x0 + tx*TILE_SIZE, y0 + ty*TILE_SIZE, tile)
+
+    @staticmethod
+    def _render_tile(source: QImage, sw: int, sh: int, tx: int, ty: int) -> QPixmap:
+        """Rendert eine Kachel des auf sw x sh skalierten Frames geglättet."""
+        tw = min(TILE_SIZE, sw - tx*TILE_SIZE)
+        th = min(TILE_SIZE, sh - ty*TILE_SIZE)
+        tile = QPixmap(tw, th)
+        p = QPainter(tile)
+        p.setRenderHint(QPainter.SmoothPixmapTransform)
+        p.drawImage(QRectF(-tx*TILE_SIZE, -ty*TILE_SIZE, sw, sh), source, QRectF(source.rect()))
+        p.end()
+        return tile
+
+    @profiled("canvas.wheel")
     def wheelEvent(self, event):
-        if not self.original_pixmap:
+        if not self.original_image:
             return
-        ow, oh = self.original_pixmap.width(), self.original_pixmap.height()
+        ow, oh = self.image_size
         w, h = self.width(), self.height()
         mx = event.position().x() if hasattr(event, 'position') else event.x()
         my = event.position().y() if hasattr(event, 'position') else event.y()
@@ -138,6 +464,7 @@ class Canvas(QWidget):
         y0_old = (h-old_sh)/2 + self.offset_y
         img_x = (mx-x0_old)/self.scale_factor
         img_y = (my-y0_old)/self.scale_factor
+        self._begin_interaction()
         factor = 1.1 if event.angleDelta().y()>0 else 0.9
         self.scale_factor = max(min(self.scale_factor*factor,10),0.1)
         new_sw, new_sh = ow*self.scale_factor, oh*self.scale_factor
@@ -145,51 +472,57 @@ class Canvas(QWidget):
         self.offset_x = mx - img_x*self.scale_factor - base_x
         self.offset_y = my - img_y*self.scale_factor - base_y
         self._clamp_offsets(new_sw,new_sh)
+        if self.required_level() < self.image_level:
+            self.level_needed.emit(self.required_level())
         self.update()
         self._update_status(int(mx),int(my))
 
+    @profiled("canvas.mouse_press")
     def mousePressEvent(self, event):
+        self._flush_move()
         if event.button() == Qt.LeftButton:
             pos = event.pos()
             proj = getattr(self.window(), 'project', None)
             # Deselection: Klick außerhalb
-            if self.selected_box_id is not None and proj:
+            if self.selected_box is not None and proj:
                 sel_rect = None
-                for bid, label, x, y, bw, bh in proj.get_bboxes(proj.current_frame):
-                    if bid == self.selected_box_id:
-                        tl = self.image_to_widget(x, y)
-                        br = self.image_to_widget(x + bw, y + bh)
-                        if tl and br:
-                            sel_rect = QRect(tl, br).normalized()
-                        break
+                sel_idx = proj.spatial_index(proj.current_frame).position_of(*self.selected_box)
+                if sel_idx is not None:
+                    bid, label, x, y, bw, bh = proj.get_bboxes(proj.current_frame)[sel_idx]
+                    tl = self.image_to_widget(x, y)
+                    br = self.image_to_widget(x + bw, y + bh)
+                    if tl and br:
+                        sel_rect = QRect(tl, br).normalized()
                 if sel_rect and not sel_rect.contains(pos) and self.hovered_corner is None:
-                    self.selected_box_id = None
-                    self.update()
+                    dirty = self._dirty_rect(proj, self.selected_box)
+                    self.selected_box = None
+                    self.update(dirty)
                     return
             # Resizing starten
-            if self.selected_box_id is not None and self.hovered_corner is not None and proj:
-                for idx, (bid, label, x, y, bw, bh) in enumerate(proj.get_bboxes(proj.current_frame)):
-                    if bid == self.selected_box_id:
-                        self.orig_rect = (x, y, bw, bh)
-                        self.edit_idx = idx
-                        break
+            if self.selected_box is not None and self.hovered_corner is not None and proj:
+                idx = proj.spatial_index(proj.current_frame).position_of(*self.selected_box)
+                if idx is not None:
+                    bid, label, x, y, bw, bh = proj.get_bboxes(proj.current_frame)[idx]
+                    self.orig_rect = (x, y, bw, bh)
+                    self.edit_idx = idx
                 self.resizing = True
                 self.resize_corner = self.hovered_corner
                 self.edit_start = pos
                 return
             # Box-Select
-            if self.hovered_box_id is not None:
-                self.selected_box_id = self.hovered_box_id
+            if self.hovered_box is not None:
+                dirty = self._dirty_rect(proj, self.selected_box)
+                self.selected_box = self.hovered_box
                 self.resizing = self.moving = False
                 self.hovered_corner = None
                 self.start_pos = self.end_pos = None
-                self.update()
+                self.update(dirty.united(self._dirty_rect(proj, self.selected_box)))
                 return
             # Move-Mode
-            if self.selected_box_id is not None and proj:
-                for idx, (bid, label, x, y, bw, bh) in enumerate(proj.get_bboxes(proj.current_frame)):
-                    if bid != self.selected_box_id:
-                        continue
+            if self.selected_box is not None and proj:
+                idx = proj.spatial_index(proj.current_frame).position_of(*self.selected_box)
+                if idx is not None:
+                    bid, label, x, y, bw, bh = proj.get_bboxes(proj.current_frame)[idx]
                     rect_w = QRect(
                         self.image_to_widget(x, y),
                         self.image_to_widget(x + bw, y + bh)
@@ -201,49 +534,87 @@ class Canvas(QWidget):
                         self.edit_idx = idx
                         return
             # Neues Zeichnen
-            if self.selected_box_id is None:
+            if self.selected_box is None:
                 self.start_pos = pos
                 self.end_pos = pos
         elif event.button() == Qt.RightButton and not (self.start_pos or self.resizing or self.moving):
             self.panning = True
+            self._begin_interaction()
             self.pan_start = event.pos()
             self.pan_offset = (self.offset_x, self.offset_y)
 
     def mouseMoveEvent(self, event):
-        pos = event.pos()
+        # Nur die letzte Position merken: Hover-Test, Edit und Statusanzeige
+        # laufen höchstens einmal pro Bildschirm-Frame
+        self._pending_move = event.pos()
+        if not self._move_timer.isActive():
+            elapsed = (time.perf_counter() - self._last_move) * 1000
+            self._move_timer.start(max(0, int(self._move_interval_ms() - elapsed)))
+
+    def _move_interval_ms(self) -> float:
+        screen = self.screen()
+        rate = screen.refreshRate() if screen else 0
+        return 1000 / rate if rate > 0 else 1000 / 60
+
+    def _flush_move(self):
+        """Verarbeitet eine noch ausstehende Mausbewegung sofort (z.B. vor Press/Release)."""
+        if self._pending_move is not None:
+            self._move_timer.stop()
+            self._process_move()
+
+    @profiled("canvas.mouse_move")
+    def _process_move(self):
+        if self._pending_move is None:
+            return
+        pos = self._pending_move
+        self._pending_move = None
+        self._last_move = time.perf_counter()
         # update hovered_corner and hovered_box
-        self.hovered_corner = None
-        prev_box = self.hovered_box_id
-        self.hovered_box_id = None
         proj = getattr(self.window(),'project',None)
-        if proj:
-            rects = proj.get_bboxes(proj.current_frame)
-            # check corners for selected box
-            if self.selected_box_id is not None:
-                for idx, (bid,_,x,y,bw,bh) in enumerate(rects):
-                    if bid!=self.selected_box_id: continue
-                    rect_w = QRect(self.image_to_widget(x,y), self.image_to_widget(x+bw,y+bh)).normalized()
-                    for ci,corner in enumerate([rect_w.topLeft(),rect_w.topRight(),rect_w.bottomLeft(),rect_w.bottomRight()]):
-                        if (corner-pos).manhattanLength()<=self.HANDLE_TOLERANCE:
-                            self.hovered_corner=ci
-                            self.hovered_box_id=bid
+        prev_corner = self.hovered_corner
+        prev_box = self.hovered_box
+        # Beim Verschieben/Skalieren bleibt der Hover-Zustand auf der bearbeiteten Box
+        if not (self.resizing or self.moving):
+            self.hovered_corner = None
+            self.hovered_box = None
+            if proj and self.original_image:
+                rects = proj.get_bboxes(proj.current_frame)
+                # Kandidaten aus dem räumlichen Index: Boxen nahe der Mausposition
+                ix,iy=self._widget_to_image_f(pos.x(),pos.y())
+                tol=self.HANDLE_TOLERANCE/self.scale_factor
+                candidates=proj.spatial_index(proj.current_frame).query(ix-tol,iy-tol,ix+tol,iy+tol)
+                # check corners for selected box
+                if self.selected_box is not None:
+                    for idx in candidates:
+                        bid,label,x,y,bw,bh=rects[idx]
+                        if (label,bid)!=self.selected_box: continue
+                        rect_w = QRect(self.image_to_widget(x,y), self.image_to_widget(x+bw,y+bh)).normalized()
+                        for ci,corner in enumerate([rect_w.topLeft(),rect_w.topRight(),rect_w.bottomLeft(),rect_w.bottomRight()]):
+                            if (corner-pos).manhattanLength()<=self.HANDLE_TOLERANCE:
+                                self.hovered_corner=ci
+                                self.hovered_box=(label,bid)
+                                break
+                        if self.hovered_corner is not None:
                             break
-                    if self.hovered_corner is not None:
-                        break
-            # check border hover for any box
-            if self.hovered_box_id is None:
-                for bid,_,x,y,bw,bh in proj.get_bboxes(proj.current_frame):
-                    rect_w = QRect(self.image_to_widget(x,y), self.image_to_widget(x+bw,y+bh)).normalized()
-                    px,py=pos.x(),pos.y()
-                    if (((abs(px-rect_w.left())<=self.HANDLE_TOLERANCE or abs(px-rect_w.right())<=self.HANDLE_TOLERANCE)
-                         and rect_w.top()<=py<=rect_w.bottom())
-                        or
-                        ((abs(py-rect_w.top())<=self.HANDLE_TOLERANCE or abs(py-rect_w.bottom())<=self.HANDLE_TOLERANCE)
-                         and rect_w.left()<=px<=rect_w.right())):
-                        self.hovered_box_id=bid
-                        break
-        if prev_box!=self.hovered_box_id:
-            self.update()
+                # check border hover for any box
+                if self.hovered_box is None:
+                    for idx in candidates:
+                        bid,label,x,y,bw,bh=rects[idx]
+                        rect_w = QRect(self.image_to_widget(x,y), self.image_to_widget(x+bw,y+bh)).normalized()
+                        px,py=pos.x(),pos.y()
+                        if (((abs(px-rect_w.left())<=self.HANDLE_TOLERANCE or abs(px-rect_w.right())<=self.HANDLE_TOLERANCE)
+                             and rect_w.top()<=py<=rect_w.bottom())
+                            or
+                            ((abs(py-rect_w.top())<=self.HANDLE_TOLERANCE or abs(py-rect_w.bottom())<=self.HANDLE_TOLERANCE)
+                             and rect_w.left()<=px<=rect_w.right())):
+                            self.hovered_box=(label,bid)
+                            break
+        if prev_box!=self.hovered_box or prev_corner!=self.hovered_corner:
+            # Nur die betroffenen Boxen neu zeichnen
+            dirty=self._dirty_rect(proj,prev_box).united(self._dirty_rect(proj,self.hovered_box))
+            if prev_corner!=self.hovered_corner:
+                dirty=dirty.united(self._dirty_rect(proj,self.selected_box))
+            self.update(dirty)
         # Resizing
         if self.resizing and self.orig_rect and self.edit_idx is not None:
             dx=(pos.x()-self.edit_start.x())/self.scale_factor
@@ -255,33 +626,39 @@ class Canvas(QWidget):
             elif ci==1: ny,nw,nh=y0+dy,w0+dx,h0-dy
             elif ci==2: nx,nw,nh=x0+dx,w0-dx,h0+dy
             elif ci==3: nw,nh=w0+dx,h0+dy
-            proj.bboxes[proj.current_frame][self.edit_idx]=(proj.bboxes[proj.current_frame][self.edit_idx][0],
-                proj.bboxes[proj.current_frame][self.edit_idx][1],int(nx),int(ny),int(abs(nw)),int(abs(nh)))
-            self.update();return
+            self._edit_box(proj,(int(nx),int(ny),int(abs(nw)),int(abs(nh))))
+            return
         # Moving
         if self.moving and self.orig_rect and self.edit_idx is not None:
             dx=(pos.x()-self.edit_start.x())/self.scale_factor
             dy=(pos.y()-self.edit_start.y())/self.scale_factor
             x0,y0,w0,h0=self.orig_rect
-            proj.bboxes[proj.current_frame][self.edit_idx]=(proj.bboxes[proj.current_frame][self.edit_idx][0],
-                proj.bboxes[proj.current_frame][self.edit_idx][1],int(x0+dx),int(y0+dy),w0,h0)
-            self.update();return
+            self._edit_box(proj,(int(x0+dx),int(y0+dy),w0,h0))
+            return
         # Pan or draw
         if self.panning:
+            self._begin_interaction()
             delta=pos-self.pan_start
             self.offset_x,self.offset_y=self.pan_offset[0]+delta.x(),self.pan_offset[1]+delta.y()
-            self._clamp_offsets(self.original_pixmap.width()*self.scale_factor,
-                                 self.original_pixmap.height()*self.scale_factor)
+            self._clamp_offsets(self.image_size[0]*self.scale_factor,
+                                 self.image_size[1]*self.scale_factor)
             self.update()
-        elif self.start_pos and self.selected_box_id is None:
-            self.end_pos=pos;self.update()
+        elif self.start_pos and self.selected_box is None:
+            dirty=QRect(self.start_pos,self.end_pos).normalized()
+            self.end_pos=pos
+            dirty=dirty.united(QRect(self.start_pos,self.end_pos).normalized())
+            w=DRAWING_BOX_PEN.width()+1
+            self.update(dirty.adjusted(-w,-w,w,w))
         self._update_status(pos.x(),pos.y())
 
+    @profiled("canvas.mouse_release")
     def mouseReleaseEvent(self,event):
+        self._flush_move()
         if event.button()==Qt.LeftButton:
-            if self.resizing: self.resizing=False;return
-            if self.moving: self.moving=False;return
-            if self.start_pos and self.end_pos and self.current_label and self.selected_box_id is None:
+            if self.resizing or self.moving:
+                self.resizing=self.moving=False
+                self._finish_edit();return
+            if self.start_pos and self.end_pos and self.current_label and self.selected_box is None:
                 i1=self.widget_to_image(self.start_pos.x(),self.start_pos.y())
                 i2=self.widget_to_image(self.end_pos.x(),self.end_pos.y())
                 if i1 and i2:
@@ -292,30 +669,60 @@ class Canvas(QWidget):
             self.start_pos=self.end_pos=None;self.update()
         elif event.button()==Qt.RightButton: self.panning=False
 
+    def _edit_box(self,proj,rect:tuple[int,int,int,int],journal:bool=False):
+        """
+        Setzt die gerade bearbeitete Box auf rect. Sie liegt im Overlay, nicht
+        in der statischen Ebene; neu gezeichnet wird nur ihr alter und neuer Bereich.
+        Zwischenschritte beim Ziehen gehen nicht ins Journal (siehe _finish_edit).
+        """
+        bid,label=proj.get_bboxes(proj.current_frame)[self.edit_idx][:2]
+        dirty=self._dirty_rect(proj,(label,bid))
+        layer_valid=self._layer_revision==proj.revision
+        proj.update_bbox(proj.current_frame,self.edit_idx,rect,journal=journal)
+        if layer_valid and self.edit_idx in self._editing_positions(proj):
+            self._layer_revision=proj.revision
+        self.update(dirty.united(self._dirty_rect(proj,(label,bid))))
+
+    def _finish_edit(self):
+        """Schreibt den Endstand einer verschobenen/skalierten Box ins Journal."""
+        proj=getattr(self.window(),'project',None)
+        if not proj or self.edit_idx is None or self.orig_rect is None:
+            return
+        rect=tuple(proj.get_bboxes(proj.current_frame)[self.edit_idx][2:])
+        if rect!=tuple(self.orig_rect):
+            self._edit_box(proj,rect,journal=True)
+
     def keyPressEvent(self,event):
-        if event.key()==Qt.Key_Delete and self.selected_box_id is not None:
-            proj=self.window().project;frame=proj.current_frame
-            proj.bboxes[frame]=[b for b in proj.bboxes[frame] if b[0]!=self.selected_box_id]
-            self.selected_box_id=None;self.update();return
+        if event.key()==Qt.Key_Delete and self.selected_box is not None:
+            proj=self.window().project
+            proj.remove_bbox(proj.current_frame,*self.selected_box)
+            self.selected_box=None;self.update();return
         super().keyPressEvent(event)
 
     def image_to_widget(self,ix:int,iy:int)->QPoint|None:
-        if not self.original_pixmap: return None
-        ow,oh=self.original_pixmap.width(),self.original_pixmap.height()
+        if not self.original_image: return None
+        ow,oh=self.image_size
         sw,sh=ow*self.scale_factor,oh*self.scale_factor
         x0=(self.width()-sw)/2+self.offset_x
         y0=(self.height()-sh)/2+self.offset_y
         return QPoint(int(x0+ix*self.scale_factor),int(y0+iy*self.scale_factor))
 
     def widget_to_image(self,wx:int,wy:int)->tuple[int,int]|None:
-        if not self.original_pixmap: return None
-        ow,oh=self.original_pixmap.width(),self.original_pixmap.height()
+        if not self.original_image: return None
+        ow,oh=self.image_size
         sw,sh=ow*self.scale_factor,oh*self.scale_factor
         x0=(self.width()-sw)/2+self.offset_x
         y0=(self.height()-sh)/2+self.offset_y
         if wx<x0 or wx>x0+sw or wy<y0 or wy>y0+sh: return None
         return (int((wx-x0)/self.scale_factor),int((wy-y0)/self.scale_factor))
 
+    def _widget_to_image_f(self,wx:float,wy:float)->tuple[float,float]:
+        """Wie widget_to_image, aber ungerundet und auch außerhalb des Bildes."""
+        ow,oh=self.image_size
+        x0=(self.width()-ow*self.scale_factor)/2+self.offset_x
+        y0=(self.height()-oh*self.scale_factor)/2+self.offset_y
+        return ((wx-x0)/self.scale_factor,(wy-y0)/self.scale_factor)
+
     def _clamp_offsets(self,sw:float,sh:float):
         w,h=self.width(),self.height()
         if sw>w: half=(sw-w)/2;self.offset_x=max(-half,min(self.offset_x,half))
@@ -0,0 +1,183 @@
+# catalog.py
+import json
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from frame_reader import index_path
+from project_format import BBXP_SUFFIX, read_project
+from tracks import TrackIndex, migrate_copy_forward, track_key
+
+PROJECT_SUFFIXES = ("_boxes.json", f"_boxes{BBXP_SUFFIX}")
+
+# Erhöhen, wenn sich die Bedeutung der Spalten ändert; ältere Kataloge werden neu gelesen
+CATALOG_VERSION = 2
+
+# Eine Zeile pro Projektdatei; boxes und labels (JSON-Objekt Label -> Anzahl) zählen
+# die Boxen aller Frames wie im Editor angezeigt (interpoliert bzw. gehalten),
+# labeled_frames die Frames mit mindestens einer Box, last_frame der zuletzt
+# bearbeitete Frame der Sitzung
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    index_mtime REAL NOT NULL,
+    video TEXT,
+    frame_count INTEGER,
+    labeled_frames INTEGER,
+    boxes INTEGER,
+    tracks INTEGER,
+    last_frame INTEGER,
+    labels TEXT,
+    error TEXT
+)
+"""
+COLUMNS = (
+    "name", "mtime", "size", "index_mtime", "video", "frame_count",
+    "labeled_frames", "boxes", "tracks", "last_frame", "labels", "error",
+)
+
+
+def _index_mtime(video: str | None) -> float:
+    """Änderungszeit des Keyframe-Index zum Video (0, wenn keiner existiert)."""
+    if not video:
+        return 0.0
+    try:
+        return index_path(Path(video)).stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def summarize(path: Path) -> dict:
+    """
+    Metadaten einer Projektdatei für den Katalog. Gelesen wird nur die Datei
+    (kein Journal); Projekte aus dem alten Modell werden wie beim Öffnen in
+    Tracks überführt. Die Frame-Anzahl stammt aus dem Keyframe-Index des
+    Videos, falls vorhanden. Boxen werden über den Track-Index gezählt; ohne
+    Frame-Anzahl laufen offene Tracks bis zum letzten Keyframe des Projekts.
+    """
+    data, store = read_project(path)
+    if "track_ends" in data:
+        ends = {track_key(store.intern(label), _id): end for label, _id, end in data["track_ends"]}
+    else:
+        store, ends = migrate_copy_forward(store)
+    tracks = TrackIndex(store, ends)
+    video = data.get("video", "")
+    frame_count = None
+    try:
+        timestamps = json.loads(index_path(Path(video)).read_text()).get("timestamps")
+        frame_count = len(timestamps) if timestamps else None
+    except (OSError, ValueError):
+        pass
+    if frame_count:
+        stop = frame_count
+    else:
+        stop = int(tracks.frame.max()) + 1 if len(tracks.frame) else 0
+    counts = tracks.frame_counts(stop)
+    per_label = np.bincount((tracks.keys >> 32).astype(np.intp), counts, minlength=len(store.labels))
+    return {
+        "video": video,
+        "frame_count": frame_count,
+        "labeled_frames": tracks.covered_frames(stop),
+        "boxes": int(counts.sum()),
+        "tracks": len(tracks),
+        "last_frame": data.get("current_frame", 0),
+        "labels": json.dumps({label: int(n) for label, n in zip(store.labels, per_label) if n}),
+        "error": None,
+    }
+
+
+class Catalog:
+    """
+    Persistenter Katalog der Projekte eines Ordners (SQLite). Die Startseite
+    liest nur den Katalog; sync() liest ausschließlich Projektdateien neu,
+    deren Änderungszeit oder Größe (bzw. der Keyframe-Index ihres Videos)
+    sich geändert hat, und entfernt verschwundene. Eine Verbindung gehört zu
+    einem Thread; der Hintergrund-Abgleich öffnet seinen eigenen Catalog.
+    """
+    def __init__(self, db_path: Path, folder: Path):
+        self.folder = Path(folder)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), timeout=10)
+        self._db.row_factory = sqlite3.Row
+        # WAL: Lesen in der GUI blockiert den Abgleich im Hintergrund nicht
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+            with self._db:
+                self._db.execute("DELETE FROM projects")
+                self._db.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+
+    def rows(self) -> list[dict]:
+        """Alle Projekte, neueste zuerst."""
+        cursor = self._db.execute("SELECT * FROM projects ORDER BY mtime DESC")
+        return [dict(row) for row in cursor]
+
+    def sync(self, batch_size: int = 64, should_stop=None) -> Iterator[tuple[list[dict], list[str]]]:
+        """
+        Gleicht den Katalog mit dem Ordner ab. Liefert portionsweise
+        (geänderte oder neue Einträge, entfernte Namen); jede Portion ist
+        bereits gespeichert.
+        """
+        known = {
+            row["name"]: (row["mtime"], row["size"], row["index_mtime"], row["video"])
+            for row in self._db.execute("SELECT name, mtime, size, index_mtime, video FROM projects")
+        }
+        seen = set()
+        batch: list[dict] = []
+        for entry in self._scan():
+            if should_stop and should_stop():
+                return
+            name, mtime, size = entry
+            seen.add(name)
+            old = known.get(name)
+            if old and old[:3] == (mtime, size, _index_mtime(old[3])):
+                continue
+            batch.append(self._read(name, mtime, size))
+            if len(batch) >= batch_size:
+                self._store(batch)
+                yield batch, []
+                batch = []
+        removed = [name for name in known if name not in seen]
+        if removed:
+            with self._db:
+                self._db.executemany("DELETE FROM projects WHERE name = ?", [(n,) for n in removed])
+        self._store(batch)
+        if batch or removed:
+            yield batch, removed
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _scan(self) -> Iterable[tuple[str, float, int]]:
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(PROJECT_SUFFIXES) and entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.name, st.st_mtime, st.st_size
+
+    def _read(self, name: str, mtime: float, size: int) -> dict:
+        row = {"name": name, "mtime": mtime, "size": size, "index_mtime": 0.0}
+        try:
+            row.update(summarize(self.folder / name))
+            row["index_mtime"] = _index_mtime(row["video"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            row.update({key: None for key in COLUMNS if key not in row}, error=str(e))
+        return row
+
+    def _store(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        with self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO projects ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                [tuple(row[c] for c in COLUMNS) for row in rows]
+            )
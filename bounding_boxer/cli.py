@@ -0,0 +1,309 @@
+# cli.py
+"""
+Kommandozeile ohne Qt: python -m bounding_boxer <befehl> PROJEKT... [Optionen]
+
+Befehle: info, validate, export, extract, convert, stats. PROJEKT ist eine
+Projektdatei (*.json, *.bbxp) oder ein Ordner mit *_boxes.json/*_boxes.bbxp.
+Mehrere Projekte laufen parallel in --jobs Prozessen (extract nacheinander,
+dort kodiert bereits ein Prozesspool pro Projekt).
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path, PureWindowsPath
+
+import numpy as np
+
+from config import INPUT_FOLDER, LABEL_CLASSES, EXTRACT_IMAGE_FORMAT, EXTRACT_JPEG_QUALITY
+from exporters import FORMATS, export_project
+from extraction import IMAGE_FORMATS, extract_project
+from frame_index import FrameIndex
+from frame_reader import index_path, probe_video
+from project_format import BBXP_SUFFIX
+from project_manager import ProjectManager
+from tracks import OPEN_END
+
+# Fehler beim Lesen einer Projektdatei (werden pro Projekt gemeldet, nicht abgebrochen)
+PROJECT_ERRORS = (OSError, ValueError, KeyError, IndexError, TypeError)
+
+
+def find_projects(paths: list[str]) -> list[Path]:
+    """Projektdateien aus Dateien und Ordnern (dort *_boxes.json und *_boxes.bbxp)."""
+    projects = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            projects += sorted(
+                f for f in p.iterdir()
+                if f.name.endswith("_boxes.json") or f.name.endswith(f"_boxes{BBXP_SUFFIX}")
+            )
+        else:
+            projects.append(p)
+    return projects
+
+
+def find_video(pm: ProjectManager, project_path: Path) -> Path | None:
+    """
+    Video eines Projekts. Relative Pfade gelten ab dem Arbeitsordner der GUI
+    (zwei Ebenen über data/projects/); Projekte von anderen Rechnern (z.B.
+    Windows-Pfade) finden ihr Video über den Dateinamen im Input-Ordner
+    neben dem Projektordner.
+    """
+    video = Path(pm.video_path)
+    data_dir = project_path.resolve().parent.parent
+    candidates = [
+        video, data_dir.parent / video,
+        data_dir / INPUT_FOLDER.name / PureWindowsPath(str(pm.video_path)).name,
+    ]
+    return next((c for c in candidates if c.is_file()), None)
+
+
+class _Project:
+    """Geladenes Projekt samt Video-Eckdaten (ohne Video: aus den Keyframes geschätzt)."""
+    def __init__(self, path: Path):
+        self.path = path
+        self.pm = ProjectManager.load_project(path)
+        self.video = find_video(self.pm, path)
+        self.frame_size, self.frame_count = (0, 0), 0
+        if self.video:
+            self.pm.video_path = self.video
+            self.frame_size, self.frame_count = probe_video(self.video)
+        else:
+            # Für Dateinamen in Exporten auch bei fremden Pfadtrennern
+            self.pm.video_path = Path(PureWindowsPath(str(self.pm.video_path)).as_posix())
+        if not self.frame_count:
+            # Letzter Keyframe bzw. letztes Track-Ende
+            cols = self.pm.boxes.columns()
+            ends = [e for e in self.pm.track_ends.values() if e != OPEN_END]
+            last = int(cols["frame"].max()) + 1 if len(cols["frame"]) else 0
+            self.frame_count = max([last, *ends])
+
+    def close(self) -> None:
+        self.pm.close()
+
+
+def _run(command, path: Path, args) -> dict:
+    """Führt einen Befehl für ein Projekt aus; Fehler landen im Ergebnis."""
+    try:
+        project = _Project(path)
+    except PROJECT_ERRORS as e:
+        return {"project": str(path), "error": f"Projekt konnte nicht gelesen werden: {e}"}
+    try:
+        return {"project": str(path), **command(project, args)}
+    except PROJECT_ERRORS as e:
+        return {"project": str(path), "error": str(e)}
+    finally:
+        project.close()
+
+
+def _track_count(cols: dict[str, np.ndarray]) -> int:
+    return len(np.unique((cols["label"].astype(np.int64) << 32) | cols["id"].astype(np.int64)))
+
+
+def cmd_info(project: _Project, args) -> dict:
+    pm = project.pm
+    return {
+        "video": str(pm.video_path),
+        "video_found": project.video is not None,
+        "frame_size": list(project.frame_size),
+        "frame_count": project.frame_count,
+        "format": "bbxp" if project.path.suffix == BBXP_SUFFIX else "json",
+        "file_bytes": project.path.stat().st_size,
+        "keyframes": len(pm.boxes),
+        "tracks": _track_count(pm.boxes.columns()),
+        "labeled_frames": len(pm.labeled_frames()),
+        "labels": pm.boxes.label_counts(),
+    }
+
+
+def cmd_validate(project: _Project, args) -> dict:
+    """Prüft ein Projekt auf Fehler; problems leer = in Ordnung."""
+    pm = project.pm
+    problems = []
+    if project.video is None:
+        problems.append(f"Video nicht gefunden: {pm.video_path}")
+    cols = pm.boxes.columns()
+    labels = pm.boxes.labels
+    used = np.unique(cols["label"]).tolist()
+    unknown = [labels[c] for c in used if labels[c] not in LABEL_CLASSES]
+    if unknown:
+        problems.append(f"Unbekannte Label-Klassen: {', '.join(unknown)}")
+    empty = (cols["w"] <= 0) | (cols["h"] <= 0)
+    if empty.any():
+        problems.append(f"{int(empty.sum())} Boxen ohne Fläche, z.B. Frame {int(cols['frame'][empty][0])}")
+    if project.video is not None:
+        width, height = project.frame_size
+        outside = (
+            (cols["x"] >= width) | (cols["y"] >= height)
+            | (cols["x"] + cols["w"] <= 0) | (cols["y"] + cols["h"] <= 0)
+        )
+        if outside.any():
+            problems.append(f"{int(outside.sum())} Boxen außerhalb des Bildes, z.B. Frame {int(cols['frame'][outside][0])}")
+        late = cols["frame"] >= project.frame_count
+        if late.any():
+            problems.append(f"{int(late.sum())} Keyframes nach dem letzten Video-Frame ({project.frame_count})")
+    # Jede (Label, ID) höchstens einmal pro Frame
+    keys = (cols["frame"].astype(np.int64) << 40) | (cols["label"].astype(np.int64) << 32) | cols["id"].astype(np.int64)
+    duplicates = len(keys) - len(np.unique(keys))
+    if duplicates:
+        problems.append(f"{duplicates} doppelte Box-IDs innerhalb eines Frames")
+    # Neue Boxen dürfen keine vorhandene ID bekommen
+    for code in used:
+        label = labels[code]
+        highest = int(cols["id"][cols["label"] == code].max())
+        if pm.label_counters.get(label, 0) < highest:
+            problems.append(f"Zähler für '{label}' ({pm.label_counters.get(label, 0)}) unter der höchsten ID {highest}")
+    return {"ok": not problems, "problems": problems, "journal_pending": pm.unsaved_changes()}
+
+
+def cmd_stats(project: _Project, args) -> dict:
+    """Boxen pro Label: Tracks, Keyframes und alle Boxen inkl. interpolierter."""
+    pm = project.pm
+    labels = pm.boxes.labels
+    cols = pm.boxes.columns()
+    size = len(labels)
+    keys = np.unique((cols["label"].astype(np.int64) << 32) | cols["id"].astype(np.int64))
+    tracks = np.bincount(keys >> 32, minlength=size)
+    keyframes = np.bincount(cols["label"].astype(np.int64), minlength=size)
+    boxes = np.zeros(size, np.int64)
+    area = np.zeros(size, np.float64)
+    frames = 0
+    for _, _, codes, geo in pm.iter_frames(project.frame_count):
+        codes = codes.astype(np.int64)
+        boxes += np.bincount(codes, minlength=size)
+        area += np.bincount(codes, geo[:, 2].astype(np.float64) * geo[:, 3], minlength=size)
+        frames += 1
+    per_label = {
+        labels[c]: {
+            "tracks": int(tracks[c]), "keyframes": int(keyframes[c]), "boxes": int(boxes[c]),
+            "mean_area": round(float(area[c] / boxes[c]), 1) if boxes[c] else 0.0,
+        }
+        for c in range(size) if tracks[c] or keyframes[c]
+    }
+    return {"frames_with_boxes": frames, "frame_count": project.frame_count, "labels": per_label}
+
+
+def cmd_export(project: _Project, args) -> dict:
+    _, _, suffix = FORMATS[args.format]
+    name = Path(project.pm.video_path).stem
+    target = Path(args.output) / f"{name}_{args.format}{suffix or ''}"
+    if project.video is None:
+        print(f"Warnung: Video zu {project.path} nicht gefunden, Auflösung unbekannt.", file=sys.stderr)
+    count = export_project(project.pm, args.format, target, project.frame_size, project.frame_count)
+    return {"target": str(target), "boxes": count}
+
+
+def cmd_extract(project: _Project, args) -> dict:
+    if project.video is None:
+        raise OSError(f"Video nicht gefunden: {project.pm.video_path}")
+    target = Path(args.output) / Path(project.pm.video_path).stem
+    frame_index = FrameIndex.load(index_path(project.video), project.video)
+    report = extract_project(
+        project.pm, target, project.frame_count, frame_index, args.keyframes_only,
+        full_frames=not args.no_frames, crops=not args.no_crops,
+        image_format=args.image_format, quality=args.quality,
+        workers=args.jobs, queue_size=2 * args.jobs
+    )
+    return {
+        "target": str(target), "frames": report.frames, "skipped": report.skipped,
+        "files": report.files, "bytes": report.bytes, "seconds": round(report.seconds, 2),
+        "fps": round(report.fps, 1), "summary": report.summary(),
+    }
+
+
+def cmd_convert(project: _Project, args) -> dict:
+    suffix = BBXP_SUFFIX if args.to == "bbxp" else ".json"
+    source = project.path
+    folder = Path(args.output) if args.output else source.parent
+    target = folder / (source.stem + suffix)
+    if target.resolve() == source.resolve():
+        return {"target": str(target), "skipped": True}
+    project.close()
+    ProjectManager.convert(source, target)
+    return {"target": str(target), "skipped": False}
+
+
+COMMANDS = {
+    "info": (cmd_info, "Eckdaten von Projekt und Video"),
+    "validate": (cmd_validate, "Projekt auf Fehler prüfen (Exit-Code 1 bei Problemen)"),
+    "stats": (cmd_stats, "Tracks, Keyframes und Boxen pro Label"),
+    "export": (cmd_export, "Export nach YOLO, COCO oder MOTChallenge"),
+    "extract": (cmd_extract, "Frames und Box-Ausschnitte als Bilddateien extrahieren"),
+    "convert": (cmd_convert, "Projektdatei nach JSON bzw. .bbxp konvertieren"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bounding_boxer", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Anzahl paralleler Prozesse")
+    parser.add_argument("--json", action="store_true", help="Ergebnisse als JSON-Zeilen ausgeben")
+    # Die globalen Optionen gelten auch hinter dem Befehl
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-j", "--jobs", type=int, default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    common.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    parsers = {}
+    for name, (_, help_text) in COMMANDS.items():
+        parsers[name] = p = sub.add_parser(name, help=help_text, description=help_text, parents=[common])
+        p.add_argument("projects", nargs="+", help="Projektdateien oder Ordner")
+    parsers["export"].add_argument("--format", choices=list(FORMATS), required=True)
+    parsers["export"].add_argument("-o", "--output", required=True, help="Zielordner")
+    extract = parsers["extract"]
+    extract.add_argument("-o", "--output", required=True, help="Zielordner (ein Unterordner pro Video)")
+    extract.add_argument("--keyframes-only", action="store_true", help="nur Frames mit Keyframes")
+    extract.add_argument("--image-format", choices=IMAGE_FORMATS, default=EXTRACT_IMAGE_FORMAT)
+    extract.add_argument("--quality", type=int, default=EXTRACT_JPEG_QUALITY, help="JPEG-Qualität")
+    extract.add_argument("--no-frames", action="store_true", help="keine vollen Frames")
+    extract.add_argument("--no-crops", action="store_true", help="keine Box-Ausschnitte")
+    parsers["convert"].add_argument("--to", choices=["json", "bbxp"], required=True)
+    parsers["convert"].add_argument("-o", "--output", help="Zielordner (Standard: neben der Quelle)")
+    return parser
+
+
+def format_result(command: str, result: dict) -> str:
+    """Menschenlesbare Ausgabe eines Ergebnisses."""
+    lines = [result["project"]]
+    if "error" in result:
+        lines.append(f"  Fehler: {result['error']}")
+    elif command == "validate":
+        lines += [f"  - {p}" for p in result["problems"]] or ["  ok"]
+        if result["journal_pending"]:
+            lines.append(f"  Journal: {result['journal_pending']} nicht übernommene Einträge")
+    elif command == "stats":
+        lines.append(f"  Frames mit Boxen: {result['frames_with_boxes']} / {result['frame_count']}")
+        for label, s in result["labels"].items():
+            lines.append(
+                f"  {label}: {s['tracks']} Tracks, {s['keyframes']} Keyframes, "
+                f"{s['boxes']} Boxen, mittlere Fläche {s['mean_area']} px²"
+            )
+    elif command == "extract":
+        lines.append(f"  {result['target']}: {result['summary']}")
+    else:
+        lines += [f"  {key}: {value}" for key, value in result.items() if key != "project"]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    projects = find_projects(args.projects)
+    if not projects:
+        print("Keine Projekte gefunden.", file=sys.stderr)
+        return 1
+    command, _ = COMMANDS[args.command]
+    args.jobs = max(1, args.jobs)
+    if args.command == "extract" or args.jobs == 1 or len(projects) == 1:
+        results = (_run(command, p, args) for p in projects)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(min(args.jobs, len(projects)))
+        results = pool.map(_run, [command] * len(projects), projects, [args] * len(projects))
+    failed = False
+    try:
+        for result in results:
+            failed |= "error" in result or result.get("ok") is False
+            print(json.dumps(result) if args.json else format_result(args.command, result), flush=True)
+    finally:
+        if pool:
+            pool.shutdown()
+    return 1 if failed else 0
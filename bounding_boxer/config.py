@@ -1,11 +1,22 @@
 # config.py
+import os
 from pathlib import Path
-from PyQt5.QtGui import QPen, QColor
-from PyQt5.QtCore import Qt
 
 # Ordner für Eingabe-Videos und Projektdateien
 INPUT_FOLDER: Path = Path("data") / "input"
 PROJECT_FOLDER: Path = Path("data") / "projects"
+# Persistenter Frame-Speicher (ein Unterordner pro Video)
+FRAME_STORE_FOLDER: Path = Path("data") / "frames"
+# Thumbnail-Cache der Zeitleiste
+THUMBNAIL_FOLDER: Path = Path("data") / "thumbnails"
+# Standardziel für Exporte (YOLO, COCO, MOT)
+EXPORT_FOLDER: Path = Path("data") / "exports"
+# Standardziel für extrahierte Datensätze (Frames und Box-Ausschnitte)
+DATASET_FOLDER: Path = Path("data") / "datasets"
+# Projektkatalog der Startseite (SQLite, wird aus den Projektdateien neu aufgebaut)
+CATALOG_PATH: Path = Path("data") / "catalog.sqlite"
+# Wartezeit nach einer Änderung im Projektordner bis zum Abgleich des Katalogs
+CATALOG_SYNC_DELAY_MS = 500
 
 # Unterstützte Video-Formate
 SUPPORTED_FORMATS = [".mp4", ".avi", ".mov", ".mkv", ".flv", ".webm"]
@@ -14,67 +25,62 @@ SUPPORTED_FORMATS = [".mp4", ".avi", ".mov", ".mkv", ".flv", ".webm"]
 MIN_WINDOW_WIDTH: int = 800
 MIN_WINDOW_HEIGHT: int = 600
 
+# Pens: (Farbe RGB, Stärke, Linienstil "solid" | "dash" | "dot").
+# config.py bleibt ohne Qt-Import (Kommandozeile); die QPen-Objekte baut styles.py.
+
 # Status-Bar Toggles und Pens
 SHOW_STATUS_WINDOW_COORDS: bool = True
-STATUS_WINDOW_COORDS_PEN = QPen(QColor(0, 0, 0))  # Schwarz
-STATUS_WINDOW_COORDS_PEN.setWidth(1)
-STATUS_WINDOW_COORDS_PEN.setStyle(Qt.SolidLine)
+STATUS_WINDOW_COORDS_PEN = ((0, 0, 0), 1, "solid")  # Schwarz
 
 SHOW_STATUS_IMAGE_COORDS: bool = True
-STATUS_IMAGE_COORDS_PEN = QPen(QColor(0, 0, 255))  # Blau
-STATUS_IMAGE_COORDS_PEN.setWidth(1)
-STATUS_IMAGE_COORDS_PEN.setStyle(Qt.SolidLine)
+STATUS_IMAGE_COORDS_PEN = ((0, 0, 255), 1, "solid")  # Blau
 
 SHOW_STATUS_ZOOM: bool = True
-STATUS_ZOOM_PEN = QPen(QColor(255, 0, 255))  # Magenta
-STATUS_ZOOM_PEN.setWidth(1)
-STATUS_ZOOM_PEN.setStyle(Qt.SolidLine)
+STATUS_ZOOM_PEN = ((255, 0, 255), 1, "solid")  # Magenta
+
+# Mindestabstand (ms) zwischen zwei Aktualisierungen der Koordinaten/Zoom-Anzeige
+STATUS_UPDATE_INTERVAL_MS: int = 50
 
 # Bounding-Box Pen
-BOUNDING_BOX_PEN = QPen(QColor(255, 0, 0))  # Rot
-BOUNDING_BOX_PEN.setWidth(2)
-BOUNDING_BOX_PEN.setStyle(Qt.SolidLine)
+BOUNDING_BOX_PEN = ((255, 0, 0), 2, "solid")  # Rot
 
 # === Pen zum Aufziehen neuer Bounding-Boxes ===
-DRAWING_BOX_PEN = QPen(QColor(200, 200, 200))  # Grau
-DRAWING_BOX_PEN.setWidth(1)
-DRAWING_BOX_PEN.setStyle(Qt.DashLine)
+DRAWING_BOX_PEN = ((200, 200, 200), 1, "dash")  # Grau
 
 # Hover-Zustand (Pre-Select)
-PRESELECTED_BOX_PEN = QPen(QColor(255, 165, 0))  # Orange
-PRESELECTED_BOX_PEN.setWidth(2)
-PRESELECTED_BOX_PEN.setStyle(Qt.DashLine)
+PRESELECTED_BOX_PEN = ((255, 165, 0), 2, "dash")  # Orange
 
 # Aktivierte Box (Select)
-SELECTED_BOX_PEN = QPen(QColor(0, 255, 0))  # Grün
-SELECTED_BOX_PEN.setWidth(2)
-SELECTED_BOX_PEN.setStyle(Qt.SolidLine)
+SELECTED_BOX_PEN = ((0, 255, 0), 2, "solid")  # Grün
+
+# Vorgeschlagene Boxen (Propagation), noch nicht übernommen
+PROPOSAL_BOX_PEN = ((0, 255, 255), 2, "dot")  # Cyan
 
 # === Label-Klassen-Konfiguration ===
 # Hier definierst du deine Klassen und kannst pro Klasse beliebig viele Features anlegen.
 # Format: "klasse_schluessel": {
 #    "display_name": <Anzeigename>,
-#    "color": QColor(...),
+#    "color": (R, G, B),
 #    "features": { <beliebige Schlüssel-Werte-Paare> }
 # }
 LABEL_CLASSES: dict[str, dict] = {
     "person": {
         "display_name": "Person",
-        "color": QColor(0, 200, 0),  # Grün
+        "color": (0, 200, 0),  # Grün
         "features": {
             # z.B.: "occluded": False
         }
     },
     "car": {
         "display_name": "Car",
-        "color": QColor(0, 0, 255),  # Blau
+        "color": (0, 0, 255),  # Blau
         "features": {
             # z.B.: "license_plate": None
         }
     },
     "truck": {
         "display_name": "Truck",
-        "color": QColor(200, 0, 0),  # Rot
+        "color": (200, 0, 0),  # Rot
         "features": {}
     },
     # Weitere Klassen hier hinzufügen...
@@ -82,4 +88,88 @@ LABEL_CLASSES: dict[str, dict] = {
 
 # === Steuerbutton-Gruppe ===
 BUTTON_GROUP_POSITION_X: int = 25  # Abstand von links in Pixel
-BUTTON_GROUP_POSITION_Y: int = 25  # Abstand von unten in Pixel
\ No newline at end of file
+BUTTON_GROUP_POSITION_Y: int = 25  # Abstand von unten in Pixel
+
+# === Frame-Cache (VideoLoader) ===
+# Stufe 1: fertig dekodierte Frames (LRU), Budget in Bytes
+FRAME_CACHE_BYTES: int = 1024 * 1024 * 1024  # 1 GiB
+# Stufe 2: komprimierte Kopien verdrängter Frames, Budget in Bytes
+FRAME_CACHE_COMPRESSED_BYTES: int = 512 * 1024 * 1024  # 512 MiB
+# Kompressionsformat der zweiten Stufe (".jpg" oder ".png")
+FRAME_CACHE_CODEC: str = ".jpg"
+FRAME_CACHE_JPEG_QUALITY: int = 90
+
+# === Read-Ahead (Hintergrund-Decoder) ===
+# Anzahl Frames, die in Bewegungsrichtung bzw. entgegen vorab dekodiert werden
+PREFETCH_AHEAD: int = 8
+PREFETCH_BEHIND: int = 2
+
+# === Seeking ===
+# Sprünge vorwärts bis zu dieser Frame-Anzahl werden per grab() statt per Seek erledigt
+SEQUENTIAL_GRAB_LIMIT: int = 30
+
+# === Proxy-Stufen (Auflösungspyramide) ===
+# Höchste Stufe: 1 = 1/2, 2 = 1/4, 3 = 1/8 der vollen Auflösung
+PROXY_LEVELS: int = 3
+
+# === Persistenter Frame-Speicher ===
+FRAME_STORE_ENABLED: bool = True
+# Größenlimit pro Video in Bytes
+FRAME_STORE_MAX_BYTES: int = 8 * 1024 * 1024 * 1024  # 8 GiB
+# Größe einer Segmentdatei; beim Überschreiten des Limits fällt das älteste Segment weg
+FRAME_STORE_SEGMENT_BYTES: int = 256 * 1024 * 1024  # 256 MiB
+
+# === Zeitleiste (Filmstrip) ===
+FILMSTRIP_HEIGHT: int = 72
+THUMBNAIL_HEIGHT: int = 64
+# Ungefähre Anzahl Vorschaubilder pro Video
+THUMBNAIL_COUNT: int = 300
+
+# === Canvas-Rendering ===
+# Nach dieser Ruhezeit (ms) ohne Zoom/Pan/Drag wird der Hintergrund geglättet neu gerendert
+SMOOTH_RENDER_DELAY_MS: int = 150
+# Kachelgröße (Bildschirm-Pixel) und maximale Anzahl gecachter Hintergrund-Kacheln
+TILE_SIZE: int = 256
+TILE_CACHE_TILES: int = 256
+# Boxen, die auf dem Bildschirm schmaler/niedriger sind, werden ohne Label und Handles gezeichnet
+BOX_DETAIL_MIN_PX: int = 12
+
+# === Annotationen ===
+# Abstand (ms), in dem das Journal im Hintergrund in die Projektdatei übernommen wird
+AUTOSAVE_INTERVAL_MS: int = 60_000
+# Anzahl Frames, die als Listen gehalten werden, bevor Änderungen in die Spalten-Arrays übernommen werden
+ANNOTATION_OVERLAY_FRAMES: int = 64
+
+# === Propagation (Boxen automatisch weiterverfolgen) ===
+# Anzahl Frames, über die ab dem aktuellen Frame verfolgt wird
+PROPAGATION_FRAMES: int = 30
+# Standardverfahren: "flow" (optischer Fluss, immer verfügbar), "csrt", "kcf" oder "mil"
+PROPAGATION_METHOD: str = "flow"
+# Anzahl paralleler Tracker-Threads
+PROPAGATION_WORKERS: int = max(1, min(8, (os.cpu_count() or 2) - 1))
+# Breitere Videos werden für das Tracking verkleinert (Pixel)
+PROPAGATION_MAX_WIDTH: int = 1280
+# Beim Übernehmen bleiben nur Keyframes, ohne die die Interpolation weiter abweicht (Pixel)
+PROPAGATION_KEYFRAME_TOLERANCE_PX: float = 2.0
+
+# === Datensatz-Extraktion (Frames und Box-Ausschnitte als Bilddateien) ===
+# Bildformat ("jpg" oder "png") und JPEG-Qualität
+EXTRACT_IMAGE_FORMAT: str = "jpg"
+EXTRACT_JPEG_QUALITY: int = 95
+# Anzahl Encoder-Prozesse und gleichzeitig gepufferter Frames (begrenzt den Speicherbedarf)
+EXTRACT_WORKERS: int = max(1, min(8, (os.cpu_count() or 2) - 1))
+EXTRACT_QUEUE_SIZE: int = 2 * EXTRACT_WORKERS
+
+# === Zeitmessung (Diagnose-Menü, Leistungsanzeige und Chrome-Trace) ===
+# Messung schon beim Start aktiv (sonst erst über das Diagnose-Menü)
+PROFILE_ENABLED: bool = False
+# Anzahl letzter Messungen pro Messpunkt für p50/p95/max
+PROFILE_WINDOW: int = 512
+# Anzahl gepufferter Einzelereignisse für den Trace-Export
+PROFILE_TRACE_EVENTS: int = 100000
+# Aktualisierungsabstand der Leistungsanzeige auf dem Canvas
+PROFILE_HUD_INTERVAL_MS: int = 500
+
+# === Räumlicher Index für Box-Hit-Tests ===
+# Zellgröße des Gitters in Bildpixeln
+SPATIAL_INDEX_CELL: int = 128
@@ -0,0 +1,207 @@
+# exporters.py
+import json
+import os
+import re
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+# (frame, ids, Label-Codes, Geometrie n x 4) wie von ProjectManager.iter_frames
+Frames = Iterator[tuple[int, np.ndarray, np.ndarray, np.ndarray]]
+Progress = Callable[[int], None] | None
+
+
+def frame_file_name(name: str, frame: int, ext: str = ".jpg") -> str:
+    """Dateiname eines Frames in Exporten und extrahierten Datensätzen."""
+    return f"{name}_{frame:06d}{ext}"
+
+
+def clip_boxes(geo: np.ndarray, frame_size: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Schneidet Boxen auf das Bild zu; gibt (x, y, w, h) und Maske der nicht leeren Boxen zurück."""
+    width, height = frame_size
+    x0 = np.clip(geo[:, 0], 0, width)
+    y0 = np.clip(geo[:, 1], 0, height)
+    x1 = np.clip(geo[:, 0] + geo[:, 2], 0, width)
+    y1 = np.clip(geo[:, 1] + geo[:, 3], 0, height)
+    keep = (x1 > x0) & (y1 > y0)
+    return np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)[keep], keep
+
+
+def _format_rows(rows: np.ndarray, line: str) -> str:
+    """Formatiert alle Zeilen auf einmal (deutlich schneller als np.savetxt pro Frame)."""
+    return (line * len(rows)) % tuple(rows.ravel().tolist())
+
+
+@contextmanager
+def _atomic_open(path: Path, mode: str = "w"):
+    """Schreibt in eine Temp-Datei und ersetzt das Ziel erst nach Erfolg."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, mode, encoding="utf-8", newline="\n") as f:
+            yield f
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def export_yolo(
+    frames: Frames,
+    labels: list[str],
+    target: Path,
+    frame_size: tuple[int, int],
+    name: str,
+    progress: Progress = None
+) -> int:
+    """
+    YOLO: pro Frame target/labels/<name>_<frame>.txt mit Zeilen
+    "klasse cx cy w h" (normiert auf die Videoauflösung), Klassennamen in
+    target/classes.txt (Zeile = Klassen-Index = Label-Code). Label-Dateien
+    dieses Videos aus früheren Läufen, deren Frame keine Boxen mehr hat,
+    werden nach einem vollständigen Lauf gelöscht; Dateien anderer Videos
+    im selben Ordner bleiben unberührt.
+    """
+    label_dir = target / "labels"
+    label_dir.mkdir(parents=True, exist_ok=True)
+    (target / "classes.txt").write_text("".join(f"{label}\n" for label in labels), encoding="utf-8")
+    scale = np.array(frame_size * 2, np.float64)
+    count = 0
+    written = set()
+    for frame, _, codes, geo in frames:
+        if progress:
+            progress(frame)
+        rects, keep = clip_boxes(geo.astype(np.float64), frame_size)
+        if not len(rects):
+            continue
+        rects[:, :2] += rects[:, 2:] / 2
+        rows = np.column_stack([codes[keep], rects / scale])
+        file_name = frame_file_name(name, frame, ".txt")
+        (label_dir / file_name).write_text(_format_rows(rows, "%d %.6f %.6f %.6f %.6f\n"), encoding="utf-8")
+        written.add(file_name)
+        count += len(rows)
+    # Veraltete Label-Dateien dieses Videos entfernen (nur exakt <name>_<frame>.txt)
+    own = re.compile(re.escape(name) + r"_\d{6,}\.txt")
+    for path in label_dir.iterdir():
+        if path.name not in written and own.fullmatch(path.name):
+            path.unlink(missing_ok=True)
+    return count
+
+
+def export_coco(
+    frames: Frames,
+    labels: list[str],
+    target: Path,
+    frame_size: tuple[int, int],
+    name: str,
+    progress: Progress = None
+) -> int:
+    """
+    COCO-JSON, inkrementell geschrieben: Bilder direkt in die Zieldatei,
+    Annotationen in eine Temp-Datei, die am Ende angehängt wird. Nur Frames
+    mit Boxen werden Bilder (id = Frame + 1); track_id kennzeichnet den Track.
+    """
+    width, height = frame_size
+    spill = target.with_name(target.name + ".annotations")
+    count = images = 0
+    tracks: dict[int, int] = {}
+    try:
+        with _atomic_open(target) as out:
+            header = {
+                "info": {"description": name, "video": name},
+                "categories": [{"id": code + 1, "name": label} for code, label in enumerate(labels)],
+            }
+            out.write(json.dumps(header)[:-1] + ', "images": [')
+            with open(spill, "w", encoding="utf-8") as annotations:
+                for frame, ids, codes, geo in frames:
+                    if progress:
+                        progress(frame)
+                    rects, keep = clip_boxes(geo.astype(np.int64), frame_size)
+                    if not len(rects):
+                        continue
+                    image = {
+                        "id": frame + 1, "file_name": frame_file_name(name, frame),
+                        "width": width, "height": height, "frame_id": frame,
+                    }
+                    out.write(("," if images else "") + json.dumps(image))
+                    images += 1
+                    for _id, code, (x, y, w, h) in zip(ids[keep].tolist(), codes[keep].tolist(), rects.tolist()):
+                        track = tracks.setdefault((code << 32) | _id, len(tracks) + 1)
+                        count += 1
+                        annotations.write(("," if count > 1 else "") + json.dumps({
+                            "id": count, "image_id": frame + 1, "category_id": code + 1,
+                            "bbox": [x, y, w, h], "area": w * h, "iscrowd": 0, "track_id": track,
+                        }))
+            out.write('], "annotations": [')
+            with open(spill, encoding="utf-8") as annotations:
+                while block := annotations.read(1 << 20):
+                    out.write(block)
+            out.write("]}")
+    finally:
+        spill.unlink(missing_ok=True)
+    return count
+
+
+def export_mot(
+    frames: Frames,
+    labels: list[str],
+    target: Path,
+    frame_size: tuple[int, int],
+    name: str,
+    progress: Progress = None
+) -> int:
+    """
+    MOTChallenge-CSV (Ground-Truth-Format): frame, id, left, top, width,
+    height, conf, class, visibility. Frames beginnen bei 1, Track-IDs werden
+    über alle Labels eindeutig fortlaufend vergeben, class = Label-Code + 1.
+    """
+    tracks: dict[int, int] = {}
+    count = 0
+    with _atomic_open(target) as out:
+        for frame, ids, codes, geo in frames:
+            if progress:
+                progress(frame)
+            rects, keep = clip_boxes(geo.astype(np.int64), frame_size)
+            if not len(rects):
+                continue
+            codes = codes[keep].astype(np.int64)
+            track_ids = [
+                tracks.setdefault((code << 32) | _id, len(tracks) + 1)
+                for _id, code in zip(ids[keep].tolist(), codes.tolist())
+            ]
+            rows = np.column_stack([
+                np.full(len(rects), frame + 1), track_ids, rects,
+                np.ones(len(rects), np.int64), codes + 1, np.ones(len(rects), np.int64)
+            ])
+            out.write(_format_rows(rows, "%d,%d,%d,%d,%d,%d,%d,%d,%d\n"))
+            count += len(rows)
+    return count
+
+
+# Format -> (Anzeigename, Exporter, Dateiendung; None = Zielordner)
+FORMATS: dict[str, tuple[str, Callable, str | None]] = {
+    "yolo": ("YOLO (txt)", export_yolo, None),
+    "coco": ("COCO (JSON)", export_coco, ".json"),
+    "mot": ("MOTChallenge (CSV)", export_mot, ".txt"),
+}
+
+
+def export_project(
+    project,
+    fmt: str,
+    target: Path,
+    frame_size: tuple[int, int],
+    frame_count: int,
+    progress: Progress = None
+) -> int:
+    """
+    Exportiert alle Boxen (Keyframes und interpolierte) eines ProjectManager
+    Frame für Frame. frame_size und frame_count kommen vom VideoLoader
+    oder aus frame_reader.probe_video. Gibt die Anzahl exportierter Boxen zurück.
+    """
+    _, exporter, _ = FORMATS[fmt]
+    frames = project.iter_frames(frame_count)
+    name = Path(project.video_path).stem
+    return exporter(frames, list(project.boxes.labels), Path(target), frame_size, name, progress)
+
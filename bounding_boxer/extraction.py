@@ -0,0 +1,285 @@
+# extraction.py
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+
+from exporters import Frames, Progress, clip_boxes, frame_file_name
+from frame_index import FrameIndex
+from frame_reader import FrameReader
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+MANIFEST_NAME = "manifest.jsonl"
+IMAGE_FORMATS = ("jpg", "png")
+
+# Im Worker-Prozess: bereits angehängte Shared-Memory-Slots nach Name
+_attached: dict[str, SharedMemory] = {}
+
+
+def _encode_frame(slot: str, shape: tuple[int, ...], jobs: list[tuple[str, tuple | None]], params: list[int]) -> tuple[int, int]:
+    """
+    Läuft im Worker-Prozess: kodiert den Frame aus einem Shared-Memory-Slot
+    ganz (rect None) bzw. als Ausschnitte und schreibt die Dateien atomar.
+    Gibt (Anzahl Dateien, geschriebene Bytes) zurück.
+    """
+    shm = _attached.get(slot)
+    if shm is None:
+        shm = _attached[slot] = SharedMemory(slot)
+    image = np.ndarray(shape, np.uint8, shm.buf)
+    written = 0
+    for path, rect in jobs:
+        if rect is not None:
+            x, y, w, h = rect
+            part = image[y:y + h, x:x + w]
+        else:
+            part = image
+        ok, data = cv2.imencode(Path(path).suffix, part, params)
+        if not ok:
+            raise OSError(f"{path} konnte nicht kodiert werden.")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        written += len(data)
+    return len(jobs), written
+
+
+class ExtractionReport:
+    """Ergebnis und Durchsatz einer Extraktion."""
+    def __init__(self):
+        self.frames = 0
+        self.skipped = 0
+        # Frames früherer Läufe ohne Boxen, deren Dateien entfernt wurden
+        self.removed = 0
+        self.files = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        # Zeit im Decoder bzw. beim Warten auf freie Slots (Encoder ausgelastet)
+        self.decode_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.frames} Frames ({self.skipped} übersprungen, {self.removed} entfernt), {self.files} Dateien, "
+            f"{self.bytes / 1e6:.1f} MB in {self.seconds:.1f} s = {self.fps:.1f} Frames/s "
+            f"(Dekodieren {self.decode_seconds:.1f} s, Warten auf Encoder {self.wait_seconds:.1f} s)"
+        )
+
+
+def _read_manifest(path: Path, settings: dict) -> dict[int, list]:
+    """
+    Bereits extrahierte Frames (Frame -> Boxen) aus dem Manifest. Eine bei
+    einem Abbruch halb geschriebene letzte Zeile wird ignoriert; spätere
+    Einträge eines Frames ersetzen frühere.
+    """
+    if not path.exists():
+        return {}
+    done: dict[int, list] = {}
+    with open(path, encoding="utf-8") as f:
+        lines = iter(f)
+        header = json.loads(next(lines, "{}") or "{}")
+        if header != settings:
+            raise ValueError(f"{path.parent} enthält eine Extraktion mit anderen Einstellungen.")
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            done[entry["frame"]] = entry["boxes"]
+    return done
+
+
+def _remove_stale(target: Path, settings: dict, stale: dict[int, list], name: str, ext: str) -> None:
+    """
+    Entfernt Bild, Ausschnitte und Manifest-Einträge der Frames in stale
+    (Frame -> Boxen laut Manifest). Das Manifest wird dabei atomar mit nur
+    noch einem Eintrag pro Frame neu geschrieben.
+    """
+    for frame, boxes in stale.items():
+        (target / "images" / frame_file_name(name, frame, ext)).unlink(missing_ok=True)
+        for label, _id, *_ in boxes:
+            (target / "crops" / label / frame_file_name(name, frame, f"_{_id}{ext}")).unlink(missing_ok=True)
+    manifest_path = target / MANIFEST_NAME
+    entries = _read_manifest(manifest_path, settings)
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(settings) + "\n")
+        for frame in sorted(entries.keys() - stale.keys()):
+            f.write(json.dumps({"frame": frame, "boxes": entries[frame]}) + "\n")
+    os.replace(tmp, manifest_path)
+
+
+def extract_dataset(
+    frames: Frames,
+    labels: list[str],
+    video_path: Path,
+    frame_index: FrameIndex | None,
+    target: Path,
+    name: str,
+    full_frames: bool = True,
+    crops: bool = True,
+    image_format: str = "jpg",
+    quality: int = 95,
+    workers: int = 4,
+    queue_size: int = 8,
+    progress: Progress = None
+) -> ExtractionReport:
+    """
+    Schreibt Frames mit Boxen nach target/images/<name>_<frame>.<ext> und
+    die Boxen als Ausschnitte nach target/crops/<label>/<name>_<frame>_<id>.<ext>.
+    Das Video wird genau einmal aufsteigend dekodiert; jeder Frame wird in
+    einen von queue_size Shared-Memory-Slots kopiert und in einem Pool aus
+    workers Prozessen kodiert. Sind alle Slots belegt, wartet der Decoder
+    (Gegendruck), sodass der Speicherbedarf begrenzt bleibt. Fertige Frames
+    stehen in target/manifest.jsonl; ein erneuter Aufruf überspringt sie,
+    solange sich ihre Boxen nicht geändert haben. Nach einem vollständigen
+    Lauf werden Dateien und Manifest-Einträge von Frames entfernt, die
+    diesmal nicht mehr entstanden sind (z.B. alle Boxen gelöscht).
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unbekanntes Bildformat: {image_format}")
+    ext = f".{image_format}"
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if image_format == "jpg" else [cv2.IMWRITE_PNG_COMPRESSION, 3]
+    settings = {"video": name, "format": image_format, "quality": quality, "frames": full_frames, "crops": crops}
+    target = Path(target)
+    manifest_path = target / MANIFEST_NAME
+    done = _read_manifest(manifest_path, settings)
+    image_dir = target / "images"
+    if full_frames:
+        image_dir.mkdir(parents=True, exist_ok=True)
+    if crops:
+        for label in labels:
+            (target / "crops" / label).mkdir(parents=True, exist_ok=True)
+
+    report = ExtractionReport()
+    start = time.perf_counter()
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise OSError(f"Video {video_path} konnte nicht geöffnet werden.")
+    reader = FrameReader(cap, frame_index)
+    slots: list[SharedMemory] = []
+    free: list[SharedMemory] = []
+    # (Frame, Boxen, Slot, Future) in Einreichungsreihenfolge
+    pending: deque[tuple[int, list, SharedMemory, Future]] = deque()
+    # Frames, deren Stand in target diesem Lauf entspricht (oder nicht lesbar war)
+    produced: set[int] = set()
+    manifest = None
+    pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def finish_oldest():
+        frame, boxes, slot, future = pending.popleft()
+        files, written = future.result()
+        free.append(slot)
+        manifest.write(json.dumps({"frame": frame, "boxes": boxes}) + "\n")
+        manifest.flush()
+        report.frames += 1
+        report.files += files
+        report.bytes += written
+
+    try:
+        new = not manifest_path.exists()
+        manifest = open(manifest_path, "a", encoding="utf-8")
+        if new:
+            manifest.write(json.dumps(settings) + "\n")
+        for frame, ids, codes, geo in frames:
+            if progress:
+                progress(frame)
+            boxes = [[labels[c], i, *g] for i, c, g in zip(ids.tolist(), codes.tolist(), geo.tolist())]
+            previous = done.get(frame)
+            if previous == boxes:
+                produced.add(frame)
+                report.skipped += 1
+                continue
+            t = time.perf_counter()
+            image = reader.read(frame)
+            report.decode_seconds += time.perf_counter() - t
+            if image is None:
+                # Frühere Ausgabe behalten, sie lässt sich nicht ersetzen
+                produced.add(frame)
+                print(f"Fehler: Frame {frame} konnte nicht gelesen werden.")
+                continue
+
+            jobs: list[tuple[str, tuple | None]] = []
+            if full_frames:
+                jobs.append((str(image_dir / frame_file_name(name, frame, ext)), None))
+            if crops:
+                height, width = image.shape[:2]
+                rects, keep = clip_boxes(geo.astype(np.int64), (width, height))
+                for box, rect in zip(np.flatnonzero(keep).tolist(), rects.tolist()):
+                    path = target / "crops" / labels[codes[box]] / frame_file_name(name, frame, f"_{ids[box]}{ext}")
+                    jobs.append((str(path), tuple(rect)))
+                # Ausschnitte von Boxen, die es nicht mehr gibt
+                current = {(label, _id) for label, _id, *_ in boxes}
+                for label, _id, *_ in previous or ():
+                    if (label, _id) not in current:
+                        (target / "crops" / label / frame_file_name(name, frame, f"_{_id}{ext}")).unlink(missing_ok=True)
+            if not jobs:
+                continue
+            produced.add(frame)
+
+            t = time.perf_counter()
+            while len(pending) >= queue_size:
+                finish_oldest()
+            report.wait_seconds += time.perf_counter() - t
+            if not free and len(slots) < queue_size:
+                slots.append(SharedMemory(create=True, size=image.nbytes))
+                free.append(slots[-1])
+            slot = free.pop()
+            view = np.ndarray(image.shape, np.uint8, slot.buf)
+            view[...] = image
+            del view
+            pending.append((frame, boxes, slot, pool.submit(_encode_frame, slot.name, image.shape, jobs, params)))
+        while pending:
+            finish_oldest()
+    finally:
+        # Bei Abbruch laufende Aufträge noch fertig werden lassen, dann Slots freigeben
+        pool.shutdown(wait=True, cancel_futures=True)
+        if manifest:
+            manifest.close()
+        cap.release()
+        for slot in slots:
+            slot.close()
+            slot.unlink()
+        report.seconds = time.perf_counter() - start
+    stale = {frame: boxes for frame, boxes in done.items() if frame not in produced}
+    if stale:
+        _remove_stale(target, settings, stale, name, ext)
+        report.removed = len(stale)
+    return report
+
+
+def extract_project(
+    project,
+    target: Path,
+    frame_count: int,
+    frame_index: FrameIndex | None = None,
+    keyframes_only: bool = False,
+    **options
+) -> ExtractionReport:
+    """
+    Extrahiert die Frames eines ProjectManager mit Boxen (Keyframes und
+    interpolierte, mit keyframes_only nur die Keyframes). options wie bei
+    extract_dataset.
+    """
+    frames = project.iter_frames(frame_count)
+    if keyframes_only:
+        keyframes = set(project.labeled_frames())
+        frames = (item for item in frames if item[0] in keyframes)
+    return extract_dataset(
+        frames, list(project.boxes.labels), Path(project.video_path), frame_index,
+        Path(target), Path(project.video_path).stem, **options
+    )
+
@@ -0,0 +1,228 @@
+# filmstrip.py
+import json
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtGui import QPainter, QColor, QPen
+from PyQt5.QtCore import Qt, QRect, QThread, pyqtSignal
+
+from config import THUMBNAIL_FOLDER, THUMBNAIL_COUNT, THUMBNAIL_HEIGHT, FILMSTRIP_HEIGHT
+from frame_index import FrameIndex, IndexBuilder, cache_name, video_signature
+from lazy_import import lazy_import
+from video_loader import frame_to_qimage
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+class ThumbnailWorker(QThread):
+    """
+    Erzeugt Vorschaubilder eines Videos in einem einzigen sequentiellen
+    Durchlauf (grab() für jeden Frame, retrieve() nur für jeden step-ten)
+    und speichert sie im Thumbnail-Cache. Ist index_file gesetzt, entsteht
+    im selben Durchlauf der Keyframe-Index des Videos; er wird dort
+    gespeichert und per index_ready übergeben. Ist der Cache aktuell und
+    kein Index nötig, wird das Video nicht gelesen.
+    """
+    # (Frame-Index, BGR-Vorschaubild)
+    thumbnail_ready = pyqtSignal(int, object)
+    # FrameIndex
+    index_ready = pyqtSignal(object)
+
+    def __init__(self, video_path: Path, frame_count: int, index_file: Path | None = None, parent=None):
+        super().__init__(parent)
+        self.video_path = Path(video_path)
+        self.index_file = index_file
+        self.step = max(1, frame_count // THUMBNAIL_COUNT)
+        self.cache_path = THUMBNAIL_FOLDER / f"{cache_name(self.video_path)}.npz"
+
+    def run(self):
+        signature = video_signature(self.video_path)
+        cached = self._load_cache(signature)
+        if cached and self.index_file is None:
+            return
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            return
+        builder = IndexBuilder(cap) if self.index_file is not None else None
+        frames: list[int] = []
+        thumbs: list[np.ndarray] = []
+        index = 0
+        while not self.isInterruptionRequested() and cap.grab():
+            if builder:
+                builder.add()
+            if not cached and index % self.step == 0:
+                success, frame = cap.retrieve()
+                if success:
+                    h, w = frame.shape[:2]
+                    size = (max(1, w * THUMBNAIL_HEIGHT // h), THUMBNAIL_HEIGHT)
+                    thumb = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                    frames.append(index)
+                    thumbs.append(thumb)
+                    self.thumbnail_ready.emit(index, thumb)
+            index += 1
+        cap.release()
+        if self.isInterruptionRequested():
+            return
+        if thumbs:
+            self._save_cache(signature, frames, thumbs)
+        if builder:
+            self._finish_index(builder)
+
+    def _finish_index(self, builder: IndexBuilder) -> None:
+        frame_index = builder.result(self.video_path)
+        if frame_index is None:
+            return
+        try:
+            frame_index.save(self.index_file)
+        except OSError as e:
+            print(f"Fehler: Frame-Index konnte nicht gespeichert werden: {e}")
+        self.index_ready.emit(frame_index)
+
+    def _load_cache(self, signature: dict) -> bool:
+        try:
+            with np.load(self.cache_path) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta != {"signature": signature, "step": self.step, "height": THUMBNAIL_HEIGHT}:
+                    return False
+                for index, thumb in zip(data["frames"], data["thumbs"]):
+                    self.thumbnail_ready.emit(int(index), thumb)
+            return True
+        except (OSError, KeyError, ValueError):
+            return False
+
+    def _save_cache(self, signature: dict, frames: list[int], thumbs: list[np.ndarray]) -> None:
+        meta = {"signature": signature, "step": self.step, "height": THUMBNAIL_HEIGHT}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.stem + ".tmp.npz")
+            np.savez(tmp, meta=json.dumps(meta), frames=np.array(frames, np.int32), thumbs=np.stack(thumbs))
+            tmp.replace(self.cache_path)
+        except OSError as e:
+            print(f"Fehler: Thumbnail-Cache konnte nicht gespeichert werden: {e}")
+
+
+class Filmstrip(QWidget):
+    """
+    Zeitleiste unter dem Canvas:
+    - Vorschaubilder (asynchron vom ThumbnailWorker geliefert)
+    - Markierungen für Frames mit Boxen
+    - Cursor auf dem aktuellen Frame
+    Klicken oder Ziehen springt zum Frame unter der Maus.
+    Den im selben Durchlauf gebauten Keyframe-Index meldet frame_index_ready
+    (Videopfad, FrameIndex) im GUI-Thread.
+    """
+    frame_selected = pyqtSignal(int)
+    frame_index_ready = pyqtSignal(object, object)
+
+    MARKER_HEIGHT = 6
+    MARKER_COLOR = QColor(255, 165, 0)  # Orange
+    CURSOR_PEN = QPen(QColor(255, 0, 0), 2)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(FILMSTRIP_HEIGHT)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.frame_count = 0
+        self.current_frame = 0
+        self.marked_frames: list[int] = []
+        # Frame-Index -> Vorschaubild (QImage hält das Array)
+        self.thumbnails: dict = {}
+        self._thumb_frames: list[int] = []
+        self.worker: ThumbnailWorker | None = None
+
+    def load_video(self, video_path: Path, frame_count: int, index_file: Path | None = None):
+        """
+        Verwirft alte Vorschaubilder und startet die Erzeugung für ein neues
+        Video; mit index_file wird dabei auch der Keyframe-Index gebaut.
+        """
+        self.stop()
+        self.frame_count = frame_count
+        self.thumbnails.clear()
+        self._thumb_frames = []
+        self.worker = ThumbnailWorker(video_path, frame_count, index_file, self)
+        self.worker.thumbnail_ready.connect(self._on_thumbnail)
+        self.worker.index_ready.connect(self._on_index)
+        self.worker.start(QThread.LowPriority)
+        self.update()
+
+    def stop(self):
+        if self.worker:
+            self.worker.requestInterruption()
+            self.worker.wait()
+            self.worker.deleteLater()
+            self.worker = None
+
+    def set_current_frame(self, index: int):
+        self.current_frame = index
+        self.update()
+
+    def set_marked_frames(self, frames: list[int]):
+        self.marked_frames = frames
+        self.update()
+
+    def _on_index(self, frame_index: FrameIndex):
+        if self.sender() is not self.worker:
+            return
+        self.frame_count = frame_index.frame_count
+        self.frame_index_ready.emit(self.worker.video_path, frame_index)
+        self.update()
+
+    def _on_thumbnail(self, index: int, thumb: np.ndarray):
+        if self.sender() is not self.worker:
+            return
+        self.thumbnails[index] = frame_to_qimage(thumb)
+        self._thumb_frames.append(index)
+        self.update()
+
+    def frame_at(self, x: int) -> int:
+        if self.frame_count <= 0 or self.width() <= 0:
+            return 0
+        index = int(x / self.width() * self.frame_count)
+        return max(0, min(index, self.frame_count - 1))
+
+    def x_of(self, index: int) -> int:
+        if self.frame_count <= 0:
+            return 0
+        return int(index / self.frame_count * self.width())
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(40, 40, 40))
+        if self.frame_count <= 0:
+            return
+        # Vorschaubilder: pro Kachel das nächstgelegene vorhandene Bild
+        top = self.MARKER_HEIGHT
+        thumb_h = self.height() - top
+        if self._thumb_frames:
+            sample = self.thumbnails[self._thumb_frames[0]]
+            tile_w = max(1, sample.width() * thumb_h // max(1, sample.height()))
+            frames = self._thumb_frames
+            for x in range(0, self.width(), tile_w):
+                target = self.frame_at(x + tile_w // 2)
+                # _thumb_frames ist aufsteigend, da in Dekodierreihenfolge geliefert
+                pos = min(np.searchsorted(frames, target), len(frames) - 1)
+                if pos > 0 and target - frames[pos - 1] < frames[pos] - target:
+                    pos -= 1
+                if abs(frames[pos] - target) > self.frame_count / max(1, self.width() // tile_w):
+                    continue
+                painter.drawImage(QRect(x, top, tile_w, thumb_h), self.thumbnails[frames[pos]])
+        # Markierungen für Frames mit Boxen (eine Linie pro Pixelspalte)
+        painter.setPen(self.MARKER_COLOR)
+        for x in sorted({self.x_of(f) for f in self.marked_frames}):
+            painter.drawLine(x, 0, x, self.MARKER_HEIGHT - 1)
+        # Aktueller Frame
+        painter.setPen(self.CURSOR_PEN)
+        cx = self.x_of(self.current_frame)
+        painter.drawLine(cx, 0, cx, self.height())
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.frame_selected.emit(self.frame_at(event.pos().x()))
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            index = self.frame_at(event.pos().x())
+            if index != self.current_frame:
+                self.frame_selected.emit(index)
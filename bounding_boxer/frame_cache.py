@@ -0,0 +1,123 @@
+# frame_cache.py
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
+
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+class FrameCache:
+    """
+    Zweistufiger Cache für dekodierte Frames mit Byte-Budget:
+    - Stufe 1: fertige Frames (numpy-Arrays) mit LRU-Verdrängung
+    - Stufe 2: komprimierte Kopien (JPEG/PNG im RAM) verdrängter Frames
+    """
+    def __init__(
+        self,
+        max_bytes: int,
+        max_compressed_bytes: int,
+        codec: str = ".jpg",
+        jpeg_quality: int = 90
+    ):
+        self.max_bytes = max_bytes
+        self.max_compressed_bytes = max_compressed_bytes
+        self.codec = codec
+        self.jpeg_quality = jpeg_quality
+        self._frames: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._compressed: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._compressed_bytes = 0
+        # Zähler
+        self.hits = 0
+        self.compressed_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compressed_evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._frames or key in self._compressed
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """Liefert den Frame zu key oder None; Treffer in Stufe 2 werden nach Stufe 1 befördert."""
+        frame = self._frames.get(key)
+        if frame is not None:
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+        data = self._compressed.get(key)
+        if data is not None:
+            frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+            if frame is not None:
+                self._compressed.move_to_end(key)
+                self.compressed_hits += 1
+                self._store(key, frame)
+                return frame
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, frame: np.ndarray) -> None:
+        """Legt einen frisch dekodierten Frame in Stufe 1 ab."""
+        old = self._frames.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        # Veraltete komprimierte Kopie verwerfen
+        stale = self._compressed.pop(key, None)
+        if stale is not None:
+            self._compressed_bytes -= stale.nbytes
+        self._store(key, frame)
+
+    def clear(self) -> None:
+        """Leert beide Stufen und setzt die Zähler zurück."""
+        self._frames.clear()
+        self._compressed.clear()
+        self._bytes = self._compressed_bytes = 0
+        self.hits = self.compressed_hits = self.misses = 0
+        self.evictions = self.compressed_evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Gibt Treffer-, Fehl- und Verdrängungszähler sowie Füllstände zurück."""
+        return {
+            "hits": self.hits,
+            "compressed_hits": self.compressed_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "compressed_evictions": self.compressed_evictions,
+            "frames": len(self._frames),
+            "bytes": self._bytes,
+            "compressed_frames": len(self._compressed),
+            "compressed_bytes": self._compressed_bytes,
+        }
+
+    def _store(self, key: Hashable, frame: np.ndarray) -> None:
+        if frame.nbytes > self.max_bytes:
+            self._compress(key, frame)
+            return
+        self._frames[key] = frame
+        self._bytes += frame.nbytes
+        while self._bytes > self.max_bytes:
+            old_key, old_frame = self._frames.popitem(last=False)
+            self._bytes -= old_frame.nbytes
+            self.evictions += 1
+            self._compress(old_key, old_frame)
+
+    def _compress(self, key: Hashable, frame: np.ndarray) -> None:
+        if self.max_compressed_bytes <= 0:
+            return
+        if key in self._compressed:
+            # Kopie von einer früheren Verdrängung ist noch gültig
+            self._compressed.move_to_end(key)
+            return
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality] if self.codec == ".jpg" else []
+        ok, data = cv2.imencode(self.codec, frame, params)
+        if not ok or data.nbytes > self.max_compressed_bytes:
+            return
+        self._compressed[key] = data
+        self._compressed_bytes += data.nbytes
+        while self._compressed_bytes > self.max_compressed_bytes:
+            _, old = self._compressed.popitem(last=False)
+            self._compressed_bytes -= old.nbytes
+            self.compressed_evictions += 1
@@ -0,0 +1,131 @@
+# frame_index.py
+import hashlib
+import json
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+def cache_name(video_path: Path) -> str:
+    """
+    Name der Caches eines Videos (Frame-Speicher, Vorschaubilder): Dateiname
+    plus Hash des absoluten Pfads, damit gleichnamige Videos aus verschiedenen
+    Ordnern sich nicht gegenseitig verwerfen.
+    """
+    path = Path(video_path).resolve()
+    return f"{path.stem}-{hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:12]}"
+
+
+def video_signature(video_path: Path) -> dict:
+    """Größe und Änderungszeit einer Videodatei, um veraltete Indizes zu erkennen."""
+    st = Path(video_path).stat()
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+
+class FrameIndex:
+    """
+    Keyframe-/Zeitstempel-Index eines Videos.
+    Hält pro Frame den Zeitstempel (ms) und die Positionen der Keyframes,
+    damit Seeks begrenzt und auch bei variabler Framerate frame-genau sind.
+    """
+    # Toleranz beim Vergleich von Zeitstempeln in ms
+    TOLERANCE_MS = 0.5
+
+    def __init__(self, timestamps: list[float], keyframes: list[int] | None, signature: dict):
+        self.timestamps = timestamps
+        # None: Container liefert keine Keyframe-Information
+        self.keyframes = keyframes
+        self.signature = signature
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.timestamps)
+
+    def keyframe_before(self, index: int) -> int:
+        """Gibt den letzten bekannten Keyframe <= index zurück."""
+        if not self.keyframes:
+            return index
+        pos = bisect_right(self.keyframes, index) - 1
+        return self.keyframes[pos] if pos >= 0 else 0
+
+    def keyframe_preceding(self, keyframe: int) -> int:
+        """Gibt den Keyframe vor dem gegebenen Keyframe zurück (0 am Anfang)."""
+        if not self.keyframes:
+            return max(keyframe - 1, 0)
+        pos = bisect_left(self.keyframes, keyframe) - 1
+        return self.keyframes[pos] if pos >= 0 else 0
+
+    def index_of(self, msec: float) -> int:
+        """Gibt den Frame-Index zu einem Zeitstempel zurück (nächstgelegener Frame)."""
+        pos = bisect_left(self.timestamps, msec - self.TOLERANCE_MS)
+        return min(pos, len(self.timestamps) - 1)
+
+    @classmethod
+    def build(cls, video_path: Path) -> 'FrameIndex | None':
+        """Liest das Video einmal sequentiell (ohne Farbkonvertierung) und baut den Index."""
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            return None
+        builder = IndexBuilder(cap)
+        while cap.grab():
+            builder.add()
+        cap.release()
+        return builder.result(video_path)
+
+    @classmethod
+    def load(cls, index_path: Path, video_path: Path) -> 'FrameIndex | None':
+        """Lädt einen gespeicherten Index; None, wenn er fehlt oder nicht mehr zum Video passt."""
+        try:
+            data = json.loads(Path(index_path).read_text())
+            if data.get("signature") != video_signature(video_path):
+                return None
+            return cls(data["timestamps"], data.get("keyframes"), data["signature"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, index_path: Path) -> None:
+        """Speichert den Index als JSON."""
+        data = {
+            "signature": self.signature,
+            "timestamps": self.timestamps,
+            "keyframes": self.keyframes
+        }
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        index_path.write_text(json.dumps(data))
+
+
+class IndexBuilder:
+    """
+    Sammelt den FrameIndex während eines sequentiellen Durchlaufs, der das
+    Video ohnehin liest (z.B. für die Vorschaubilder): add() nach jedem grab().
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self.key_prop = getattr(cv2, "CAP_PROP_LRF_HAS_KEY_FRAME", None)
+        self.timestamps: list[float] = []
+        self.keyframes: list[int] | None = [] if self.key_prop is not None else None
+
+    def add(self) -> None:
+        """Übernimmt Zeitstempel und Keyframe-Flag des zuletzt gegriffenen Frames."""
+        index = len(self.timestamps)
+        self.timestamps.append(self.cap.get(cv2.CAP_PROP_POS_MSEC))
+        if self.keyframes is not None:
+            flag = self.cap.get(self.key_prop)
+            if flag < 0:
+                # Backend unterstützt die Eigenschaft nicht
+                self.keyframes = None
+            elif flag > 0:
+                self.keyframes.append(index)
+
+    def result(self, video_path: Path) -> FrameIndex | None:
+        if not self.timestamps:
+            return None
+        keyframes = self.keyframes
+        if keyframes is not None and (not keyframes or keyframes[0] != 0):
+            keyframes.insert(0, 0)
+        return FrameIndex(self.timestamps, keyframes, video_signature(video_path))
@@ -0,0 +1,87 @@
+# frame_prefetcher.py
+from PyQt5.QtCore import QThread, QMutex, QWaitCondition, pyqtSignal
+
+from frame_index import FrameIndex
+from frame_reader import FrameReader, make_proxy
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+class FramePrefetcher(QThread):
+    """
+    Read-Ahead-Decoder im Hintergrund mit eigener VideoCapture.
+    Dekodiert die vom VideoLoader geplanten Frames der Reihe nach und
+    übergibt sie per Signal an den GUI-Thread.
+    """
+    # (Videopfad, Frame-Index, Proxy-Stufe, BGR-Frame)
+    frame_ready = pyqtSignal(str, int, int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mutex = QMutex()
+        self._wake = QWaitCondition()
+        self._video_path: str | None = None
+        self._frame_index: FrameIndex | None = None
+        self._level = 0
+        self._pending: list[int] = []
+        self._stopping = False
+
+    def request(
+        self,
+        video_path: str,
+        indices: list[int],
+        frame_index: FrameIndex | None = None,
+        level: int = 0
+    ) -> None:
+        """Ersetzt den aktuellen Plan; noch nicht dekodierte Frames des alten Plans entfallen."""
+        self._mutex.lock()
+        self._video_path = video_path
+        self._frame_index = frame_index
+        self._level = level
+        self._pending = list(indices)
+        self._wake.wakeOne()
+        self._mutex.unlock()
+
+    def stop(self) -> None:
+        """Beendet den Thread nach dem aktuell laufenden Frame."""
+        self._mutex.lock()
+        self._stopping = True
+        self._pending = []
+        self._wake.wakeOne()
+        self._mutex.unlock()
+        self.wait()
+
+    def run(self):
+        cap = None
+        cap_path: str | None = None
+        reader: FrameReader | None = None
+        while True:
+            self._mutex.lock()
+            while not self._stopping and not self._pending:
+                self._wake.wait(self._mutex)
+            if self._stopping:
+                self._mutex.unlock()
+                break
+            path = self._video_path
+            frame_index = self._frame_index
+            level = self._level
+            index = self._pending.pop(0)
+            self._mutex.unlock()
+
+            if path != cap_path:
+                if cap:
+                    cap.release()
+                cap = cv2.VideoCapture(path)
+                cap_path = path
+                reader = FrameReader(cap)
+            if not cap.isOpened():
+                continue
+            reader.frame_index = frame_index
+            frame = reader.read(index)
+            if frame is None:
+                continue
+            self.frame_ready.emit(path, index, level, make_proxy(frame, level))
+        if cap:
+            cap.release()
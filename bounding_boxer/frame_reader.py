@@ -0,0 +1,105 @@
+# frame_reader.py
+from pathlib import Path
+
+import numpy as np
+
+from config import PROJECT_FOLDER, SEQUENTIAL_GRAB_LIMIT
+from frame_index import FrameIndex
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+def make_proxy(frame: np.ndarray, level: int) -> np.ndarray:
+    """Verkleinert einen Frame auf die Proxy-Stufe level (Kantenlänge / 2**level)."""
+    if level <= 0:
+        return frame
+    h, w = frame.shape[:2]
+    size = (max(w >> level, 1), max(h >> level, 1))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+class FrameReader:
+    """
+    Liest Frames aus einer VideoCapture und verfolgt die Decoder-Position:
+    - sequentieller Zugriff und kurze Sprünge vorwärts: grab() ohne Seek
+    - wahlfreier Zugriff: Seek auf den Keyframe davor (über FrameIndex),
+      Landeposition anhand des Zeitstempels prüfen, dann grab() bis zum Ziel
+    Ohne Index wird wie bisher über CAP_PROP_POS_FRAMES gesprungen.
+    """
+    # Wie oft bei zu weit gelandetem Seek auf einen früheren Keyframe ausgewichen wird
+    SEEK_RETRIES = 4
+
+    def __init__(self, cap, frame_index: FrameIndex | None = None):
+        self.cap = cap
+        self.frame_index = frame_index
+        # Index des Frames, den der nächste grab() liefert; -1 = unbekannt
+        self.position = 0
+
+    def read(self, index: int) -> np.ndarray | None:
+        """Liefert den Frame mit dem gegebenen Index als BGR-Array."""
+        if not self._can_grab_to(index) and not self._seek(index):
+            return None
+        while self.position <= index:
+            if not self.cap.grab():
+                self.position = -1
+                return None
+            self.position += 1
+        success, frame = self.cap.retrieve()
+        if not success:
+            self.position = -1
+            return None
+        return frame
+
+    def _can_grab_to(self, index: int) -> bool:
+        if self.position < 0 or index < self.position:
+            return False
+        if index - self.position <= SEQUENTIAL_GRAB_LIMIT:
+            return True
+        # Liegt das Ziel in derselben GOP, ist Vorwärtslesen nie teurer als ein Seek
+        return self.frame_index is not None and self.frame_index.keyframe_before(index) <= self.position
+
+    def _seek(self, index: int) -> bool:
+        idx = self.frame_index
+        if idx is not None and index < idx.frame_count:
+            target = idx.keyframe_before(index)
+            for _ in range(self.SEEK_RETRIES):
+                self.cap.set(cv2.CAP_PROP_POS_MSEC, idx.timestamps[target])
+                if not self.cap.grab():
+                    break
+                landed = idx.index_of(self.cap.get(cv2.CAP_PROP_POS_MSEC))
+                if landed <= index:
+                    # Der Frame "landed" ist bereits gegriffen
+                    self.position = landed + 1
+                    return True
+                if target == 0:
+                    break
+                target = idx.keyframe_preceding(target)
+        # Fallback: Seek über die Frame-Nummer
+        self.position = -1
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, index):
+            return False
+        self.position = index
+        return True
+
+
+def index_path(video_path: Path) -> Path:
+    """Pfad des Keyframe-Index, neben der Projektdatei."""
+    return PROJECT_FOLDER / f"{Path(video_path).stem}_frames.json"
+
+
+def probe_video(path: Path) -> tuple[tuple[int, int], int]:
+    """
+    Auflösung und Frame-Anzahl eines Videos, ohne es zu laden (z.B. für
+    Exporte aus Skripten). Die Frame-Anzahl ist exakt, wenn ein Index vorliegt.
+    """
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        print(f"Fehler: Kann Video nicht öffnen: {path}")
+        return (0, 0), 0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    frame_index = FrameIndex.load(index_path(path), Path(path))
+    count = frame_index.frame_count if frame_index else int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return size, count
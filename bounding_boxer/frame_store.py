@@ -0,0 +1,285 @@
+# frame_store.py
+import json
+import os
+import queue
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from frame_index import video_signature
+
+# Aufbau der Dateien; ältere Speicher werden beim Öffnen verworfen
+STORE_VERSION = 2
+
+
+class _Segment:
+    """
+    Eine Segmentdatei einer Proxy-Stufe: levelL_NNNNNN.raw enthält bis zu
+    capacity Frames hintereinander, levelL_NNNNNN.idx (int32) die zugehörigen
+    Frame-Indizes in derselben Reihenfolge. Die Nummer ist über alle Stufen
+    fortlaufend und gibt das Alter des Segments an.
+    """
+    def __init__(self, folder: Path, level: int, number: int, shape: tuple[int, ...], capacity: int):
+        self.level = level
+        self.number = number
+        self.raw_path = folder / f"level{level}_{number:06d}.raw"
+        self.idx_path = folder / f"level{level}_{number:06d}.idx"
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        self.capacity = capacity
+        frames = np.fromfile(self.idx_path, dtype=np.int32) if self.idx_path.exists() else np.empty(0, np.int32)
+        raw_size = self.raw_path.stat().st_size if self.raw_path.exists() else 0
+        # Nur vollständig geschriebene Frames übernehmen (z.B. nach Absturz)
+        count = min(len(frames), raw_size // self.frame_bytes)
+        if count < len(frames) or count * self.frame_bytes < raw_size:
+            with open(self.raw_path, "ab") as raw, open(self.idx_path, "ab") as idx:
+                raw.truncate(count * self.frame_bytes)
+                idx.truncate(count * 4)
+        # Frame-Indizes der geschriebenen Frames; ready davon sind sichtbar (geflusht)
+        self.frames: list[int] = frames[:count].tolist()
+        self.ready = count
+        self._raw = None
+        self._idx = None
+        self._map: np.memmap | None = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.frames) >= self.capacity
+
+    def view(self, pos: int) -> np.ndarray:
+        if self._map is None or pos >= len(self._map):
+            # Datei ist gewachsen: neu mappen; ältere Views behalten ihr Mapping
+            self._map = np.memmap(self.raw_path, dtype=np.uint8, mode="r", shape=(self.ready,) + self.shape)
+        return self._map[pos]
+
+    def append(self, index: int, frame: np.ndarray) -> int:
+        """Schreibt einen Frame ans Ende (ohne Flush) und gibt seine Position zurück."""
+        if self._raw is None:
+            self._raw = open(self.raw_path, "ab")
+            self._idx = open(self.idx_path, "ab")
+        self._raw.write(np.ascontiguousarray(frame).data)
+        self._idx.write(np.int32(index).tobytes())
+        self.frames.append(index)
+        return len(self.frames) - 1
+
+    def flush(self) -> None:
+        if self._raw is not None:
+            self._raw.flush()
+            self._idx.flush()
+
+    def finish(self) -> None:
+        """Schließt die Dateien zum Schreiben (Lesen über das Mapping bleibt möglich)."""
+        if self._raw is not None:
+            self._raw.close()
+            self._idx.close()
+            self._raw = self._idx = None
+
+    def release(self) -> None:
+        self.finish()
+        self._map = None
+
+    def remove(self) -> None:
+        self.release()
+        self.raw_path.unlink(missing_ok=True)
+        self.idx_path.unlink(missing_ok=True)
+
+
+class FrameStore:
+    """
+    Persistenter Frame-Speicher eines Videos auf der Festplatte.
+    Frames werden beim Dekodieren abgelegt und später als memory-mapped
+    Views ohne Kopie ausgeliefert. Ändert sich das Video (Größe oder mtime),
+    wird der Speicher verworfen. put() reiht Frames nur ein; ein eigener
+    Thread schreibt sie gesammelt mit einem Flush pro Durchgang in Segmente
+    von etwa segment_bytes. Ist max_bytes überschritten, fallen die ältesten
+    Segmente weg; bereits ausgegebene Views bleiben gültig.
+    """
+    # Höchstens so viele Frames warten auf das Schreiben, weitere werden nicht abgelegt
+    QUEUE_FRAMES = 8
+
+    def __init__(self, folder: Path, video_path: Path, max_bytes: int, segment_bytes: int):
+        self.folder = Path(folder)
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.meta_path = self.folder / "meta.json"
+        signature = video_signature(video_path)
+        meta = self._read_meta()
+        if meta.get("signature") != signature or meta.get("version") != STORE_VERSION:
+            shutil.rmtree(self.folder, ignore_errors=True)
+            meta = {"signature": signature, "version": STORE_VERSION, "levels": {}}
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._meta = meta
+        self._write_meta()
+        # Alle Segmente, älteste zuerst; (Frame, Stufe) -> (Segment, Position)
+        self._segments: list[_Segment] = []
+        self._slots: dict[tuple[int, int], tuple[_Segment, int]] = {}
+        for level, shape in meta["levels"].items():
+            for raw_path in self.folder.glob(f"level{level}_*.raw"):
+                number = int(raw_path.stem.split("_")[1])
+                self._segments.append(_Segment(self.folder, int(level), number, shape, 0))
+        self._segments.sort(key=lambda s: s.number)
+        for segment in self._segments:
+            for pos, index in enumerate(segment.frames):
+                self._slots[(index, segment.level)] = (segment, pos)
+        self._next_number = self._segments[-1].number + 1 if self._segments else 0
+        # Stufe -> Segment, in das der Schreib-Thread gerade schreibt
+        self._open: dict[int, _Segment] = {}
+        # Segmente, die sich noch nicht löschen ließen (z.B. unter Windows noch gemappt)
+        self._doomed: list[_Segment] = []
+        self._lock = threading.Lock()
+        self._queued: set[tuple[int, int]] = set()
+        self._queue: queue.Queue = queue.Queue(self.QUEUE_FRAMES)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        with self._lock:
+            return key in self._slots
+
+    @property
+    def bytes_used(self) -> int:
+        with self._lock:
+            return sum(s.ready * s.frame_bytes for s in self._segments)
+
+    def get(self, index: int, level: int = 0) -> np.ndarray | None:
+        """Liefert den Frame als read-only View in die gemappte Datei oder None."""
+        with self._lock:
+            slot = self._slots.get((index, level))
+            return slot[0].view(slot[1]) if slot else None
+
+    def put(self, index: int, level: int, frame: np.ndarray) -> None:
+        """
+        Reiht einen Frame zum Schreiben ein, sofern er fehlt; kehrt sofort
+        zurück. Ist die Warteschlange voll, wird der Frame nicht abgelegt.
+        """
+        key = (index, level)
+        with self._lock:
+            if key in self._slots or key in self._queued:
+                return
+            self._queued.add(key)
+        try:
+            self._queue.put_nowait((index, level, frame))
+        except queue.Full:
+            with self._lock:
+                self._queued.discard(key)
+
+    def flush(self) -> None:
+        """Wartet, bis alle eingereihten Frames geschrieben sind."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Schreibt die eingereihten Frames noch und beendet den Schreib-Thread."""
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            for segment in self._segments:
+                segment.release()
+            self._segments.clear()
+            self._slots.clear()
+        self._open.clear()
+
+    # --- Schreib-Thread ---
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            items = [item for item in batch if item is not None]
+            try:
+                self._write(items)
+            except OSError as e:
+                print(f"Fehler: Frame-Speicher konnte nicht geschrieben werden: {e}")
+            finally:
+                with self._lock:
+                    self._queued.difference_update((index, level) for index, level, _ in items)
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _write(self, items: list[tuple[int, int, np.ndarray]]) -> None:
+        written: list[tuple[tuple[int, int], _Segment, int]] = []
+        touched: set[_Segment] = set()
+        for index, level, frame in items:
+            segment = self._segment_for(level, frame.shape)
+            if segment is None:
+                continue
+            try:
+                pos = segment.append(index, frame)
+            except OSError as e:
+                print(f"Fehler: Frame {index} konnte nicht gespeichert werden: {e}")
+                continue
+            touched.add(segment)
+            written.append(((index, level), segment, pos))
+        try:
+            for segment in touched:
+                segment.flush()
+        except OSError as e:
+            print(f"Fehler: Frame-Speicher konnte nicht geschrieben werden: {e}")
+            written = []
+        with self._lock:
+            for key, segment, pos in written:
+                self._slots[key] = (segment, pos)
+            for segment in touched:
+                segment.ready = len(segment.frames)
+        self._evict()
+
+    def _segment_for(self, level: int, shape: tuple[int, ...]) -> _Segment | None:
+        """Segment, in das der nächste Frame der Stufe geschrieben wird (legt bei Bedarf eines an)."""
+        known = self._meta["levels"].get(str(level))
+        if known is not None and tuple(known) != tuple(shape):
+            return None
+        segment = self._open.get(level)
+        if segment is not None and not segment.full:
+            return segment
+        if segment is not None:
+            segment.flush()
+            segment.finish()
+        if known is None:
+            self._meta["levels"][str(level)] = list(shape)
+            self._write_meta()
+        capacity = max(1, self.segment_bytes // int(np.prod(shape)))
+        segment = _Segment(self.folder, level, self._next_number, shape, capacity)
+        self._next_number += 1
+        with self._lock:
+            self._segments.append(segment)
+        self._open[level] = segment
+        return segment
+
+    def _evict(self) -> None:
+        """Entfernt die ältesten Segmente, bis max_bytes wieder eingehalten ist."""
+        for segment in self._doomed[:]:
+            try:
+                segment.remove()
+                self._doomed.remove(segment)
+            except OSError:
+                pass
+        while self.bytes_used > self.max_bytes:
+            with self._lock:
+                segment = self._segments.pop(0)
+                for pos, index in enumerate(segment.frames):
+                    if self._slots.get((index, segment.level)) == (segment, pos):
+                        del self._slots[(index, segment.level)]
+            if self._open.get(segment.level) is segment:
+                del self._open[segment.level]
+            try:
+                segment.remove()
+            except OSError:
+                self._doomed.append(segment)
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self.meta_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self) -> None:
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._meta))
+        os.replace(tmp, self.meta_path)
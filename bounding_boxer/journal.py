@@ -0,0 +1,74 @@
+# journal.py
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+
+class Journal:
+    """
+    Append-only Journal der Box-Änderungen eines Projekts: eine JSON-Zeile
+    pro Operation mit fortlaufender Nummer (seq). Vor dem Kompaktieren wird
+    das aktive Segment versiegelt (umbenannt in <name>.<seq>); Änderungen
+    landen danach in einem neuen Segment. Versiegelte Segmente werden erst
+    gelöscht, wenn ihr Stand sicher in der Projektdatei steht.
+    """
+    def __init__(self, path: Path, seq: int = 0):
+        self.path = Path(path)
+        self.seq = seq
+        self._file = None
+
+    def append(self, op: str, **fields) -> None:
+        self.seq += 1
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"seq": self.seq, "op": op, **fields}, separators=(",", ":")) + "\n")
+        # Nur in den OS-Puffer: übersteht einen Absturz der Anwendung
+        self._file.flush()
+
+    def seal(self) -> Path | None:
+        """Versiegelt das aktive Segment und gibt seinen neuen Pfad zurück (None, wenn leer)."""
+        self.close()
+        if not self.path.exists():
+            return None
+        sealed = self.path.with_name(f"{self.path.name}.{self.seq}")
+        os.replace(self.path, sealed)
+        return sealed
+
+    def segments(self) -> list[Path]:
+        """Versiegelte Segmente in Schreibreihenfolge, danach das aktive Segment."""
+        sealed = []
+        for p in self.path.parent.glob(f"{self.path.name}.*"):
+            suffix = p.name[len(self.path.name) + 1:]
+            if suffix.isdigit():
+                sealed.append((int(suffix), p))
+        paths = [p for _, p in sorted(sealed)]
+        if self.path.exists():
+            paths.append(self.path)
+        return paths
+
+    def entries(self, after: int = 0) -> Iterator[dict]:
+        """Alle Einträge mit seq > after aus allen Segmenten."""
+        for path in self.segments():
+            yield from (e for e in self.read(path) if e.get("seq", 0) > after)
+
+    @staticmethod
+    def read(path: Path) -> Iterator[dict]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Unvollständige letzte Zeile nach einem Absturz
+                        return
+        except OSError as e:
+            print(f"Fehler: Journal {path} konnte nicht gelesen werden: {e}")
+
+    def close(self) -> None:
+        """Schließt das aktive Segment; sein Inhalt wird dabei auf die Platte geschrieben (fsync)."""
+        if self._file:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
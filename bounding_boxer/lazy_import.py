@@ -0,0 +1,24 @@
+# lazy_import.py
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Modul, das erst beim ersten Attributzugriff geladen wird (z.B. cv2, das
+    mit NumPy einen großen Teil der Startzeit ausmacht). Ist es schon
+    geladen, kommt das echte Modul zurück. Der erste Zugriff sollte aus dem
+    Haupt-Thread erfolgen (LazyLoader ist vor Python 3.12 nicht threadsicher).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"Modul {name} nicht gefunden", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -1,25 +1,58 @@
+import json
 import sys
 from pathlib import Path
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget,
-    QAction, QFileDialog, QLabel, QVBoxLayout, QMessageBox,
-    QHeaderView, QTableWidget, QTableWidgetItem, QStackedLayout
+    QAction, QActionGroup, QFileDialog, QLabel, QVBoxLayout, QMessageBox,
+    QHeaderView, QTableWidget, QTableWidgetItem, QStackedLayout, QProgressBar, QLineEdit
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QThread, QFileSystemWatcher
 from PyQt5.QtGui import QPixmap, QCursor
 
 from config import (
-    PROJECT_FOLDER,
+    PROJECT_FOLDER, EXPORT_FOLDER, DATASET_FOLDER, CATALOG_PATH, CATALOG_SYNC_DELAY_MS,
     MIN_WINDOW_WIDTH, MIN_WINDOW_HEIGHT,
     SHOW_STATUS_WINDOW_COORDS, SHOW_STATUS_IMAGE_COORDS, SHOW_STATUS_ZOOM,
-    STATUS_WINDOW_COORDS_PEN, STATUS_IMAGE_COORDS_PEN, STATUS_ZOOM_PEN,
-    LABEL_CLASSES, BUTTON_GROUP_POSITION_X, BUTTON_GROUP_POSITION_Y
+    LABEL_CLASSES, BUTTON_GROUP_POSITION_X, BUTTON_GROUP_POSITION_Y,
+    PREFETCH_AHEAD, PREFETCH_BEHIND, STATUS_UPDATE_INTERVAL_MS, AUTOSAVE_INTERVAL_MS,
+    PROPAGATION_FRAMES, PROPAGATION_METHOD, PROPAGATION_WORKERS, PROPAGATION_MAX_WIDTH,
+    PROPAGATION_KEYFRAME_TOLERANCE_PX,
+    EXTRACT_IMAGE_FORMAT, EXTRACT_JPEG_QUALITY, EXTRACT_WORKERS, EXTRACT_QUEUE_SIZE,
+    PROFILE_HUD_INTERVAL_MS
 )
+from styles import STATUS_WINDOW_COORDS_PEN, STATUS_IMAGE_COORDS_PEN, STATUS_ZOOM_PEN
 from video_loader import VideoLoader
+from frame_prefetcher import FramePrefetcher
 from project_manager import ProjectManager
+from project_format import BBXP_SUFFIX
 from canvas import Canvas
 from overlay_button import OverlayButton
+from filmstrip import Filmstrip
+from propagation import METHODS, Propagator, available_methods
+from exporters import FORMATS
+from profiling import profiler
+from workers import CatalogSync, ExportWorker, ExtractWorker
+
+# Spalten der Projektliste: (Überschrift, Katalogfeld)
+PROJECT_COLUMNS = (
+    ("Datei", "name"), ("Video", "video"), ("Frames", "frame_count"),
+    ("Gelabelte Frames", "labeled_frames"), ("Boxen", "boxes"), ("Klassen", "labels"),
+    ("Letzter Frame", "last_frame"), ("Zuletzt geändert", "mtime"),
+)
+
+
+class SortItem(QTableWidgetItem):
+    """Tabellenzelle, die nach einem eigenen Schlüssel sortiert (Zahlen numerisch)."""
+    def __init__(self, text: str, key):
+        super().__init__(text)
+        self.key = key
+
+    def __lt__(self, other):
+        if isinstance(other, SortItem):
+            return self.key < other.key
+        return super().__lt__(other)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -33,10 +66,29 @@ class MainWindow(QMainWindow):
         open_action = QAction("Projekt öffnen", self)
         save_action = QAction("Speichern", self)
         save_action.setEnabled(False)
+        save_binary_action = QAction("Als Binärprojekt speichern (.bbxp)", self)
+        save_binary_action.setEnabled(False)
         file_menu.addAction(new_action)
         file_menu.addAction(open_action)
         file_menu.addAction(save_action)
+        file_menu.addAction(save_binary_action)
         self.save_action = save_action
+        self.save_binary_action = save_binary_action
+        export_menu = file_menu.addMenu("Exportieren")
+        self.export_actions = []
+        for fmt, (title, _, _) in FORMATS.items():
+            act = QAction(f"{title} …", self)
+            act.setEnabled(False)
+            act.triggered.connect(lambda checked, f=fmt: self.export_annotations(f))
+            export_menu.addAction(act)
+            self.export_actions.append(act)
+        self.export_worker: ExportWorker | None = None
+        export_menu.addSeparator()
+        self.extract_action = QAction("Datensatz extrahieren (Frames & Ausschnitte) …", self)
+        self.extract_action.setEnabled(False)
+        self.extract_action.triggered.connect(self.extract_dataset)
+        export_menu.addAction(self.extract_action)
+        self.extract_worker: ExtractWorker | None = None
 
         # Label-Klassen-Menü
         label_menu = self.menuBar().addMenu("Label-Klassen")
@@ -49,6 +101,41 @@ class MainWindow(QMainWindow):
             self.label_actions[key] = act
         self.current_label = next(iter(LABEL_CLASSES))
 
+        # Tracking-Menü: Boxen ab dem aktuellen Frame automatisch weiterverfolgen
+        track_menu = self.menuBar().addMenu("Tracking")
+        self.propagate_action = QAction(f"Vorschläge für {PROPAGATION_FRAMES} Frames erzeugen", self)
+        self.propagate_action.setShortcut("Ctrl+P")
+        self.accept_proposals_action = QAction("Vorschläge übernehmen", self)
+        self.accept_proposals_action.setShortcut("Ctrl+Return")
+        self.discard_proposals_action = QAction("Vorschläge verwerfen", self)
+        self.cancel_propagation_action = QAction("Propagation abbrechen", self)
+        for act in (self.propagate_action, self.accept_proposals_action,
+                    self.discard_proposals_action, self.cancel_propagation_action):
+            act.setEnabled(False)
+            track_menu.addAction(act)
+        # Verfahren werden erst beim Öffnen des Menüs geprüft (lädt OpenCV)
+        self.method_menu = track_menu.addMenu("Verfahren")
+        self.method_menu.aboutToShow.connect(self._fill_method_menu)
+        self.propagation_method = PROPAGATION_METHOD
+        self.propagator: Propagator | None = None
+
+        # Diagnose-Menü: Zeitmessung, Leistungsanzeige auf dem Canvas und Trace-Export
+        diag_menu = self.menuBar().addMenu("Diagnose")
+        self.profile_action = QAction("Zeitmessung aktiv", self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(profiler.enabled)
+        self.profile_action.toggled.connect(self.set_profiling)
+        self.hud_action = QAction("Leistungsanzeige", self)
+        self.hud_action.setCheckable(True)
+        self.hud_action.setShortcut("F12")
+        self.hud_action.toggled.connect(self.set_hud_visible)
+        reset_profile_action = QAction("Messwerte zurücksetzen", self)
+        reset_profile_action.triggered.connect(self.reset_profiling)
+        trace_action = QAction("Trace exportieren (Chrome-JSON) …", self)
+        trace_action.triggered.connect(self.export_trace)
+        for act in (self.profile_action, self.hud_action, reset_profile_action, trace_action):
+            diag_menu.addAction(act)
+
         # Statusleiste
         if SHOW_STATUS_WINDOW_COORDS:
             self.win_coord_label = QLabel("W: 0,0")
@@ -75,26 +162,53 @@ class MainWindow(QMainWindow):
         self.statusBar().addPermanentWidget(self.frame_label)
         self.label_status = QLabel("")
         self.statusBar().addPermanentWidget(self.label_status)
+        self.propagation_progress = QProgressBar()
+        self.propagation_progress.setMaximumWidth(160)
+        self.propagation_progress.hide()
+        self.statusBar().addPermanentWidget(self.propagation_progress)
+        # Koordinaten/Zoom werden gesammelt und gedrosselt angezeigt
+        self._pending_status: tuple | None = None
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(STATUS_UPDATE_INTERVAL_MS)
+        self._status_timer.timeout.connect(self._apply_status)
 
         self.canvas = Canvas()
         self.canvas.current_label = self.current_label
+        self.canvas.level_needed.connect(self.reload_frame_level)
         self.canvas.hide()
 
         self.start_screen = QWidget()
         start_layout = QVBoxLayout(self.start_screen)
         start_layout.addWidget(QLabel("Verfügbare Projekte:"))
-        self.project_table = QTableWidget(0, 2)
-        self.project_table.setHorizontalHeaderLabels(["Datei", "Zuletzt geändert"])
+        self.project_filter = QLineEdit()
+        self.project_filter.setPlaceholderText("Filtern (Datei, Video, Klasse …)")
+        self.project_filter.setClearButtonEnabled(True)
+        self.project_filter.textChanged.connect(self.filter_project_rows)
+        start_layout.addWidget(self.project_filter)
+        self.project_table = QTableWidget(0, len(PROJECT_COLUMNS))
+        self.project_table.setHorizontalHeaderLabels([title for title, _ in PROJECT_COLUMNS])
         hdr = self.project_table.horizontalHeader()
+        for col in range(len(PROJECT_COLUMNS)):
+            hdr.setSectionResizeMode(col, QHeaderView.ResizeToContents)
         hdr.setSectionResizeMode(0, QHeaderView.Stretch)
-        hdr.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.project_table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.project_table.setSelectionBehavior(QTableWidget.SelectRows)
+        # Neueste zuerst; die Liste kommt aus dem Katalog und wird im Hintergrund abgeglichen
+        self.project_table.setSortingEnabled(True)
+        self.project_table.sortItems(len(PROJECT_COLUMNS) - 1, Qt.DescendingOrder)
+        self.project_rows: dict[str, QTableWidgetItem] = {}
+        self.catalog_sync: CatalogSync | None = None
+        # Während eines Abgleichs angeforderter weiterer Abgleich
+        self._catalog_pending = False
         start_layout.addWidget(self.project_table)
 
         self.editor_screen = QWidget()
         editor_layout = QVBoxLayout(self.editor_screen)
         editor_layout.addWidget(self.canvas)
+        self.filmstrip = Filmstrip()
+        self.filmstrip.frame_selected.connect(self.goto_frame)
+        editor_layout.addWidget(self.filmstrip)
 
         self.zoom_state = {
         "scale_factor": 1.0,
@@ -132,15 +246,45 @@ class MainWindow(QMainWindow):
             PROJECT_FOLDER.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             QMessageBox.critical(self, "Fehler", f"Projektordner nicht anlegbar:\n{e}")
+        # Änderungen im Projektordner gesammelt in den Katalog übernehmen
+        self.catalog_timer = QTimer(self)
+        self.catalog_timer.setSingleShot(True)
+        self.catalog_timer.setInterval(CATALOG_SYNC_DELAY_MS)
+        self.catalog_timer.timeout.connect(self.sync_catalog)
+        self.project_watcher = QFileSystemWatcher([str(PROJECT_FOLDER)], self)
+        self.project_watcher.directoryChanged.connect(lambda path: self.catalog_timer.start())
 
         new_action.triggered.connect(self.start_new_project)
         open_action.triggered.connect(self.open_existing_project)
         save_action.triggered.connect(self.save_project)
+        save_binary_action.triggered.connect(lambda: self.save_project(BBXP_SUFFIX))
+        self.propagate_action.triggered.connect(self.start_propagation)
+        self.accept_proposals_action.triggered.connect(self.accept_proposals)
+        self.discard_proposals_action.triggered.connect(self.discard_proposals)
+        self.cancel_propagation_action.triggered.connect(self.stop_propagation)
         self.project_table.cellDoubleClicked.connect(self.open_project_from_table)
 
         self.loader = VideoLoader()
+        self.prefetcher = FramePrefetcher(self)
+        self.prefetcher.frame_ready.connect(self.loader.store_prefetched)
+        self.filmstrip.frame_index_ready.connect(self.loader.set_frame_index)
+        self.prefetcher.start()
         self.project = None
-        self.load_project_list()
+        # Projekt-Revision, zu der die Markierungen der Filmleiste passen
+        self._marks_revision: int | None = None
+        # Erst nach dem ersten Zeichnen des Fensters
+        QTimer.singleShot(0, self.load_project_list)
+
+        # Autosave: Journal regelmäßig im Hintergrund in die Projektdatei übernehmen
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(self.autosave_project)
+        self.autosave_timer.start()
+
+        # Leistungsanzeige regelmäßig aus den Messwerten aktualisieren (nur wenn sichtbar)
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(PROFILE_HUD_INTERVAL_MS)
+        self.hud_timer.timeout.connect(self.canvas.refresh_hud)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -152,21 +296,137 @@ class MainWindow(QMainWindow):
         for i, btn in enumerate(self.overlay_buttons):
             btn.move(start_x + i * (btn_size + spacing), y)
 
+    def closeEvent(self, event):
+        self.stop_propagation()
+        self.catalog_timer.stop()
+        if self.catalog_sync:
+            self.catalog_sync.requestInterruption()
+            self.catalog_sync.wait()
+        for worker in (self.export_worker, self.extract_worker):
+            if worker:
+                worker.requestInterruption()
+                worker.wait()
+        self.prefetcher.stop()
+        self.filmstrip.stop()
+        # Kein neuer Autosave mehr; close() wartet auf einen laufenden und schließt das Journal
+        self.autosave_timer.stop()
+        if self.project:
+            self.project.close()
+        super().closeEvent(event)
+
+    def schedule_prefetch(self, index: int, direction: int = 1):
+        """Plant das Vorab-Dekodieren der Nachbar-Frames in Bewegungsrichtung."""
+        if not self.loader.video_path:
+            return
+        level = self.canvas.required_level()
+        plan = self.loader.prefetch_plan(index, direction, PREFETCH_AHEAD, PREFETCH_BEHIND, level)
+        self.prefetcher.request(str(self.loader.video_path), plan, self.loader.frame_index, level)
+
+    def reload_frame_level(self, level: int):
+        """Lädt den aktuellen Frame in einer feineren Proxy-Stufe nach (nach dem Hineinzoomen)."""
+        if not self.project:
+            return
+        idx = self.project.current_frame
+        image = self.loader.get_frame(idx, level)
+        if image:
+            self.canvas.set_image(image, level, self.loader.frame_size())
+            self.schedule_prefetch(idx)
+
     def load_project_list(self):
-        self.project_table.setRowCount(0)
-        entries = []
-        for fn in PROJECT_FOLDER.iterdir():
-            if fn.is_file() and fn.name.endswith('_boxes.json'):
-                entries.append((fn.stat().st_mtime, fn.name))
-        entries.sort(key=lambda x: x[0], reverse=True)
-        for mtime, name in entries:
-            row = self.project_table.rowCount()
-            self.project_table.insertRow(row)
-            item_name = QTableWidgetItem(name)
-            dt = QtCore.QDateTime.fromSecsSinceEpoch(int(mtime))
-            item_date = QTableWidgetItem(dt.toString('yyyy-MM-dd HH:mm:ss'))
-            self.project_table.setItem(row, 0, item_name)
-            self.project_table.setItem(row, 1, item_date)
+        """Zeigt die Projekte aus dem Katalog (ohne Projektdateien zu lesen) und gleicht ihn dann ab."""
+        self.sync_catalog(cached=True)
+
+    def sync_catalog(self, force: bool = False, cached: bool = False):
+        """Liest geänderte Projektdateien im Hintergrund neu ein; Zeilen kommen portionsweise."""
+        if not force and self.stack.currentWidget() is not self.start_screen:
+            # Im Editor ändern Journal und Autosave den Ordner laufend; abgeglichen wird beim Speichern
+            return
+        if self.catalog_sync:
+            # Laufenden Abgleich nicht abbrechen: seine Zeilen stehen schon im Katalog,
+            # ein neuer Durchlauf würde sie nicht mehr melden. Danach genau einmal nachholen.
+            self._catalog_pending = True
+            return
+        self._catalog_pending = False
+        self.catalog_sync = CatalogSync(CATALOG_PATH, PROJECT_FOLDER, cached, self)
+        self.catalog_sync.changed.connect(self.update_project_rows)
+        self.catalog_sync.finished.connect(self.on_catalog_synced)
+        self.catalog_sync.start(QThread.LowPriority)
+
+    def on_catalog_synced(self):
+        worker = self.sender()
+        if worker is not self.catalog_sync:
+            return
+        self.catalog_sync = None
+        worker.deleteLater()
+        if self._catalog_pending:
+            self.sync_catalog(force=True)
+
+    def update_project_rows(self, rows: list[dict], removed: list[str]):
+        table = self.project_table
+        # Sortierung während des Einfügens aus, sonst verschieben sich die Zeilen
+        table.setSortingEnabled(False)
+        for name in removed:
+            item = self.project_rows.pop(name, None)
+            if item:
+                table.removeRow(item.row())
+        pattern = self.project_filter.text().strip().lower()
+        for entry in rows:
+            item = self.project_rows.get(entry["name"])
+            if item:
+                row = item.row()
+            else:
+                row = table.rowCount()
+                table.insertRow(row)
+            items = self._project_items(entry)
+            for col, cell in enumerate(items):
+                table.setItem(row, col, cell)
+            self.project_rows[entry["name"]] = items[0]
+            table.setRowHidden(row, not self._row_matches(row, pattern))
+        table.setSortingEnabled(True)
+
+    @staticmethod
+    def _project_items(entry: dict) -> list[QTableWidgetItem]:
+        """Zellen einer Katalogzeile; fehlende Werte (z. B. ohne Keyframe-Index) bleiben leer."""
+        def number(value) -> SortItem:
+            cell = SortItem("" if value is None else str(value), -1 if value is None else value)
+            cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            return cell
+
+        labels = json.loads(entry["labels"]) if entry["labels"] else {}
+        classes = ", ".join(
+            f"{LABEL_CLASSES.get(label, {}).get('display_name', label)}: {n}" for label, n in labels.items()
+        )
+        date = QtCore.QDateTime.fromSecsSinceEpoch(int(entry["mtime"])).toString('yyyy-MM-dd HH:mm:ss')
+        items = [
+            QTableWidgetItem(entry["name"]),
+            QTableWidgetItem(Path(entry["video"]).name if entry["video"] else ""),
+            number(entry["frame_count"]),
+            number(entry["labeled_frames"]),
+            number(entry["boxes"]),
+            QTableWidgetItem(classes),
+            number(entry["last_frame"]),
+            SortItem(date, entry["mtime"]),
+        ]
+        items[1].setToolTip(entry["video"] or "")
+        if entry["error"]:
+            items[0].setToolTip(f"Nicht lesbar: {entry['error']}")
+            items[0].setForeground(Qt.red)
+        return items
+
+    def _row_matches(self, row: int, pattern: str) -> bool:
+        if not pattern:
+            return True
+        for col in range(self.project_table.columnCount()):
+            item = self.project_table.item(row, col)
+            if item and pattern in item.text().lower():
+                return True
+        return False
+
+    def filter_project_rows(self, text: str):
+        """Blendet Projekte ohne Treffer in einer der Spalten aus (Groß-/Kleinschreibung egal)."""
+        pattern = text.strip().lower()
+        for row in range(self.project_table.rowCount()):
+            self.project_table.setRowHidden(row, not self._row_matches(row, pattern))
 
     def open_project_from_table(self, row, col):
         item = self.project_table.item(row, 0)
@@ -174,33 +434,54 @@ class MainWindow(QMainWindow):
             return
         path = PROJECT_FOLDER / item.text()
         if path.exists():
-            self.project = ProjectManager.load_project(path)
+            self.set_project(ProjectManager.load_project(path))
             self.loader.open(self.project.video_path)
             self.after_project_loaded()
 
     def start_new_project(self):
         if self.loader.select_video():
-            self.project = ProjectManager(Path(self.loader.video_path))
+            video_path = Path(self.loader.video_path)
+            try:
+                project = ProjectManager.new_project(video_path, PROJECT_FOLDER / f"{video_path.stem}_boxes.json")
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(self, "Fehler", f"Projekt konnte nicht angelegt werden:\n{e}")
+                return
+            self.set_project(project)
             self.after_project_loaded(new=True)
 
     def open_existing_project(self):
         proj_path, _ = QFileDialog.getOpenFileName(
-            self, "Projekt öffnen", str(PROJECT_FOLDER), "JSON Dateien (*.json)"
+            self, "Projekt öffnen", str(PROJECT_FOLDER), f"Projektdateien (*.json *{BBXP_SUFFIX})"
         )
         if proj_path:
-            self.project = ProjectManager.load_project(Path(proj_path))
+            self.set_project(ProjectManager.load_project(Path(proj_path)))
             self.loader.open(self.project.video_path)
             self.after_project_loaded()
 
+    def set_project(self, project: ProjectManager):
+        """Wechselt das Projekt; das bisherige schließt sein Journal."""
+        self.stop_propagation()
+        if self.project:
+            self.project.close()
+        self.project = project
+
     def after_project_loaded(self, new=False):
         name = Path(self.project.video_path).name
         self.setWindowTitle(f"Video Labeling Tool - {name}")
         self.save_action.setEnabled(True)
+        self.save_binary_action.setEnabled(True)
+        for act in self.export_actions:
+            act.setEnabled(self.export_worker is None)
+        self.extract_action.setEnabled(self.extract_worker is None)
+        self._update_propagation_actions()
         self.on_label_selected(self.project.current_label or self.current_label)
         idx = self.project.current_frame
-        pixmap = self.loader.get_frame(idx)
-        if pixmap:
-            self.canvas.set_pixmap(pixmap)
+        if not new:
+            self.canvas.scale_factor = self.project.scale_factor
+        level = 0 if new else self.canvas.required_level()
+        image = self.loader.get_frame(idx, level)
+        if image:
+            self.canvas.set_image(image, level, self.loader.frame_size())
             self.canvas.show()
             if new:
                 self.canvas.fit_to_window()
@@ -210,9 +491,16 @@ class MainWindow(QMainWindow):
             else:
                 self.canvas.scale_factor = self.project.scale_factor
                 self.canvas.offset_x = self.project.offset_x
-                self.project.offset_y = self.project.offset_y
+                self.canvas.offset_y = self.project.offset_y
                 self.canvas.update()
             self.update_status(0, 0, None, None, self.canvas.scale_factor)
+            self.schedule_prefetch(idx)
+        self.filmstrip.load_video(
+            self.project.video_path, self.loader.frame_count(), self.loader.missing_index_path()
+        )
+        self.filmstrip.set_current_frame(idx)
+        self._marks_revision = None
+        self.update_marks()
         for btn in self.overlay_buttons:
             btn.show()
         self.stack.setCurrentWidget(self.editor_screen)
@@ -226,28 +514,296 @@ class MainWindow(QMainWindow):
         self.label_status.setText(f"Label: {disp}")
 
     def update_status(self, wx, wy, ix, iy, zf):
+        """Merkt die Werte vor; angezeigt wird höchstens alle STATUS_UPDATE_INTERVAL_MS der letzte Stand."""
+        self._pending_status = (wx, wy, ix, iy, zf)
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    def _apply_status(self):
+        if self._pending_status is None:
+            return
+        wx, wy, ix, iy, zf = self._pending_status
+        self._pending_status = None
+        # setText nur bei geänderten Texten (jeder Aufruf löst ein Relayout der Statusleiste aus)
         if SHOW_STATUS_WINDOW_COORDS:
-            self.win_coord_label.setText(f"W: {wx},{wy}")
+            self._set_status_text(self.win_coord_label, f"W: {wx},{wy}")
         if SHOW_STATUS_IMAGE_COORDS:
-            self.img_coord_label.setText(
+            self._set_status_text(
+                self.img_coord_label,
                 f"I: {ix if ix is not None else '-'}, {iy if iy is not None else '-'}"
             )
         if SHOW_STATUS_ZOOM:
-            self.zoom_label.setText(f"Z: {zf:.2f}x")
+            self._set_status_text(self.zoom_label, f"Z: {zf:.2f}x")
+
+    @staticmethod
+    def _set_status_text(label: QLabel, text: str):
+        if label.text() != text:
+            label.setText(text)
 
-    def save_project(self):
-        self.project.current_frame = 0
+    def sync_session(self):
+        """Übernimmt Label und Ansicht des Editors in die Projekt-Session."""
         self.project.current_label = self.current_label
         self.project.scale_factor = self.canvas.scale_factor
         self.project.offset_x = self.canvas.offset_x
         self.project.offset_y = self.canvas.offset_y
-        save_path = PROJECT_FOLDER / f"{Path(self.project.video_path).stem}_boxes.json"
+
+    def autosave_project(self):
+        if not self.project:
+            return
+        self.sync_session()
+        if self.project.autosave():
+            self.statusBar().showMessage("💾 Autosave …", 2000)
+
+    def save_project(self, suffix: str | None = None):
+        """Speichert im Format des geöffneten Projekts (JSON oder .bbxp) oder im Format suffix."""
+        self.sync_session()
+        if suffix is None:
+            path = self.project.project_path
+            suffix = path.suffix if path and path.suffix == BBXP_SUFFIX else ".json"
+        save_path = PROJECT_FOLDER / f"{Path(self.project.video_path).stem}_boxes{suffix}"
         try:
             self.project.save_project(save_path)
             self.statusBar().showMessage(f"✅ Projekt gespeichert: {save_path}", 5000)
+            self.sync_catalog(force=True)
         except Exception as e:
             QMessageBox.critical(self, "Fehler", f"Speichern fehlgeschlagen:\n{e}")
 
+    def start_propagation(self):
+        """
+        Verfolgt die Boxen des aktuellen Frames (oder nur die ausgewählte) über
+        die nächsten PROPAGATION_FRAMES Frames im Hintergrund. Die Ergebnisse
+        erscheinen als Vorschläge, bis sie übernommen oder verworfen werden.
+        """
+        if not self.project or self.propagator:
+            return
+        idx = self.project.current_frame
+        selected = self.canvas.selected_box
+        boxes = self.project.begin_proposals(idx, [selected] if selected is not None else None)
+        count = min(PROPAGATION_FRAMES, self.loader.frame_count() - 1 - idx)
+        if not boxes or count <= 0:
+            self.statusBar().showMessage("🚫 Keine Boxen oder Frames zum Verfolgen", 3000)
+            return
+        self.propagator = Propagator(
+            self.loader.video_path, self.loader.frame_index, idx, boxes, count,
+            self.propagation_method, PROPAGATION_WORKERS, PROPAGATION_MAX_WIDTH, self
+        )
+        self.propagator.proposals_ready.connect(self.on_proposals)
+        self.propagator.progress.connect(self.on_propagation_progress)
+        self.propagator.finished.connect(self.on_propagation_finished)
+        self.propagation_progress.setRange(0, count)
+        self.propagation_progress.setValue(0)
+        self.propagation_progress.show()
+        self.propagator.start()
+        self._update_propagation_actions()
+        self.canvas.update()
+
+    def on_proposals(self, idx: int, boxes: list):
+        if self.sender() is not self.propagator:
+            return
+        self.project.add_proposals(idx, boxes)
+        if idx == self.project.current_frame:
+            self.canvas.update()
+
+    def on_propagation_progress(self, done: int, total: int):
+        if self.sender() is self.propagator:
+            self.propagation_progress.setValue(done)
+
+    def on_propagation_finished(self):
+        worker = self.sender()
+        if worker is not self.propagator:
+            return
+        self._release_propagator()
+        if worker.error:
+            QMessageBox.warning(self, "Propagation", worker.error)
+        else:
+            self.statusBar().showMessage(
+                f"Vorschläge für {len(self.project.proposals)} Frames – übernehmen mit Strg+Enter", 5000
+            )
+
+    def stop_propagation(self):
+        """Bricht eine laufende Propagation ab; bereits gelieferte Vorschläge bleiben erhalten."""
+        worker = self.propagator
+        if not worker:
+            return
+        worker.requestInterruption()
+        worker.wait()
+        self._release_propagator()
+
+    def _release_propagator(self):
+        self.propagator.deleteLater()
+        self.propagator = None
+        self.propagation_progress.hide()
+        self._update_propagation_actions()
+
+    def _fill_method_menu(self):
+        """Baut die Auswahl der in dieser OpenCV-Version verfügbaren Verfahren (einmalig)."""
+        if self.method_menu.actions():
+            return
+        method_group = QActionGroup(self)
+        methods = available_methods()
+        if self.propagation_method not in methods:
+            self.propagation_method = methods[0]
+        for method in methods:
+            act = QAction(METHODS[method], self)
+            act.setCheckable(True)
+            act.setChecked(method == self.propagation_method)
+            act.triggered.connect(lambda checked, m=method: setattr(self, 'propagation_method', m))
+            method_group.addAction(act)
+            self.method_menu.addAction(act)
+
+    def _update_propagation_actions(self):
+        running = self.propagator is not None
+        self.propagate_action.setEnabled(self.project is not None and not running)
+        self.cancel_propagation_action.setEnabled(running)
+        self.accept_proposals_action.setEnabled(self.project is not None)
+        self.discard_proposals_action.setEnabled(self.project is not None)
+
+    def accept_proposals(self):
+        self.stop_propagation()
+        count = self.project.accept_proposals(PROPAGATION_KEYFRAME_TOLERANCE_PX)
+        self.update_marks()
+        self.canvas.update()
+        self.statusBar().showMessage(f"✅ {count} Keyframes übernommen", 3000)
+
+    def discard_proposals(self):
+        self.stop_propagation()
+        self.project.discard_proposals()
+        self.canvas.update()
+
+    def set_profiling(self, enabled: bool):
+        profiler.enabled = enabled
+        if not enabled:
+            self.hud_action.setChecked(False)
+
+    def set_hud_visible(self, visible: bool):
+        """Blendet die Leistungsanzeige ein (schaltet dafür die Zeitmessung an) oder aus."""
+        if visible:
+            self.profile_action.setChecked(True)
+            self.hud_timer.start()
+        else:
+            self.hud_timer.stop()
+        self.canvas.set_hud_visible(visible)
+
+    def reset_profiling(self):
+        profiler.reset()
+        self.canvas.refresh_hud()
+
+    def export_trace(self):
+        """Schreibt die gepufferten Messungen als Chrome-Trace (chrome://tracing, Perfetto)."""
+        if not profiler.stats():
+            self.statusBar().showMessage("🚫 Keine Messungen – Zeitmessung im Menü Diagnose einschalten", 5000)
+            return
+        stamp = QtCore.QDateTime.currentDateTime().toString("yyyyMMdd_HHmmss")
+        target, _ = QFileDialog.getSaveFileName(
+            self, "Trace exportieren", str(EXPORT_FOLDER / f"trace_{stamp}.json"), "Chrome-Trace (*.json)"
+        )
+        if not target:
+            return
+        try:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            count = profiler.write_chrome_trace(Path(target))
+        except OSError as e:
+            QMessageBox.critical(self, "Fehler", f"Trace-Export fehlgeschlagen:\n{e}")
+            return
+        self.statusBar().showMessage(f"✅ {count} Messungen exportiert: {target}", 5000)
+
+    def export_annotations(self, fmt: str):
+        """Exportiert alle Boxen im Hintergrund (YOLO in einen Ordner, COCO/MOT in eine Datei)."""
+        if not self.project or self.export_worker:
+            return
+        title, _, suffix = FORMATS[fmt]
+        name = Path(self.project.video_path).stem
+        if suffix is None:
+            target = QFileDialog.getExistingDirectory(
+                self, f"Export {title}: Zielordner", str(EXPORT_FOLDER / f"{name}_{fmt}")
+            )
+        else:
+            target, _ = QFileDialog.getSaveFileName(
+                self, f"Export {title}", str(EXPORT_FOLDER / f"{name}_{fmt}{suffix}"), f"{title} (*{suffix})"
+            )
+        if not target:
+            return
+        frame_count = self.loader.frame_count()
+        self.export_worker = ExportWorker(
+            self.project, fmt, Path(target), self.loader.frame_size(), frame_count, self
+        )
+        self.export_worker.progress.connect(
+            lambda frame: self.statusBar().showMessage(f"Export {title}: Frame {frame}/{frame_count}")
+        )
+        self.export_worker.finished.connect(self.on_export_finished)
+        for act in self.export_actions:
+            act.setEnabled(False)
+        self.export_worker.start(QThread.LowPriority)
+
+    def on_export_finished(self):
+        worker = self.export_worker
+        self.export_worker = None
+        worker.deleteLater()
+        for act in self.export_actions:
+            act.setEnabled(self.project is not None)
+        if worker.error:
+            QMessageBox.critical(self, "Fehler", f"Export fehlgeschlagen:\n{worker.error}")
+        elif not worker.cancelled:
+            self.statusBar().showMessage(f"✅ {worker.count} Boxen exportiert: {worker.target}", 5000)
+
+    def extract_dataset(self):
+        """Schreibt alle Frames mit Boxen und die Box-Ausschnitte im Hintergrund als Bilddateien."""
+        if not self.project or self.extract_worker:
+            return
+        name = Path(self.project.video_path).stem
+        target = QFileDialog.getExistingDirectory(
+            self, "Datensatz extrahieren: Zielordner", str(DATASET_FOLDER / name)
+        )
+        if not target:
+            return
+        frame_count = self.loader.frame_count()
+        self.extract_worker = ExtractWorker(
+            self.project, Path(target), frame_count, self.loader.frame_index, self,
+            image_format=EXTRACT_IMAGE_FORMAT, quality=EXTRACT_JPEG_QUALITY,
+            workers=EXTRACT_WORKERS, queue_size=EXTRACT_QUEUE_SIZE
+        )
+        self.extract_worker.progress.connect(
+            lambda frame: self.statusBar().showMessage(f"Extraktion: Frame {frame}/{frame_count}")
+        )
+        self.extract_worker.finished.connect(self.on_extract_finished)
+        self.extract_action.setEnabled(False)
+        self.extract_worker.start(QThread.LowPriority)
+
+    def on_extract_finished(self):
+        worker = self.extract_worker
+        self.extract_worker = None
+        worker.deleteLater()
+        self.extract_action.setEnabled(self.project is not None)
+        if worker.error:
+            QMessageBox.critical(self, "Fehler", f"Extraktion fehlgeschlagen:\n{worker.error}")
+        elif not worker.cancelled:
+            self.statusBar().showMessage(f"✅ {worker.report.summary()}", 10000)
+
+    def show_frame(self, idx: int, direction: int = 1) -> bool:
+        """Zeigt Frame idx im Canvas an und plant das Vorab-Dekodieren in Bewegungsrichtung."""
+        self.zoom_state["scale_factor"] = self.canvas.scale_factor
+        self.zoom_state["offset_x"] = self.canvas.offset_x
+        self.zoom_state["offset_y"] = self.canvas.offset_y
+        level = self.canvas.required_level()
+        image = self.loader.get_frame(idx, level)
+        if not image:
+            return False
+        self.canvas.set_image(image, level, self.loader.frame_size())
+        self.canvas.update()
+        self.project.current_frame = idx
+        self.frame_label.setText(f"Frame: {idx}")
+        self.filmstrip.set_current_frame(idx)
+        self.update_marks()
+        self.schedule_prefetch(idx, direction)
+        return True
+
+    def update_marks(self):
+        """Übergibt die Frames mit Keyframes an die Filmleiste, wenn sich das Projekt geändert hat."""
+        if self._marks_revision == self.project.revision:
+            return
+        self._marks_revision = self.project.revision
+        self.filmstrip.set_marked_frames(self.project.labeled_frames())
+
     def load_next_frame(self):
         if not self.project or not self.loader:
             return
@@ -256,24 +812,7 @@ class MainWindow(QMainWindow):
         if next_idx >= self.loader.frame_count():
             self.statusBar().showMessage("🚫 Kein weiterer Frame verfügbar", 3000)
             return
-        if next_idx not in self.project.bboxes:
-            prev_boxes = self.project.get_bboxes(curr_idx)
-            self.project.bboxes[next_idx] = [
-                (self.project.get_next_id(label), label, x, y, w, h)
-                for _, label, x, y, w, h in prev_boxes
-            ]
-        self.zoom_state["scale_factor"] = self.canvas.scale_factor
-        self.zoom_state["offset_x"] = self.canvas.offset_x
-        self.zoom_state["offset_y"] = self.canvas.offset_y    
-        pixmap = self.loader.get_frame(next_idx)
-        if pixmap:
-            self.canvas.set_pixmap(pixmap)
-            #self.canvas.scale_factor = self.project.scale_factor
-            #self.canvas.offset_x = self.project.offset_x
-            #self.canvas.offset_y = self.project.offset_y
-            self.canvas.update()
-            self.project.current_frame = next_idx
-            self.frame_label.setText(f"Frame: {next_idx}")
+        self.show_frame(next_idx, 1)
 
     def load_prev_frame(self):
         if not self.project or not self.loader:
@@ -283,18 +822,15 @@ class MainWindow(QMainWindow):
         if prev_idx < 0:
             self.statusBar().showMessage("🚫 Kein vorheriger Frame verfügbar", 3000)
             return
-        self.zoom_state["scale_factor"] = self.canvas.scale_factor
-        self.zoom_state["offset_x"] = self.canvas.offset_x
-        self.zoom_state["offset_y"] = self.canvas.offset_y    
-        pixmap = self.loader.get_frame(prev_idx)
-        if pixmap:
-            self.canvas.set_pixmap(pixmap)
-            #self.canvas.scale_factor = self.project.scale_factor
-            #self.canvas.offset_x = self.project.offset_x
-            #self.canvas.offset_y = self.project.offset_y
-            self.canvas.update()
-            self.project.current_frame = prev_idx
-            self.frame_label.setText(f"Frame: {prev_idx}")
+        self.show_frame(prev_idx, -1)
+
+    def goto_frame(self, idx: int):
+        """Springt direkt zu einem Frame (z.B. per Klick in die Zeitleiste)."""
+        if not self.project or not self.loader:
+            return
+        idx = max(0, min(idx, self.loader.frame_count() - 1))
+        if idx != self.project.current_frame:
+            self.show_frame(idx, 1 if idx > self.project.current_frame else -1)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,103 @@
+# profiling.py
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from config import PROFILE_ENABLED, PROFILE_WINDOW, PROFILE_TRACE_EVENTS
+
+
+class Profiler:
+    """
+    Zeitmessung an festen Messpunkten (z.B. "canvas.paint"): pro Messpunkt
+    ein Ringpuffer der letzten window Dauern für p50/p95/max und zusätzlich
+    die letzten trace_events Einzelereignisse für den Export als Chrome-Trace
+    (chrome://tracing, Perfetto). Ist die Messung aus, kosten die Messpunkte
+    nur die Abfrage von enabled. Qt-frei; record() ist thread-sicher.
+    """
+    def __init__(self, enabled: bool = False, window: int = 512, trace_events: int = 100000):
+        self.enabled = enabled
+        self.window = window
+        # Messpunkt -> (Ringpuffer der Dauern in ms, Anzahl Messungen insgesamt)
+        self._samples: dict[str, tuple[np.ndarray, int]] = {}
+        # (Name, Start in µs, Dauer in µs, Thread-ID)
+        self._events: deque[tuple[str, float, float, int]] = deque(maxlen=trace_events)
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Nimmt eine Messung mit Start und Ende aus time.perf_counter() auf."""
+        duration = (end - start) * 1000
+        with self._lock:
+            buf, count = self._samples.get(name) or (np.zeros(self.window), 0)
+            buf[count % self.window] = duration
+            self._samples[name] = (buf, count + 1)
+            self._events.append(
+                (name, (start - self._origin) * 1e6, duration * 1000, threading.get_ident())
+            )
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """p50/p95/max (ms) über die letzten window Messungen pro Messpunkt, nach Name sortiert."""
+        with self._lock:
+            samples = {name: (buf.copy(), count) for name, (buf, count) in self._samples.items()}
+        result = {}
+        for name in sorted(samples):
+            buf, count = samples[name]
+            recent = buf[:min(count, self.window)]
+            p50, p95 = np.percentile(recent, (50, 95))
+            result[name] = {"count": count, "p50": float(p50), "p95": float(p95), "max": float(recent.max())}
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._events.clear()
+
+    def write_chrome_trace(self, path: Path) -> int:
+        """
+        Schreibt die gepufferten Ereignisse im Chrome-Trace-Format (JSON,
+        vollständige Ereignisse "X"). Gibt die Anzahl Ereignisse zurück.
+        """
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        threads = {tid: i for i, tid in enumerate(dict.fromkeys(e[3] for e in events))}
+        trace = [
+            {"name": name, "cat": name.split(".", 1)[0], "ph": "X",
+             "ts": round(ts, 1), "dur": round(dur, 1), "pid": pid, "tid": threads[tid]}
+            for name, ts, dur, tid in events
+        ]
+        # Thread-Namen; Thread 0 ist der erste, der gemessen hat (meist der GUI-Thread)
+        names = {t.ident: t.name for t in threading.enumerate()}
+        trace += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": i, "args": {"name": names.get(tid, str(tid))}}
+            for tid, i in threads.items()
+        ]
+        tmp = Path(path).with_name(Path(path).name + ".tmp")
+        tmp.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}))
+        os.replace(tmp, path)
+        return len(events)
+
+
+profiler = Profiler(PROFILE_ENABLED, PROFILE_WINDOW, PROFILE_TRACE_EVENTS)
+
+
+def profiled(name: str):
+    """Dekorator: misst jeden Aufruf als Messpunkt name, solange profiler.enabled ist."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter())
+        return wrapper
+    return decorate
@@ -0,0 +1,143 @@
+# project_format.py
+import json
+import os
+import struct
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import numpy as np
+
+from annotation_store import AnnotationStore
+
+# Binäres Projektformat (*.bbxp), little-endian:
+#   Header   magic, Version, reserviert, Länge Metadaten, Anzahl Frames, Anzahl Boxen
+#   Meta     JSON (Session, Zähler, Label-Tabelle), auf 8 Bytes aufgefüllt
+#   Index    ein Eintrag pro Frame: frame, count, start (erste Box)
+#   Boxen    Datensätze fester Breite, nach Frame sortiert
+BBXP_SUFFIX = ".bbxp"
+BBXP_MAGIC = b"BBXP"
+BBXP_VERSION = 1
+_HEADER = struct.Struct("<4sHHIIQ")
+INDEX_DTYPE = np.dtype([("frame", "<i4"), ("count", "<u4"), ("start", "<i8")])
+BOX_DTYPE = np.dtype([
+    ("id", "<i4"), ("x", "<i4"), ("y", "<i4"), ("w", "<i4"), ("h", "<i4"), ("label", "u1")
+])
+
+
+def read_project(
+    path: Path,
+    labels: Iterable[str] = (),
+    overlay_frames: int = 64
+) -> tuple[dict, AnnotationStore]:
+    """Liest eine Projektdatei (JSON oder .bbxp) und gibt (Metadaten, Boxen) zurück."""
+    if Path(path).suffix == BBXP_SUFFIX:
+        return read_bbxp(path, labels, overlay_frames)
+    return read_json(path, labels, overlay_frames)
+
+
+def write_project(path: Path, data: dict) -> None:
+    """Schreibt einen Projekt-Stand (data['bboxes'] ist ein AnnotationStore) im Format der Endung."""
+    if Path(path).suffix == BBXP_SUFFIX:
+        write_bbxp(path, data)
+    else:
+        write_json(path, data)
+
+
+def read_json(path: Path, labels: Iterable[str] = (), overlay_frames: int = 64) -> tuple[dict, AnnotationStore]:
+    data = json.loads(Path(path).read_text())
+    raw = data.pop("bboxes", {})
+    boxes = AnnotationStore.from_frames(
+        (
+            (int(frame_str), (
+                (item.get("id"), item.get("label"), *item.get("rect", [0, 0, 0, 0]))
+                for item in items
+            ))
+            for frame_str, items in raw.items()
+        ),
+        labels, overlay_frames
+    )
+    return data, boxes
+
+
+def write_json(path: Path, data: dict) -> None:
+    bboxes_out = {}
+    for frame, shapes in data["bboxes"].items():
+        bboxes_out[str(frame)] = [
+            {"id": _id, "label": label, "rect": [x, y, w, h]}
+            for _id, label, x, y, w, h in shapes
+        ]
+    data = {**data, "bboxes": bboxes_out}
+    _atomic_write(Path(path), lambda f: f.write(json.dumps(data).encode("utf-8")))
+
+
+def read_bbxp(path: Path, labels: Iterable[str] = (), overlay_frames: int = 64) -> tuple[dict, AnnotationStore]:
+    """
+    Liest nur Header, Metadaten und Frame-Index; die Boxen bleiben in der
+    Datei und werden über memory-mapped Views erst beim Zugriff auf einen
+    Frame gelesen.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        magic, version, _, meta_len, frame_count, box_count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != BBXP_MAGIC:
+            raise ValueError(f"{path} ist keine .bbxp-Datei.")
+        if version != BBXP_VERSION:
+            raise ValueError(f"{path}: nicht unterstützte Version {version}.")
+        meta = json.loads(f.read(meta_len).decode("utf-8"))
+        index_offset = _align(_HEADER.size + meta_len)
+        f.seek(index_offset)
+        index = np.frombuffer(f.read(frame_count * INDEX_DTYPE.itemsize), INDEX_DTYPE)
+    boxes_offset = index_offset + frame_count * INDEX_DTYPE.itemsize
+    if box_count:
+        records = np.memmap(path, BOX_DTYPE, mode="r", offset=boxes_offset, shape=(box_count,))
+    else:
+        records = np.empty(0, BOX_DTYPE)
+    # Label-Tabelle der Datei zuerst, damit die gespeicherten Codes gültig bleiben
+    table = meta.pop("labels", [])
+    store = AnnotationStore.from_columns(
+        index["frame"], index["count"].astype(np.int64),
+        {name: records[name] for name in BOX_DTYPE.names},
+        [*table, *(label for label in labels if label not in table)],
+        overlay_frames
+    )
+    return meta, store
+
+
+def write_bbxp(path: Path, data: dict) -> None:
+    store: AnnotationStore = data["bboxes"]
+    frames, counts = store.index()
+    columns = store.columns()
+    meta = {key: value for key, value in data.items() if key != "bboxes"}
+    meta["labels"] = list(store.labels)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+
+    index = np.empty(len(frames), INDEX_DTYPE)
+    index["frame"] = frames
+    index["count"] = counts
+    index["start"] = np.concatenate([[0], np.cumsum(counts)[:-1]]) if len(counts) else []
+    records = np.empty(int(counts.sum()), BOX_DTYPE)
+    for name in BOX_DTYPE.names:
+        records[name] = columns[name]
+
+    def write(f):
+        f.write(_HEADER.pack(BBXP_MAGIC, BBXP_VERSION, 0, len(meta_bytes), len(index), len(records)))
+        f.write(meta_bytes)
+        f.write(b"\0" * (_align(_HEADER.size + len(meta_bytes)) - _HEADER.size - len(meta_bytes)))
+        f.write(index.tobytes())
+        f.write(records.tobytes())
+    _atomic_write(Path(path), write)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) // 8 * 8
+
+
+def _atomic_write(path: Path, write: Callable) -> None:
+    """Schreibt erst vollständig in eine Temp-Datei und ersetzt dann atomar."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
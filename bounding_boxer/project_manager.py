@@ -1,15 +1,42 @@
 # project_manager.py
 
-import json
+import bisect
+import threading
 from pathlib import Path
 
+import numpy as np
+
+from config import SPATIAL_INDEX_CELL, ANNOTATION_OVERLAY_FRAMES, LABEL_CLASSES
+from annotation_store import AnnotationStore
+from journal import Journal
+from profiling import profiled
+from project_format import BBXP_SUFFIX, read_project, write_project
+from spatial_index import BoxIndex
+from tracks import OPEN_END, TrackIndex, encode_ends, migrate_copy_forward, simplify_keyframes, track_key
+
 class ProjectManager:
     """Verwaltert Session-Daten für Video-Labeling-Projekte, einschließlich Session-Zustand, aktuellen Labels und Labelzählern."""
     def __init__(self, video_path: Path, project_path: Path | None = None):
         self.video_path = video_path
         self.project_path = project_path
-        # frame_index -> list of tuples (id:int, label:str, x:int, y:int, w:int, h:int)
-        self.bboxes: dict[int, list[tuple[int, str, int, int, int, int]]] = {}
+        # Keyframes aller Tracks (id, label, x, y, w, h) spaltenorientiert nach Frame;
+        # ein Track ist eine Box mit fester ID, dazwischen wird interpoliert
+        self.boxes = AnnotationStore(LABEL_CLASSES, ANNOTATION_OVERLAY_FRAMES)
+        # Track-Schlüssel -> erster Frame ohne den Track (sonst läuft er weiter)
+        self.track_ends: dict[int, int] = {}
+        # Bei Bedarf aufgebaut: Track-Index und pro Frame aufgelöste Boxen
+        self._tracks: TrackIndex | None = None
+        self._resolved: dict[int, tuple] = {}
+        self._lists: dict[int, list[tuple[int, str, int, int, int, int]]] = {}
+        # frame_index -> räumlicher Index für Hit-Tests (bei Bedarf aufgebaut)
+        self._spatial: dict[int, BoxIndex] = {}
+        self._legacy = False
+        # Vorschläge: frame_index -> Boxen; nur im Speicher, bis sie übernommen werden
+        self.proposals: dict[int, list[tuple[int, str, int, int, int, int]]] = {}
+        self._proposal_limits: dict[int, int] = {}
+        self._proposal_start: tuple[int, list] | None = None
+        # Wird bei jeder Änderung an Boxen erhöht (z.B. für Zeichen-Caches)
+        self.revision = 0
         # Label-Counter pro Klasse
         self.label_counters: dict[str, int] = {}
         # Session-Zustand
@@ -18,6 +45,26 @@ class ProjectManager:
         self.scale_factor: float = 1.0
         self.offset_x: float = 0.0
         self.offset_y: float = 0.0
+        # Änderungen an Boxen werden sofort ins Journal neben der Projektdatei geschrieben
+        self.journal: Journal | None = Journal(self.journal_path(project_path)) if project_path else None
+        # Letzte Journal-Nummer, deren Stand in der Projektdatei steht
+        self._saved_seq = 0
+        self._replaying = False
+        # Neues Projekt über einer bestehenden Projektdatei: vor der ersten Änderung "new" ins Journal
+        self._fresh = False
+        self._save_thread: threading.Thread | None = None
+        # Projektdatei, in die die Box-Spalten memory-mapped zeigen (.bbxp)
+        self._mapped_path: Path | None = None
+
+    @staticmethod
+    def journal_path(project_path: Path) -> Path:
+        """
+        Journal zur Projektdatei, z.B. video_boxes.json -> video_boxes.journal und
+        video_boxes.bbxp -> video_boxes.bbxp.journal (beide Formate können nebeneinander liegen).
+        """
+        if project_path.suffix == BBXP_SUFFIX:
+            return project_path.with_name(project_path.name + ".journal")
+        return project_path.with_suffix(".journal")
 
     def get_next_id(self, label: str) -> int:
         """Gibt nächste ID für eine Label-Klasse zurück und inkrementiert den Zähler."""
@@ -28,22 +75,52 @@ class ProjectManager:
         return self.label_counters[label]
 
     @classmethod
+    def new_project(cls, video_path: Path, project_path: Path) -> 'ProjectManager':
+        """
+        Legt ein neues Projekt an. Gibt es zu project_path nur ein Journal
+        (Absturz vor dem ersten Speichern), wird es eingespielt. Gibt es eine
+        Projektdatei, wird ihr offenes Journal zuerst in sie übernommen; das
+        neue Projekt schreibt das Journal mit fortlaufender Nummer weiter und
+        beginnt es mit der ersten Änderung durch einen "new"-Eintrag, der den
+        alten Stand beim Einspielen verwirft.
+        """
+        if not project_path.exists():
+            pm = cls(video_path, project_path)
+            if pm.journal.segments():
+                pm._replay()
+            return pm
+        old = cls.load_project(project_path)
+        try:
+            if old.unsaved_changes():
+                old.save_project()
+            seq = old.journal.seq
+        finally:
+            old.close()
+        pm = cls(video_path, project_path)
+        pm.journal.seq = pm._saved_seq = seq
+        pm._fresh = True
+        return pm
+
+    @classmethod
+    @profiled("project.load")
     def load_project(cls, project_path: Path) -> 'ProjectManager':
-        """Lädt bestehendes Projekt aus JSON und stellt Session und Labelzähler wieder her."""
-        data = json.loads(project_path.read_text())
+        """
+        Lädt bestehendes Projekt (JSON oder .bbxp) und stellt Session und Labelzähler
+        wieder her. Bei .bbxp werden Boxen erst beim Zugriff auf einen Frame gelesen.
+        Danach werden die Journal-Einträge eingespielt, die noch nicht in der Datei stehen.
+        Projekte aus dem alten Modell (Boxen pro Frame kopiert) werden in Tracks überführt.
+        """
+        data, boxes = read_project(project_path, LABEL_CLASSES, ANNOTATION_OVERLAY_FRAMES)
         pm = cls(Path(data.get("video", "")), project_path)
         # Labelzähler wiederherstellen
         pm.label_counters = data.get("counters", {})
-        # Bounding-Boxen laden
-        raw = data.get("bboxes", {})
-        for frame_str, items in raw.items():
-            frame = int(frame_str)
-            pm.bboxes[frame] = []
-            for item in items:
-                _id = item.get("id")
-                label = item.get("label")
-                x, y, w, h = item.get("rect", [0, 0, 0, 0])
-                pm.bboxes[frame].append((_id, label, x, y, w, h))
+        # Keyframes und Track-Enden
+        pm.boxes = boxes
+        if project_path.suffix == BBXP_SUFFIX:
+            pm._mapped_path = project_path
+        pm._legacy = "track_ends" not in data
+        for label, _id, end in data.get("track_ends", []):
+            pm.track_ends[track_key(boxes.intern(label), _id)] = end
         # Session-Zustand
         pm.current_frame = data.get("current_frame", 0)
         pm.current_label = data.get("current_label", None)
@@ -51,41 +128,466 @@ class ProjectManager:
         pm.scale_factor = view.get("scale_factor", 1.0)
         pm.offset_x = view.get("offset_x", 0.0)
         pm.offset_y = view.get("offset_y", 0.0)
+        pm._saved_seq = data.get("journal_seq", 0)
+        pm.journal.seq = pm._saved_seq
+        pm._replay()
+        if pm._legacy:
+            pm._migrate()
         return pm
 
+    def _migrate(self) -> None:
+        """Überführt die kopierten Boxen des alten Modells in Tracks (siehe tracks.migrate_copy_forward)."""
+        self.boxes, self.track_ends = migrate_copy_forward(self.boxes)
+        self._mapped_path = None
+        self._legacy = False
+        self._changed()
+
+    def _replay(self) -> None:
+        self._replaying = True
+        try:
+            for entry in self.journal.entries(after=self._saved_seq):
+                op, frame = entry["op"], entry["frame"]
+                if self._legacy and op in ("key", "end"):
+                    # Ab hier wurde bereits im Track-Modell gearbeitet
+                    self._migrate()
+                if op == "new":
+                    # Neues Projekt zum selben Video: bisherigen Stand verwerfen
+                    self.boxes = AnnotationStore(LABEL_CLASSES, ANNOTATION_OVERLAY_FRAMES)
+                    self.track_ends = {}
+                    self.label_counters = {}
+                    self._mapped_path = None
+                    self._legacy = False
+                elif op == "add":
+                    box = tuple(entry["box"])
+                    self.boxes.append(frame, box)
+                    self.label_counters[box[1]] = max(self.label_counters.get(box[1], 0), box[0])
+                elif op == "key":
+                    self._set_keyframe(frame, tuple(entry["box"]))
+                elif op == "end":
+                    self._end_track(frame, track_key(self.boxes.intern(entry["label"]), entry["id"]))
+                elif op == "update":
+                    # Altes Modell: Box an Listenposition im Frame
+                    _id, label = self.boxes.get(frame)[entry["pos"]][:2]
+                    self.boxes.replace(frame, entry["pos"], (_id, label, *entry["rect"]))
+                elif op == "remove":
+                    self.boxes.set(frame, [b for b in self.boxes.get(frame) if b[0] != entry["id"]])
+                elif op == "set":
+                    shapes = [tuple(b) for b in entry["boxes"]]
+                    for _id, label, *_ in shapes:
+                        self.label_counters[label] = max(self.label_counters.get(label, 0), _id)
+                    self.boxes.set(frame, shapes)
+                self._tracks = None
+                self.journal.seq = entry["seq"]
+        finally:
+            self._replaying = False
+        self._changed()
+
+    def _record(self, op: str, **fields) -> None:
+        if self.journal and not self._replaying:
+            if self._fresh:
+                self._fresh = False
+                self.journal.append("new", frame=0)
+            self.journal.append(op, **fields)
+
+    def _changed(self) -> None:
+        """Verwirft alle abgeleiteten Daten nach einer strukturellen Änderung der Tracks."""
+        self._tracks = None
+        self._resolved.clear()
+        self._lists.clear()
+        self._spatial.clear()
+        self.revision += 1
+
+    def _track_index(self) -> TrackIndex:
+        if self._tracks is None:
+            self._tracks = TrackIndex(self.boxes, self.track_ends)
+            # Keyframe-Zeilen der aufgelösten Frames gehören zum alten Index
+            self._resolved.clear()
+        return self._tracks
+
+    def _resolve(self, frame_idx: int) -> tuple:
+        resolved = self._resolved.get(frame_idx)
+        if resolved is None:
+            resolved = self._track_index().resolve(frame_idx)
+            self._resolved[frame_idx] = resolved
+            if len(self._resolved) > ANNOTATION_OVERLAY_FRAMES:
+                del self._resolved[next(iter(self._resolved))]
+        return resolved
+
+    def _set_keyframe(self, frame_idx: int, box: tuple[int, str, int, int, int, int]) -> None:
+        """Setzt bzw. ersetzt den Keyframe des Tracks (id, label) im Frame."""
+        for pos, (_id, label, *_) in enumerate(self.boxes.get(frame_idx)):
+            if _id == box[0] and label == box[1]:
+                self.boxes.replace(frame_idx, pos, box)
+                return
+        self.boxes.append(frame_idx, box)
+
+    def _end_track(self, frame_idx: int, key: int) -> None:
+        """Beendet einen Track vor frame_idx; spätere Keyframes werden entfernt."""
+        _id, label = key & 0xFFFFFFFF, self.boxes.labels[key >> 32]
+        index = self._track_index()
+        keyframes = index.keyframes(key)
+        earlier = keyframes[keyframes < frame_idx]
+        self.boxes.discard(keyframes[keyframes >= frame_idx].tolist(), _id, label)
+        if len(earlier):
+            self.track_ends[key] = frame_idx
+        else:
+            self.track_ends.pop(key, None)
+        index.end_track(key, frame_idx)
+        # Zwischen dem letzten verbleibenden Keyframe und frame_idx wird nicht
+        # mehr interpoliert, ab frame_idx fehlt die Box
+        if len(earlier) and len(earlier) < len(keyframes):
+            self._forget(int(earlier[-1]), frame_idx)
+        for frame in [f for f in self._lists if f >= frame_idx]:
+            boxes = self._lists[frame]
+            pos = self._position(boxes, key)
+            if pos < len(boxes) and boxes[pos][:2] == (_id, label):
+                self._lists[frame] = boxes[:pos] + boxes[pos + 1:]
+        for frame, spatial in self._spatial.items():
+            if frame >= frame_idx:
+                spatial.remove(label, _id)
+        self._resolved.clear()
+        self.revision += 1
+
     def add_bbox(self, frame_idx: int, label_rect: tuple[str, int, int, int, int]) -> None:
-        """Fügt eine Bounding-Box mit Label und globaler ID hinzu."""
+        """Legt einen neuen Track mit einem Keyframe in frame_idx an."""
         label, x, y, w, h = label_rect
         _id = self.get_next_id(label)
-        self.bboxes.setdefault(frame_idx, []).append((_id, label, x, y, w, h))
+        self.boxes.append(frame_idx, (_id, label, x, y, w, h))
+        self._record("add", frame=frame_idx, box=[_id, label, x, y, w, h])
+        key = track_key(self.boxes.intern(label), _id)
+        end = self.track_ends.get(key, OPEN_END)
+        index = self._tracks
+        if index is None or not index.add_track(key, frame_idx, (x, y, w, h), end):
+            self._changed()
+            return
+        # Der neue Track erscheint unverändert in allen Frames bis zu seinem Ende
+        box = (_id, label, x, y, w, h)
+        for frame in [f for f in self._spatial if frame_idx <= f < end and f not in self._lists]:
+            del self._spatial[frame]
+        for frame, boxes in list(self._lists.items()):
+            if frame_idx <= frame < end:
+                pos = self._position(boxes, key)
+                self._lists[frame] = boxes[:pos] + [box] + boxes[pos:]
+                spatial = self._spatial.get(frame)
+                if spatial is not None:
+                    spatial.insert(pos, label, _id, (x, y, w, h))
+        # Keyframe-Zeilen haben sich verschoben
+        self._resolved.clear()
+        self.revision += 1
+
+    def update_bbox(
+        self,
+        frame_idx: int,
+        box_idx: int,
+        rect: tuple[int, int, int, int],
+        journal: bool = True
+    ) -> None:
+        """
+        Setzt Position und Größe der Box an Listenposition box_idx; der Frame
+        wird dabei zum Keyframe ihres Tracks. Zwischenschritte (z.B. beim
+        Ziehen) mit journal=False; nur der Endstand muss ins Journal.
+        """
+        ids, codes, geo, rows = self._resolve(frame_idx)
+        index = self._track_index()
+        box = (int(ids[box_idx]), self.boxes.labels[codes[box_idx]], *rect)
+        key = track_key(codes[box_idx], box[0])
+        self._set_keyframe(frame_idx, box)
+        if journal:
+            self._record("key", frame=frame_idx, box=list(box))
+        # Nur die Frames zwischen den benachbarten Keyframes des Tracks ändern
+        # ihre Interpolation; alle anderen behalten ihre Boxen
+        keyframes = index.keyframes(key)
+        earlier = keyframes[keyframes < frame_idx]
+        later = keyframes[keyframes > frame_idx]
+        lo = int(earlier[-1]) if len(earlier) else frame_idx
+        hi = int(later[0]) if len(later) else self.track_ends.get(key, OPEN_END)
+        self._forget(lo, hi, keep=frame_idx)
+        if rows[box_idx] >= 0:
+            # Bestehender Keyframe: Zeilen des Index bleiben gültig
+            index.geo[rows[box_idx]] = rect
+            geo[box_idx] = rect
+            self._resolved[frame_idx] = (ids, codes, geo, rows)
+        else:
+            index.set_keyframe(key, frame_idx, rect)
+            self._resolved.clear()
+        boxes = self._lists.get(frame_idx)
+        if boxes is not None:
+            boxes[box_idx] = box
+        spatial = self._spatial.get(frame_idx)
+        if spatial is not None:
+            spatial.update(box[1], box[0], rect)
+        self.revision += 1
+
+    def remove_bbox(self, frame_idx: int, label: str, box_id: int) -> None:
+        """Beendet den Track der Box (label, box_id) ab diesem Frame."""
+        if label not in self.boxes.labels:
+            return
+        ids, codes, _, _ = self._resolve(frame_idx)
+        code = self.boxes.intern(label)
+        if not np.any((ids == box_id) & (codes == code)):
+            return
+        self._end_track(frame_idx, track_key(code, box_id))
+        self._record("end", frame=frame_idx, label=label, id=box_id)
+
+    def _forget(self, lo: int, hi: int, keep: int | None = None) -> None:
+        """Verwirft die Boxen der Frames echt zwischen lo und hi (außer keep)."""
+        for cache in (self._resolved, self._lists, self._spatial):
+            for frame in [f for f in cache if lo < f < hi and f != keep]:
+                del cache[frame]
+
+    def _position(self, boxes: list[tuple[int, str, int, int, int, int]], key: int) -> int:
+        """Listenposition, an der der Track key in Track-Reihenfolge steht bzw. stünde."""
+        keys = [track_key(self.boxes.intern(label), _id) for _id, label, *_ in boxes]
+        return bisect.bisect_left(keys, key)
+
+    def spatial_index(self, frame_idx: int) -> BoxIndex:
+        """Gibt den räumlichen Index eines Frames zurück (wird beim ersten Zugriff aufgebaut)."""
+        index = self._spatial.get(frame_idx)
+        if index is None:
+            index = BoxIndex.from_boxes(self.get_bboxes(frame_idx), SPATIAL_INDEX_CELL)
+            self._spatial[frame_idx] = index
+            if len(self._spatial) > ANNOTATION_OVERLAY_FRAMES:
+                del self._spatial[next(iter(self._spatial))]
+        return index
 
     def get_bboxes(self, frame_idx: int) -> list[tuple[int, str, int, int, int, int]]:
-        """Gibt Liste von Boxen (id, label, x, y, w, h) für einen Frame zurück."""
-        return self.bboxes.get(frame_idx, [])
+        """
+        Gibt Liste von Boxen (id, label, x, y, w, h) für einen Frame zurück:
+        Keyframes und interpolierte Boxen aller aktiven Tracks.
+        """
+        boxes = self._lists.get(frame_idx)
+        if boxes is None:
+            ids, codes, geo, _ = self._resolve(frame_idx)
+            labels = self.boxes.labels
+            boxes = [
+                (_id, labels[code], x, y, w, h)
+                for _id, code, (x, y, w, h) in zip(ids.tolist(), codes.tolist(), geo.tolist())
+            ]
+            self._lists[frame_idx] = boxes
+            if len(self._lists) > ANNOTATION_OVERLAY_FRAMES:
+                del self._lists[next(iter(self._lists))]
+        return boxes
+
+    def frame_arrays(self, frame_idx: int):
+        """Boxen eines Frames als Arrays (ids, Label-Codes, Geometrie x/y/w/h); Labels über boxes.labels."""
+        ids, codes, geo, _ = self._resolve(frame_idx)
+        return ids, codes, geo
 
+    def labeled_frames(self) -> list[int]:
+        """Gibt die Frames mit mindestens einem Keyframe aufsteigend zurück."""
+        return self.boxes.labeled_frames()
+
+    def iter_frames(self, stop: int):
+        """
+        Iterator über (frame, ids, Label-Codes, Geometrie) aller Frames vor stop
+        mit Boxen, ohne die Frame-Caches zu füllen (z.B. für Exporte). Arbeitet
+        auf einem beim Aufruf gezogenen Stand und darf in einem anderen Thread
+        verbraucht werden; Labels über boxes.labels.
+        """
+        tracks = TrackIndex(self.boxes.snapshot(), dict(self.track_ends))
+        return tracks.iter_frames(stop)
+
+    # --- Vorschläge (z.B. aus der Propagation) ---
+
+    def begin_proposals(
+        self,
+        frame_idx: int,
+        selection: list[tuple[str, int]] | None = None
+    ) -> list[tuple[int, str, int, int, int, int]]:
+        """
+        Verwirft bisherige Vorschläge und gibt die Boxen des Frames zurück, für die
+        ab frame_idx Vorschläge gesammelt werden (alle oder nur die Boxen
+        (Label, ID) aus selection). Vorschläge
+        reichen pro Track höchstens bis zu seinem nächsten Keyframe bzw. Ende.
+        """
+        self.discard_proposals()
+        ids, codes, _, _ = self._resolve(frame_idx)
+        index = self._track_index()
+        boxes = []
+        for pos, box in enumerate(self.get_bboxes(frame_idx)):
+            if selection is not None and (box[1], box[0]) not in selection:
+                continue
+            key = track_key(codes[pos], ids[pos])
+            keyframes = index.keyframes(key)
+            later = keyframes[keyframes > frame_idx]
+            limit = self.track_ends.get(key, OPEN_END)
+            self._proposal_limits[key] = min(limit, int(later[0])) if len(later) else limit
+            boxes.append(box)
+        self._proposal_start = (frame_idx, boxes)
+        return boxes
+
+    def add_proposals(self, frame_idx: int, boxes: list[tuple[int, str, int, int, int, int]]) -> None:
+        """Hinterlegt vorgeschlagene Boxen für einen Frame (nicht im Journal, nicht gespeichert)."""
+        kept = [
+            b for b in boxes
+            if frame_idx < self._proposal_limits.get(track_key(self.boxes.intern(b[1]), b[0]), -1)
+        ]
+        if kept:
+            self.proposals[frame_idx] = kept
+        else:
+            self.proposals.pop(frame_idx, None)
+
+    def get_proposals(self, frame_idx: int) -> list[tuple[int, str, int, int, int, int]]:
+        return self.proposals.get(frame_idx, [])
+
+    def discard_proposals(self) -> None:
+        self.proposals.clear()
+        self._proposal_limits.clear()
+        self._proposal_start = None
+
+    def accept_proposals(self, tolerance: float = 0.0) -> int:
+        """
+        Übernimmt alle Vorschläge als Keyframes ihrer Tracks. Pro Track bleiben
+        nur so viele Keyframes, dass die Interpolation höchstens tolerance Pixel
+        von den Vorschlägen abweicht; der Startframe dient als Anker.
+        Gibt die Anzahl geschriebener Keyframes zurück.
+        """
+        if not self.proposals or self._proposal_start is None:
+            self.discard_proposals()
+            return 0
+        start, start_boxes = self._proposal_start
+        # Track -> [(frame, x, y, w, h)], beginnend mit dem Startframe
+        tracks: dict[tuple[int, str], list] = {(b[0], b[1]): [(start, *b[2:])] for b in start_boxes}
+        for frame in sorted(self.proposals):
+            for _id, label, *rect in self.proposals[frame]:
+                tracks.setdefault((_id, label), []).append((frame, *rect))
+        written = 0
+        for (_id, label), rows in tracks.items():
+            if len(rows) < 2:
+                continue
+            rows = np.array(rows, np.int64)
+            keep = simplify_keyframes(rows[:, 0], rows[:, 1:], tolerance)
+            for frame, x, y, w, h in rows[keep].tolist():
+                if frame == start and self._is_keyframe(frame, _id, label):
+                    continue
+                box = (_id, label, x, y, w, h)
+                self._set_keyframe(frame, box)
+                self._record("key", frame=frame, box=list(box))
+                written += 1
+        self.discard_proposals()
+        self._changed()
+        return written
+
+    def _is_keyframe(self, frame_idx: int, _id: int, label: str) -> bool:
+        return any(b[0] == _id and b[1] == label for b in self.boxes.get(frame_idx))
+
+    @profiled("project.save")
     def save_project(self, project_path: Path | None = None) -> None:
-        """Speichert Projekt als JSON inklusive Session, Labelzähler und Bounding-Boxen."""
-        if project_path:
+        """
+        Speichert Projekt (JSON oder .bbxp, je nach Endung) inklusive Session, Labelzähler und Bounding-Boxen
+        (synchron). Danach ist das Journal leer.
+        """
+        self.wait_for_save()
+        if project_path and project_path != self.project_path:
+            # Neuer Speicherort: Journal zieht mit, das alte wird nach dem Schreiben gelöscht
+            old = self.journal
+            seq = old.seq if old else 0
+            if old:
+                old.close()
             self.project_path = project_path
+            self.journal = Journal(self.journal_path(project_path), seq)
+        else:
+            old = None
         if not self.project_path:
             raise ValueError("Kein Projektpfad gesetzt.")
-        bboxes_out = {}
-        for frame, shapes in self.bboxes.items():
-            items = []
-            for _id, label, x, y, w, h in shapes:
-                items.append({"id": _id, "label": label, "rect": [x, y, w, h]})
-            bboxes_out[str(frame)] = items
+        data, seq = self._snapshot()
+        self.journal.seal()
+        self._write_snapshot(self.project_path, data)
+        self._saved_seq = seq
+        for journal in (old, self.journal):
+            if journal:
+                self._drop_segments(journal, seq)
+
+    def autosave(self) -> bool:
+        """
+        Kompaktiert das Journal im Hintergrund in die Projektdatei. Geschrieben
+        wird ein unveränderlicher Stand; Änderungen währenddessen landen in
+        einem neuen Journal-Segment. Gibt False zurück, wenn nichts zu tun ist
+        oder noch ein Lauf aktiv ist.
+        """
+        if not self.journal or self.journal.seq == self._saved_seq:
+            return False
+        if self._save_thread and self._save_thread.is_alive():
+            return False
+        data, seq = self._snapshot()
+        self.journal.seal()
+        self._save_thread = threading.Thread(
+            target=self._autosave_worker, args=(self.project_path, data, seq), daemon=True
+        )
+        self._save_thread.start()
+        return True
+
+    @profiled("project.autosave")
+    def _autosave_worker(self, project_path: Path, data: dict, seq: int) -> None:
+        try:
+            self._write_snapshot(project_path, data)
+        except (OSError, ValueError) as e:
+            # Versiegelte Segmente bleiben erhalten und werden beim Laden eingespielt
+            print(f"Fehler: Autosave von {project_path} fehlgeschlagen: {e}")
+            return
+        self._saved_seq = seq
+        self._drop_segments(self.journal, seq)
+
+    def unsaved_changes(self) -> int:
+        """Anzahl der Journal-Einträge, die noch nicht in der Projektdatei stehen."""
+        return self.journal.seq - self._saved_seq if self.journal else 0
+
+    def wait_for_save(self) -> None:
+        """Wartet auf einen laufenden Autosave."""
+        if self._save_thread:
+            self._save_thread.join()
+            self._save_thread = None
+
+    def close(self) -> None:
+        """Beendet einen laufenden Autosave und schließt das Journal (es bleibt auf der Platte)."""
+        self.wait_for_save()
+        if self.journal:
+            self.journal.close()
+
+    def _snapshot(self) -> tuple[dict, int]:
+        """Unveränderlicher Stand des Projekts (Boxen werden erst beim Schreiben serialisiert)."""
+        if self._mapped_path is not None and self._mapped_path == self.project_path:
+            # Die gemappte Datei wird gleich ersetzt (unter Windows nur ohne offene Views möglich)
+            self.boxes.detach()
+            self._mapped_path = None
+        seq = self.journal.seq if self.journal else 0
         data = {
             "video": str(self.video_path),
-            "bboxes": bboxes_out,
+            "bboxes": self.boxes.snapshot(),
             "current_frame": self.current_frame,
             "current_label": self.current_label,
-            "counters": self.label_counters,
+            "track_ends": encode_ends(self.track_ends, self.boxes.labels),
+            "counters": dict(self.label_counters),
             "view": {
                 "scale_factor": self.scale_factor,
                 "offset_x": self.offset_x,
                 "offset_y": self.offset_y
-            }
+            },
+            "journal_seq": seq
         }
-        self.project_path.parent.mkdir(parents=True, exist_ok=True)
-        self.project_path.write_text(json.dumps(data, indent=2))
\ No newline at end of file
+        return data, seq
+
+    @staticmethod
+    def _write_snapshot(project_path: Path, data: dict) -> None:
+        write_project(project_path, data)
+
+    @classmethod
+    def convert(cls, source: Path, target: Path) -> None:
+        """
+        Konvertiert eine Projektdatei in das Format der Zielendung (.json <-> .bbxp).
+        Nicht übernommene Journal-Einträge der Quelle fließen ein; das Journal bleibt unverändert.
+        """
+        pm = cls.load_project(source)
+        try:
+            data, _ = pm._snapshot()
+            data["journal_seq"] = 0
+            write_project(target, data)
+        finally:
+            pm.close()
+
+    @staticmethod
+    def _drop_segments(journal: Journal, seq: int) -> None:
+        """Löscht versiegelte Segmente, deren Einträge alle in der Projektdatei stehen."""
+        for path in journal.segments():
+            if path != journal.path and int(path.suffix[1:]) <= seq:
+                path.unlink(missing_ok=True)
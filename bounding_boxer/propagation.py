@@ -0,0 +1,209 @@
+# propagation.py
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from frame_index import FrameIndex
+from frame_reader import FrameReader, make_proxy
+from lazy_import import lazy_import
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+# Verfahren -> Anzeigename; "flow" braucht nur OpenCV selbst, die übrigen je nach Build
+METHODS: dict[str, str] = {
+    "flow": "Optischer Fluss (Median Flow)",
+    "csrt": "CSRT",
+    "kcf": "KCF",
+    "mil": "MIL",
+}
+
+
+def _tracker_factory(method: str):
+    """create-Funktion des OpenCV-Trackers (auch aus cv2.legacy) oder None."""
+    name = f"Tracker{method.upper()}_create"
+    for module in (cv2, getattr(cv2, "legacy", None)):
+        if module is not None and hasattr(module, name):
+            return getattr(module, name)
+    return None
+
+
+def available_methods() -> list[str]:
+    """Verfahren, die mit der installierten OpenCV-Version nutzbar sind."""
+    return [m for m in METHODS if m == "flow" or _tracker_factory(m) is not None]
+
+
+class _Frame:
+    """Ein (ggf. verkleinerter) Frame mit den Daten, die die Tracker brauchen."""
+    def __init__(self, image: np.ndarray, flow: bool):
+        self.image = image
+        self.gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if flow else None
+
+
+class FlowTracker:
+    """
+    Median Flow: ein Punktgitter in der Box wird per Lucas-Kanade in den
+    nächsten Frame und zurück verfolgt; Punkte mit großem Vorwärts-Rückwärts-
+    Fehler entfallen. Verschiebung und Skalierung der Box sind die Mediane
+    der übrigen Punkte. Gerechnet wird nur auf einem Ausschnitt um die Box,
+    damit die Arbeit pro Track mit der Boxgröße statt mit dem Frame wächst.
+    """
+    WIN_SIZE = (15, 15)
+    LEVELS = 3
+    GRID = 10
+    MIN_POINTS = 4
+    # Rand um die Box (Pixel), in dem Bewegung gesucht wird
+    MARGIN = 48
+
+    def __init__(self, frame: _Frame, rect: tuple[float, float, float, float]):
+        self.rect = rect
+
+    def update(self, prev: _Frame, frame: _Frame) -> tuple[float, float, float, float] | None:
+        x, y, w, h = self.rect
+        gx, gy = np.meshgrid(
+            np.linspace(x, x + w, self.GRID, dtype=np.float32),
+            np.linspace(y, y + h, self.GRID, dtype=np.float32)
+        )
+        # Ausschnitt um die Box; Punkte in dessen Koordinaten
+        fh, fw = prev.gray.shape
+        margin = self.MARGIN + int(max(w, h)) // 2
+        x0, y0 = max(0, int(x) - margin), max(0, int(y) - margin)
+        x1, y1 = min(fw, int(x + w) + margin + 1), min(fh, int(y + h) + margin + 1)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        before, after = prev.gray[y0:y1, x0:x1], frame.gray[y0:y1, x0:x1]
+        offset = np.array([x0, y0], np.float32)
+        points = (np.stack([gx.ravel(), gy.ravel()], axis=1) - offset).reshape(-1, 1, 2)
+        lk = dict(winSize=self.WIN_SIZE, maxLevel=self.LEVELS)
+        moved, ok, _ = cv2.calcOpticalFlowPyrLK(before, after, points, None, **lk)
+        back, ok_back, _ = cv2.calcOpticalFlowPyrLK(after, before, moved, None, **lk)
+        fb_error = np.linalg.norm((points - back).reshape(-1, 2), axis=1)
+        good = (ok.ravel() == 1) & (ok_back.ravel() == 1)
+        if good.sum() < self.MIN_POINTS:
+            return None
+        good &= fb_error <= np.median(fb_error[good])
+        if good.sum() < self.MIN_POINTS:
+            return None
+        p, q = points.reshape(-1, 2)[good], moved.reshape(-1, 2)[good]
+        dx, dy = np.median(q - p, axis=0)
+        # Skalierung: Abstände zum Schwerpunkt vorher/nachher
+        dp = np.linalg.norm(p - p.mean(axis=0), axis=1)
+        dq = np.linalg.norm(q - q.mean(axis=0), axis=1)
+        valid = dp > 1e-3
+        scale = float(np.median(dq[valid] / dp[valid])) if valid.any() else 1.0
+        cx, cy = x + w / 2 + float(dx), y + h / 2 + float(dy)
+        w, h = w * scale, h * scale
+        if w < 1 or h < 1:
+            return None
+        self.rect = (cx - w / 2, cy - h / 2, w, h)
+        return self.rect
+
+
+class OpenCVTracker:
+    """Einzel-Objekt-Tracker aus OpenCV (CSRT, KCF, MIL)."""
+    def __init__(self, frame: _Frame, rect: tuple[float, float, float, float], method: str):
+        x, y, w, h = (int(round(v)) for v in rect)
+        self._tracker = _tracker_factory(method)()
+        self._tracker.init(frame.image, (x, y, max(1, w), max(1, h)))
+
+    def update(self, prev: _Frame, frame: _Frame) -> tuple[float, float, float, float] | None:
+        ok, rect = self._tracker.update(frame.image)
+        if not ok or rect[2] < 1 or rect[3] < 1:
+            return None
+        return tuple(float(v) for v in rect)
+
+
+class Propagator(QThread):
+    """
+    Verfolgt Boxen ab start_frame über die nächsten count Frames. Ein
+    eigener Decoder liest die Frames sequentiell; die Tracks eines Frames
+    laufen parallel in einem Thread-Pool (OpenCV gibt dabei den GIL frei),
+    während der nächste Frame schon dekodiert wird. Große Videos werden auf
+    max_width verkleinert verfolgt. Ergebnisse kommen pro Frame als
+    Vorschläge per Signal; verlorene Tracks fallen heraus. Abbruch über
+    requestInterruption().
+    """
+    # (Frame-Index, [(id, label, x, y, w, h), ...])
+    proposals_ready = pyqtSignal(int, object)
+    # (erledigte Frames, Frames gesamt)
+    progress = pyqtSignal(int, int)
+
+    def __init__(
+        self,
+        video_path: Path,
+        frame_index: FrameIndex | None,
+        start_frame: int,
+        boxes: list[tuple[int, str, int, int, int, int]],
+        count: int,
+        method: str = "flow",
+        workers: int = 4,
+        max_width: int = 1280,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.video_path = Path(video_path)
+        self.frame_index = frame_index
+        self.start_frame = start_frame
+        self.boxes = list(boxes)
+        self.count = count
+        self.method = method
+        self.workers = workers
+        self.max_width = max_width
+        self.error: str | None = None
+
+    def run(self):
+        if self.method != "flow" and _tracker_factory(self.method) is None:
+            self.error = f"Tracker '{self.method}' ist in dieser OpenCV-Version nicht verfügbar."
+            return
+        cap = cv2.VideoCapture(str(self.video_path))
+        try:
+            if not cap.isOpened():
+                self.error = f"Video {self.video_path} konnte nicht geöffnet werden."
+                return
+            reader = FrameReader(cap, self.frame_index)
+            image = reader.read(self.start_frame)
+            if image is None:
+                self.error = f"Frame {self.start_frame} konnte nicht gelesen werden."
+                return
+            level = 0
+            while image.shape[1] >> level > self.max_width:
+                level += 1
+            with ThreadPoolExecutor(self.workers) as pool:
+                self._track(pool, reader, image, level)
+        finally:
+            cap.release()
+
+    def _track(self, pool: ThreadPoolExecutor, reader: FrameReader, image: np.ndarray, level: int) -> None:
+        flow = self.method == "flow"
+        prev = _Frame(make_proxy(image, level), flow)
+        factor = 2 ** level
+        scaled = [tuple(v / factor for v in box[2:]) for box in self.boxes]
+        if flow:
+            trackers = [FlowTracker(prev, rect) for rect in scaled]
+        else:
+            trackers = list(pool.map(lambda rect: OpenCVTracker(prev, rect, self.method), scaled))
+        active = list(range(len(self.boxes)))
+        next_image = reader.read(self.start_frame + 1) if self.count > 0 else None
+        for step in range(1, self.count + 1):
+            if next_image is None or not active or self.isInterruptionRequested():
+                break
+            frame = _Frame(make_proxy(next_image, level), flow)
+            futures = [pool.submit(trackers[i].update, prev, frame) for i in active]
+            # Nächsten Frame dekodieren, während die Tracker rechnen
+            next_image = reader.read(self.start_frame + step + 1) if step < self.count else None
+            proposals = []
+            still_active = []
+            for i, future in zip(active, futures):
+                rect = future.result()
+                if rect is None:
+                    continue
+                still_active.append(i)
+                _id, label = self.boxes[i][:2]
+                x, y, w, h = (int(round(v * factor)) for v in rect)
+                proposals.append((_id, label, x, y, w, h))
+            active = still_active
+            prev = frame
+            self.proposals_ready.emit(self.start_frame + step, proposals)
+            self.progress.emit(step, self.count)
@@ -0,0 +1,110 @@
+# spatial_index.py
+from collections.abc import Iterable
+
+# Eine Box ist über (Label, ID) eindeutig; IDs werden pro Label vergeben
+BoxKey = tuple[str, int]
+
+
+class BoxIndex:
+    """
+    Räumlicher Index der Boxen eines Frames als uniformes Gitter in
+    Bildkoordinaten. Einträge sind nach (Label, ID) geschlüsselt; zusätzlich
+    wird die Position jeder Box in der Box-Liste des Frames gehalten und
+    beim Einfügen oder Entfernen nachgeführt.
+    """
+    def __init__(self, cell_size: int):
+        self.cell_size = cell_size
+        # (cx, cy) -> Boxen, die die Zelle berühren
+        self._cells: dict[tuple[int, int], set[BoxKey]] = {}
+        # (Label, ID) -> (x, y, w, h)
+        self._rects: dict[BoxKey, tuple[int, int, int, int]] = {}
+        # (Label, ID) -> Position in der Box-Liste
+        self._positions: dict[BoxKey, int] = {}
+
+    @classmethod
+    def from_boxes(
+        cls,
+        boxes: Iterable[tuple[int, str, int, int, int, int]],
+        cell_size: int
+    ) -> 'BoxIndex':
+        index = cls(cell_size)
+        for pos, (bid, label, x, y, w, h) in enumerate(boxes):
+            key = (label, bid)
+            index._positions[key] = pos
+            index._add(key, (x, y, w, h))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def insert(self, pos: int, label: str, bid: int, rect: tuple[int, int, int, int]) -> None:
+        """Fügt eine Box an Listenposition pos ein; spätere Boxen rücken eine Position weiter."""
+        for key, p in self._positions.items():
+            if p >= pos:
+                self._positions[key] = p + 1
+        self._positions[(label, bid)] = pos
+        self._add((label, bid), rect)
+
+    def update(self, label: str, bid: int, rect: tuple[int, int, int, int]) -> None:
+        """Verschiebt/skaliert eine Box; nur geänderte Zellen werden angefasst."""
+        key = (label, bid)
+        old = self._rects.get(key)
+        if old == rect:
+            return
+        old_cells = set(self._cells_of(old)) if old else set()
+        new_cells = set(self._cells_of(rect))
+        self._discard(key, old_cells - new_cells)
+        for cell in new_cells - old_cells:
+            self._cells.setdefault(cell, set()).add(key)
+        self._rects[key] = rect
+
+    def remove(self, label: str, bid: int) -> None:
+        """Entfernt eine Box; spätere Boxen rücken eine Position nach vorn."""
+        key = (label, bid)
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return
+        self._discard(key, self._cells_of(rect))
+        pos = self._positions.pop(key)
+        for other, p in self._positions.items():
+            if p > pos:
+                self._positions[other] = p - 1
+
+    def position_of(self, label: str, bid: int) -> int | None:
+        return self._positions.get((label, bid))
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list[int]:
+        """Positionen aller Boxen, die das Rechteck [x0, x1] x [y0, y1] berühren, aufsteigend."""
+        cs = self.cell_size
+        found: set[BoxKey] = set()
+        for cx in range(int(x0 // cs), int(x1 // cs) + 1):
+            for cy in range(int(y0 // cs), int(y1 // cs) + 1):
+                members = self._cells.get((cx, cy))
+                if members:
+                    found |= members
+        result = []
+        for key in found:
+            x, y, w, h = self._rects[key]
+            if x <= x1 and x + w >= x0 and y <= y1 and y + h >= y0:
+                result.append(self._positions[key])
+        result.sort()
+        return result
+
+    def _add(self, key: BoxKey, rect: tuple[int, int, int, int]) -> None:
+        self._rects[key] = rect
+        for cell in self._cells_of(rect):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def _discard(self, key: BoxKey, cells: Iterable[tuple[int, int]]) -> None:
+        for cell in cells:
+            members = self._cells[cell]
+            members.discard(key)
+            if not members:
+                del self._cells[cell]
+
+    def _cells_of(self, rect: tuple[int, int, int, int]):
+        x, y, w, h = rect
+        cs = self.cell_size
+        for cx in range(x // cs, (x + w) // cs + 1):
+            for cy in range(y // cs, (y + h) // cs + 1):
+                yield (cx, cy)
@@ -0,0 +1,33 @@
+# styles.py
+from PyQt5.QtGui import QPen, QColor
+from PyQt5.QtCore import Qt
+
+import config
+
+# Qt-Objekte zu den Stil-Angaben aus config.py (nur für die GUI)
+_LINE_STYLES = {"solid": Qt.SolidLine, "dash": Qt.DashLine, "dot": Qt.DotLine}
+
+
+def make_pen(spec: tuple[tuple[int, int, int], int, str]) -> QPen:
+    """QPen aus (Farbe RGB, Stärke, Linienstil)."""
+    color, width, style = spec
+    pen = QPen(QColor(*color))
+    pen.setWidth(width)
+    pen.setStyle(_LINE_STYLES[style])
+    return pen
+
+
+def label_color(key: str) -> QColor:
+    """Farbe einer Label-Klasse aus LABEL_CLASSES (Rot für unbekannte Klassen)."""
+    info = config.LABEL_CLASSES.get(key)
+    return QColor(*info["color"]) if info else QColor(Qt.red)
+
+
+STATUS_WINDOW_COORDS_PEN = make_pen(config.STATUS_WINDOW_COORDS_PEN)
+STATUS_IMAGE_COORDS_PEN = make_pen(config.STATUS_IMAGE_COORDS_PEN)
+STATUS_ZOOM_PEN = make_pen(config.STATUS_ZOOM_PEN)
+BOUNDING_BOX_PEN = make_pen(config.BOUNDING_BOX_PEN)
+DRAWING_BOX_PEN = make_pen(config.DRAWING_BOX_PEN)
+PRESELECTED_BOX_PEN = make_pen(config.PRESELECTED_BOX_PEN)
+SELECTED_BOX_PEN = make_pen(config.SELECTED_BOX_PEN)
+PROPOSAL_BOX_PEN = make_pen(config.PROPOSAL_BOX_PEN)
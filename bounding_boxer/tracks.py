@@ -0,0 +1,302 @@
+# tracks.py
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from annotation_store import AnnotationStore
+
+# Kein Ende gesetzt: Track läuft nach dem letzten Keyframe unverändert weiter
+OPEN_END = np.iinfo(np.int32).max
+
+
+def track_key(code: int, _id: int) -> int:
+    """Schlüssel eines Tracks aus Label-Code und ID (IDs sind pro Label vergeben)."""
+    return (int(code) << 32) | int(_id)
+
+
+class TrackIndex:
+    """
+    Keyframes aller Tracks, nach (Track, Frame) sortiert. Ein Track ist eine
+    Box mit fester ID und Label; gespeichert werden nur die Keyframes, die
+    der Nutzer gesetzt hat. Dazwischen wird linear interpoliert, nach dem
+    letzten Keyframe wird die Box bis zum Track-Ende gehalten. Alle Tracks
+    eines Frames werden mit einer Binärsuche pro Track gleichzeitig bestimmt.
+    """
+    def __init__(self, store: AnnotationStore, ends: dict[int, int]):
+        cols = store.columns()
+        keys = (cols["label"].astype(np.int64) << 32) | cols["id"].astype(np.int64)
+        order = np.lexsort((cols["frame"], keys))
+        keys = keys[order]
+        self.frame = cols["frame"][order].astype(np.int64)
+        self.geo = np.stack([cols[c][order] for c in ("x", "y", "w", "h")], axis=1).astype(np.int32)
+        # Pro Track: Schlüssel und Zeilenbereich [starts, stops)
+        if len(keys):
+            self.starts = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1]).astype(np.int64)
+            self.stops = np.append(self.starts[1:], len(keys)).astype(np.int64)
+        else:
+            self.starts = self.stops = np.empty(0, np.int64)
+        self.keys = keys[self.starts]
+        self.ends = np.array([ends.get(k, OPEN_END) for k in self.keys.tolist()], np.int64)
+        # Zusammengesetzter Suchschlüssel (Track-Nummer, Frame), aufsteigend
+        rank = np.repeat(np.arange(len(self.keys), dtype=np.int64), self.stops - self.starts)
+        self._search = (rank << 32) | self.frame
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def resolve(
+        self,
+        frame: int,
+        candidates: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Alle Boxen eines Frames in Track-Reihenfolge: (ids, Label-Codes,
+        Geometrie n x 4, Keyframe-Zeile oder -1 bei interpolierten Boxen).
+        candidates schränkt die Suche auf diese Track-Nummern ein (aufsteigend).
+        """
+        if candidates is None:
+            candidates = np.arange(len(self.keys), dtype=np.int64)
+        query = (candidates << 32) | frame
+        prev = np.searchsorted(self._search, query, side="right") - 1
+        active = (prev >= self.starts[candidates]) & (frame < self.ends[candidates])
+        tracks = candidates[active]
+        prev = prev[active]
+        nxt = prev + 1
+        has_next = nxt < self.stops[tracks]
+        geo = self.geo[prev].astype(np.float64)
+        if has_next.any():
+            i, j = prev[has_next], nxt[has_next]
+            t = (frame - self.frame[i]) / (self.frame[j] - self.frame[i])
+            geo[has_next] += (self.geo[j] - self.geo[i]) * t[:, None]
+        keys = self.keys[tracks]
+        exact = np.where(self.frame[prev] == frame, prev, -1)
+        return (
+            (keys & 0xFFFFFFFF).astype(np.int32), (keys >> 32).astype(np.uint8),
+            np.rint(geo).astype(np.int32), exact
+        )
+
+    def iter_frames(
+        self,
+        stop: int,
+        chunk: int = 256
+    ) -> Iterator[tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        (frame, ids, Label-Codes, Geometrie) für alle Frames vor stop mit
+        mindestens einer Box, aufsteigend. Pro Block von chunk Frames werden
+        vorab nur die Tracks bestimmt, die ihn berühren; der Speicherbedarf
+        hängt nicht von der Anzahl der Frames ab.
+        """
+        first = self.frame[self.starts]
+        start = int(first.min()) if len(first) else stop
+        stop = min(stop, int(self.ends.max()) if len(self.ends) else 0)
+        for block in range(start, stop, chunk):
+            block_end = min(block + chunk, stop)
+            candidates = np.flatnonzero((first < block_end) & (self.ends > block)).astype(np.int64)
+            if not len(candidates):
+                continue
+            for frame in range(block, block_end):
+                ids, codes, geo, _ = self.resolve(frame, candidates)
+                if len(ids):
+                    yield frame, ids, codes, geo
+
+    def frame_counts(self, stop: int) -> np.ndarray:
+        """Anzahl der Frames vor stop, in denen jeder Track eine Box hat (in Track-Reihenfolge)."""
+        first = self.frame[self.starts]
+        return np.maximum(np.minimum(self.ends, stop) - first, 0)
+
+    def covered_frames(self, stop: int) -> int:
+        """Anzahl der Frames vor stop mit mindestens einer Box."""
+        first = self.frame[self.starts]
+        order = np.argsort(first, kind="stable")
+        first, last = first[order], np.minimum(self.ends[order], stop)
+        # Bereits abgedeckt bis zum weitesten Ende der früher beginnenden Tracks
+        reach = np.concatenate([[first[0] if len(first) else 0], np.maximum.accumulate(last)[:-1]])
+        return int(np.maximum(last - np.maximum(first, reach), 0).sum())
+
+    def keyframes(self, key: int) -> np.ndarray:
+        """Frames aller Keyframes eines Tracks, aufsteigend."""
+        t = self._find(key)
+        if t < 0:
+            return np.empty(0, np.int64)
+        return self.frame[self.starts[t]:self.stops[t]]
+
+    def add_track(
+        self,
+        key: int,
+        frame: int,
+        rect: tuple[int, int, int, int],
+        end: int = OPEN_END
+    ) -> bool:
+        """
+        Fügt einen neuen Track mit einem Keyframe ein, ohne den Index neu
+        aufzubauen. Gibt False zurück, wenn der Track schon existiert.
+        """
+        t = int(np.searchsorted(self.keys, key))
+        if t < len(self.keys) and self.keys[t] == key:
+            return False
+        row = int(self.starts[t]) if t < len(self.keys) else len(self.frame)
+        self.frame = np.insert(self.frame, row, frame)
+        self.geo = np.insert(self.geo, row, rect, axis=0)
+        self.starts = np.insert(self.starts, t, row)
+        self.stops = np.insert(self.stops, t, row)
+        self.starts[t + 1:] += 1
+        self.stops[t:] += 1
+        self.keys = np.insert(self.keys, t, key)
+        self.ends = np.insert(self.ends, t, end)
+        # Alle späteren Tracks rücken eine Track-Nummer weiter
+        self._search[row:] += 1 << 32
+        self._search = np.insert(self._search, row, (t << 32) | frame)
+        return True
+
+    def set_keyframe(self, key: int, frame: int, rect: tuple[int, int, int, int]) -> bool:
+        """
+        Setzt bzw. fügt den Keyframe eines bestehenden Tracks ein, ohne den
+        Index neu aufzubauen. Gibt False zurück, wenn es den Track nicht gibt.
+        """
+        t = self._find(key)
+        if t < 0:
+            return False
+        start, stop = int(self.starts[t]), int(self.stops[t])
+        row = start + int(np.searchsorted(self.frame[start:stop], frame))
+        if row < stop and self.frame[row] == frame:
+            self.geo[row] = rect
+            return True
+        self.frame = np.insert(self.frame, row, frame)
+        self.geo = np.insert(self.geo, row, rect, axis=0)
+        self._search = np.insert(self._search, row, (t << 32) | frame)
+        self.stops[t:] += 1
+        self.starts[t + 1:] += 1
+        return True
+
+    def end_track(self, key: int, frame: int) -> None:
+        """
+        Beendet einen Track vor frame: Keyframes ab frame fallen weg, ohne
+        den Index neu aufzubauen. Bleibt kein Keyframe, entfällt der Track.
+        """
+        t = self._find(key)
+        if t < 0:
+            return
+        start, stop = int(self.starts[t]), int(self.stops[t])
+        cut = start + int(np.searchsorted(self.frame[start:stop], frame))
+        removed = stop - cut
+        self.frame = np.delete(self.frame, slice(cut, stop))
+        self.geo = np.delete(self.geo, slice(cut, stop), axis=0)
+        self._search = np.delete(self._search, slice(cut, stop))
+        self.starts[t + 1:] -= removed
+        self.stops[t + 1:] -= removed
+        if cut > start:
+            self.stops[t] = cut
+            self.ends[t] = frame
+            return
+        self.starts, self.stops = np.delete(self.starts, t), np.delete(self.stops, t)
+        self.keys, self.ends = np.delete(self.keys, t), np.delete(self.ends, t)
+        self._search[cut:] -= 1 << 32
+
+    def _find(self, key: int) -> int:
+        """Track-Nummer zum Schlüssel oder -1."""
+        t = int(np.searchsorted(self.keys, key))
+        return t if t < len(self.keys) and self.keys[t] == key else -1
+
+
+def migrate_copy_forward(
+    store: AnnotationStore,
+    min_iou: float = 0.3
+) -> tuple[AnnotationStore, dict[int, int]]:
+    """
+    Überführt ein Projekt aus dem alten Modell (jede Box in jedem Frame
+    kopiert, mit neuer ID pro Kopie) in Tracks. Boxen aufeinanderfolgender
+    Frames mit gleichem Label werden gierig nach größter Überlappung (IoU)
+    verkettet; ein Track übernimmt die ID seiner ersten Box. Als Keyframes
+    bleiben nur Frames, an denen sich die Bewegung ändert, sodass die
+    Interpolation die alten Boxen exakt wiedergibt. Tracks enden nach ihrem
+    letzten Frame, außer im letzten gespeicherten Frame (dort wurde bisher
+    beim Weiterblättern kopiert).
+    """
+    frames = store.frames()
+    # Track -> Liste (frame, x, y, w, h); Track-Schlüssel vom ersten Auftreten
+    chains: list[list[tuple[int, int, int, int, int]]] = []
+    chain_keys: list[int] = []
+    prev_frame, prev_boxes, prev_chain = None, [], []
+    for frame in frames:
+        ids, codes, geo = store.frame_arrays(frame)
+        chain_of = [-1] * len(ids)
+        if prev_frame == frame - 1 and len(ids) and len(prev_boxes[0]):
+            p_codes, p_geo = prev_boxes
+            iou = _iou(p_geo, geo)
+            iou[p_codes[:, None] != codes[None, :]] = 0.0
+            # Gierig: jeweils das beste verbleibende Paar
+            for flat in np.argsort(-iou, axis=None):
+                a, b = divmod(int(flat), len(ids))
+                if iou[a, b] < min_iou:
+                    break
+                if prev_chain[a] >= 0 and chain_of[b] < 0 and prev_chain[a] not in chain_of:
+                    chain_of[b] = prev_chain[a]
+        for b in range(len(ids)):
+            if chain_of[b] < 0:
+                chain_of[b] = len(chains)
+                chains.append([])
+                chain_keys.append(track_key(codes[b], ids[b]))
+            chains[chain_of[b]].append((frame, *geo[b].tolist()))
+        prev_frame, prev_boxes, prev_chain = frame, (codes, geo), chain_of
+
+    last_frame = frames[-1] if frames else -1
+    keyframes: dict[int, list] = {}
+    ends: dict[int, int] = {}
+    labels = store.labels
+    for key, chain in zip(chain_keys, chains):
+        rows = np.array(chain, np.int64)
+        velocity = np.diff(rows[:, 1:], axis=0)
+        keep = np.ones(len(rows), bool)
+        if len(rows) > 2:
+            keep[1:-1] = np.any(velocity[1:] != velocity[:-1], axis=1)
+        for frame, x, y, w, h in rows[keep].tolist():
+            keyframes.setdefault(frame, []).append((key & 0xFFFFFFFF, labels[key >> 32], x, y, w, h))
+        if chain[-1][0] != last_frame:
+            ends[key] = chain[-1][0] + 1
+    migrated = AnnotationStore.from_frames(sorted(keyframes.items()), labels, store.overlay_frames)
+    return migrated, ends
+
+
+def simplify_keyframes(frames: np.ndarray, rects: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Wählt aus einer dichten Folge von Boxen (frames aufsteigend, rects n x 4)
+    möglichst wenige Keyframes, sodass die lineare Interpolation dazwischen
+    höchstens tolerance Pixel abweicht. Erster und letzter Frame bleiben
+    immer erhalten. Gibt eine Maske über die Eingabe zurück.
+    """
+    keep = np.zeros(len(frames), bool)
+    if not len(frames):
+        return keep
+    keep[[0, -1]] = True
+    rects = rects.astype(np.float64)
+    start = 0
+    while start < len(frames) - 1:
+        # Segment so weit verlängern, wie die Interpolation die Zwischenframes trifft
+        end = start + 1
+        while end + 1 < len(frames):
+            inner = slice(start + 1, end + 1)
+            t = (frames[inner] - frames[start]) / (frames[end + 1] - frames[start])
+            approx = rects[start] + (rects[end + 1] - rects[start]) * t[:, None]
+            if np.abs(approx - rects[inner]).max() > tolerance:
+                break
+            end += 1
+        keep[end] = True
+        start = end
+    return keep
+
+
+def _iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Paarweise IoU zweier Box-Mengen (x, y, w, h) als len(a) x len(b)-Matrix."""
+    a = a.astype(np.float64)[:, None, :]
+    b = b.astype(np.float64)[None, :, :]
+    ix = np.clip(np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    iy = np.clip(np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = ix * iy
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def encode_ends(ends: dict[int, int], labels: Iterable[str]) -> list[list]:
+    """Track-Enden für die Projektdatei: [[label, id, end], ...]."""
+    labels = list(labels)
+    return [[labels[key >> 32], key & 0xFFFFFFFF, end] for key, end in sorted(ends.items())]
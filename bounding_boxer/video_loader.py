@@ -1,18 +1,65 @@
 # video_loader.py
-import cv2
+import time
+import numpy as np
 from pathlib import Path
 from PyQt5.QtWidgets import QFileDialog
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtGui import QImage
+
+from config import (
+    INPUT_FOLDER, SUPPORTED_FORMATS,
+    FRAME_STORE_FOLDER, FRAME_STORE_ENABLED, FRAME_STORE_MAX_BYTES, FRAME_STORE_SEGMENT_BYTES,
+    FRAME_CACHE_BYTES, FRAME_CACHE_COMPRESSED_BYTES,
+    FRAME_CACHE_CODEC, FRAME_CACHE_JPEG_QUALITY
+)
+from frame_cache import FrameCache
+from frame_index import FrameIndex, cache_name
+from frame_reader import FrameReader, index_path, make_proxy
+from frame_store import FrameStore
+from lazy_import import lazy_import
+from profiling import profiler
+
+# OpenCV erst beim ersten Gebrauch laden (Startzeit)
+cv2 = lazy_import("cv2")
+
+
+def frame_to_qimage(frame: np.ndarray) -> QImage:
+    """
+    Verpackt einen BGR-Frame ohne Kopie und ohne Farbkonvertierung als QImage
+    (Format_BGR888). Das QImage zeigt direkt auf den numpy-Puffer; damit der
+    Speicher nicht vor dem Bild freigegeben wird, hält das Python-Objekt eine
+    Referenz auf das Array. Das QImage darf daher nur als dieses Python-Objekt
+    weitergereicht werden (nicht über Qt-Signale kopieren).
+    """
+    h, w, _ = frame.shape
+    qimg = QImage(frame.data, w, h, frame.strides[0], QImage.Format_BGR888)
+    qimg.ndarray = frame
+    return qimg
 
-from config import INPUT_FOLDER, SUPPORTED_FORMATS
 
 class VideoLoader:
     """
-    Lädt ein Video aus INPUT_FOLDER und liefert Frames als QPixmap.
+    Lädt ein Video aus INPUT_FOLDER und liefert Frames als QImage.
+    Dekodierte Frames werden als BGR-Arrays in einem zweistufigen FrameCache
+    gehalten und ohne Kopie an den Canvas übergeben. Neben der vollen
+    Auflösung (Stufe 0) gibt es verkleinerte Proxy-Stufen; Cache-Schlüssel
+    ist (Frame-Index, Stufe). Optional werden Frames zusätzlich in einem
+    FrameStore auf der Festplatte abgelegt und in späteren Sitzungen als
+    memory-mapped Views geliefert.
     """
     def __init__(self):
         self.cap = None
+        self.reader: FrameReader | None = None
+        self.store: FrameStore | None = None
         self.video_path: Path | None = None
+        self.cache = FrameCache(
+            FRAME_CACHE_BYTES,
+            FRAME_CACHE_COMPRESSED_BYTES,
+            FRAME_CACHE_CODEC,
+            FRAME_CACHE_JPEG_QUALITY
+        )
+        # Zeiten (ms) der Stufen des letzten get_frame-Aufrufs; load umfasst bei
+        # einem Cache-Fehlschlag Dekodieren, Verkleinern und Einlagern
+        self.stage_times: dict[str, float] = {}
 
     def select_video(self) -> bool:
         """Öffnet einen Datei-Dialog und lädt das ausgewählte Video."""
@@ -36,31 +83,140 @@ class VideoLoader:
             print(f"Fehler: Kann Video nicht öffnen: {path}")
             return False
         self.video_path = path
+        self.cache.clear()
+        if self.store:
+            self.store.close()
+            self.store = None
+        if FRAME_STORE_ENABLED:
+            try:
+                self.store = FrameStore(
+                    FRAME_STORE_FOLDER / cache_name(path), path, FRAME_STORE_MAX_BYTES, FRAME_STORE_SEGMENT_BYTES
+                )
+            except OSError as e:
+                print(f"Fehler: Frame-Speicher nicht verfügbar: {e}")
+        # Fehlt der Index, baut ihn der Vorschaubild-Durchlauf der Filmleiste
+        # und übergibt ihn über set_frame_index
+        self.reader = FrameReader(self.cap, FrameIndex.load(index_path(path), path))
         return True
 
+    def set_frame_index(self, path: Path, frame_index: FrameIndex) -> None:
+        """Übernimmt einen im Hintergrund gebauten Index (im GUI-Thread aufrufen)."""
+        if self.video_path == Path(path) and self.reader:
+            self.reader.frame_index = frame_index
+
+    @property
+    def frame_index(self) -> FrameIndex | None:
+        return self.reader.frame_index if self.reader else None
+
+    def missing_index_path(self) -> Path | None:
+        """Pfad für den noch zu bauenden Keyframe-Index; None, wenn er vorliegt."""
+        if not self.reader or self.reader.frame_index is not None:
+            return None
+        return index_path(self.video_path)
+
     def frame_count(self) -> int:
-        """Gibt die Gesamtanzahl der Frames zurück."""
+        """Gibt die Gesamtanzahl der Frames zurück (exakt, sobald der Index vorliegt)."""
         if not self.cap:
             return 0
+        if self.frame_index is not None:
+            return self.frame_index.frame_count
         return int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-    def get_frame(self, index: int) -> QPixmap | None:
-        """Lädt den Frame mit dem gegebenen Index als QPixmap."""
+    def frame_size(self) -> tuple[int, int]:
+        """Gibt Breite und Höhe in voller Auflösung zurück."""
+        if not self.cap:
+            return (0, 0)
+        return (
+            int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        )
+
+    def get_frame(self, index: int, level: int = 0) -> QImage | None:
+        """Lädt den Frame mit dem gegebenen Index in der Proxy-Stufe level als QImage."""
         if not self.cap:
             return None
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
-        success, frame = self.cap.read()
-        if not success:
+        t0 = time.perf_counter()
+        frame = self.cache.get((index, level))
+        if frame is None and self.store:
+            frame = self.store.get(index, level)
+        t1 = time.perf_counter()
+        if frame is None:
+            frame = self._load(index, level)
+            if frame is None:
+                return None
+            self.cache.put((index, level), frame)
+            if self.store:
+                self.store.put(index, level, frame)
+        t2 = time.perf_counter()
+        qimg = frame_to_qimage(frame)
+        t3 = time.perf_counter()
+        self.stage_times = {
+            "cache": (t1 - t0) * 1000,
+            "load": (t2 - t1) * 1000,
+            "convert": (t3 - t2) * 1000,
+        }
+        if profiler.enabled:
+            profiler.record("get_frame", t0, t3)
+            profiler.record("get_frame.cache", t0, t1)
+            profiler.record("get_frame.convert", t2, t3)
+        return qimg
+
+    def store_prefetched(self, path: str, index: int, level: int, frame: np.ndarray) -> None:
+        """Übernimmt einen vom FramePrefetcher dekodierten Frame in den Cache."""
+        if not self.video_path or str(self.video_path) != path:
+            return
+        if (index, level) not in self.cache:
+            self.cache.put((index, level), frame)
+        if self.store:
+            self.store.put(index, level, frame)
+
+    def prefetch_plan(self, index: int, direction: int, ahead: int, behind: int, level: int = 0) -> list[int]:
+        """
+        Liefert die vorab zu dekodierenden Frames um index: zuerst den Block in
+        Bewegungsrichtung, dann den Block dahinter. Innerhalb eines Blocks
+        aufsteigend, damit der Decoder sequentiell lesen kann.
+        """
+        if direction >= 0:
+            blocks = [range(index + 1, index + 1 + ahead), range(index - behind, index)]
+        else:
+            blocks = [range(index - ahead, index), range(index + 1, index + 1 + behind)]
+        count = self.frame_count()
+        return [
+            i for block in blocks for i in block
+            if 0 <= i < count and (i, level) not in self.cache
+            and not (self.store and (i, level) in self.store)
+        ]
+
+    def cache_stats(self) -> dict[str, int]:
+        """Gibt die Zähler des Frame-Caches zurück."""
+        return self.cache.stats()
+
+    def _load(self, index: int, level: int) -> np.ndarray | None:
+        """Erzeugt den Frame in Stufe level, bevorzugt aus vorhandener voller Auflösung."""
+        frame = None
+        if level:
+            if (index, 0) in self.cache:
+                frame = self.cache.get((index, 0))
+            elif self.store:
+                frame = self.store.get(index, 0)
+        if frame is None:
+            start = time.perf_counter()
+            frame = self._decode(index)
+            if profiler.enabled:
+                profiler.record("get_frame.decode", start, time.perf_counter())
+            if frame is None:
+                return None
+        if not (level and profiler.enabled):
+            return make_proxy(frame, level)
+        start = time.perf_counter()
+        proxy = make_proxy(frame, level)
+        profiler.record("get_frame.scale", start, time.perf_counter())
+        return proxy
+
+    def _decode(self, index: int) -> np.ndarray | None:
+        """Dekodiert den Frame mit dem gegebenen Index als BGR-Array."""
+        frame = self.reader.read(index)
+        if frame is None:
             print(f"Fehler: Frame {index} konnte nicht geladen werden.")
             return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame_rgb.shape
-        bytes_per_line = ch * w
-        qimg = QImage(
-            frame_rgb.data,
-            w,
-            h,
-            bytes_per_line,
-            QImage.Format_RGB888
-        )
-        return QPixmap.fromImage(qimg)
\ No newline at end of file
+        return frame
@@ -0,0 +1,126 @@
+# workers.py
+import sqlite3
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from catalog import Catalog
+from exporters import FORMATS
+from extraction import ExtractionReport, extract_dataset
+from frame_index import FrameIndex
+
+
+class JobWorker(QThread):
+    """
+    Hintergrund-Thread der GUI für Export und Extraktion. Die eigentliche
+    Arbeit ist ein Qt-freier Aufruf job(progress=...) aus exporters.py bzw.
+    extraction.py; sein Rückgabewert steht danach in result. Abbruch über
+    requestInterruption(); Fehler stehen danach in error.
+    """
+    # Aktueller Frame, höchstens alle PROGRESS_INTERVAL Sekunden
+    progress = pyqtSignal(int)
+    PROGRESS_INTERVAL = 0.1
+
+    def __init__(self, job: Callable[..., object], target: Path, parent=None):
+        super().__init__(parent)
+        self._job = job
+        self.target = Path(target)
+        self.result = None
+        self.error: str | None = None
+        self.cancelled = False
+        self._last_progress = 0.0
+
+    def run(self):
+        try:
+            self.result = self._job(progress=self._progress)
+        except InterruptedError:
+            self.cancelled = True
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+
+    def _progress(self, frame: int) -> None:
+        if self.isInterruptionRequested():
+            raise InterruptedError
+        now = time.perf_counter()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL:
+            self._last_progress = now
+            self.progress.emit(frame)
+
+
+class ExportWorker(JobWorker):
+    """Export in einem der Formate aus exporters.FORMATS."""
+    def __init__(self, project, fmt: str, target: Path, frame_size: tuple[int, int], frame_count: int, parent=None):
+        _, exporter, _ = FORMATS[fmt]
+        # Stand und Labels im aufrufenden Thread festhalten
+        job = partial(
+            exporter, project.iter_frames(frame_count), list(project.boxes.labels),
+            Path(target), frame_size, Path(project.video_path).stem
+        )
+        super().__init__(job, target, parent)
+        self.fmt = fmt
+        self.frame_size = frame_size
+
+    @property
+    def count(self) -> int:
+        """Anzahl exportierter Boxen."""
+        return self.result or 0
+
+
+class ExtractWorker(JobWorker):
+    """Datensatz-Extraktion (siehe extraction.extract_dataset); options werden durchgereicht."""
+    def __init__(self, project, target: Path, frame_count: int, frame_index: FrameIndex | None, parent=None, **options):
+        video_path = Path(project.video_path)
+        # Stand und Labels im aufrufenden Thread festhalten
+        job = partial(
+            extract_dataset, project.iter_frames(frame_count), list(project.boxes.labels),
+            video_path, frame_index, Path(target), video_path.stem, **options
+        )
+        super().__init__(job, target, parent)
+
+    @property
+    def report(self) -> ExtractionReport | None:
+        return self.result
+
+
+class CatalogSync(QThread):
+    """
+    Gleicht den Projektkatalog im Hintergrund mit dem Projektordner ab und
+    meldet geänderte Einträge portionsweise, damit das Fenster nicht auf die
+    Liste wartet. Nur geänderte Projektdateien werden gelesen; mit cached
+    kommen vorher alle bekannten Einträge aus dem Katalog.
+    """
+    # (geänderte Katalogzeilen, entfernte Dateinamen)
+    changed = pyqtSignal(object, object)
+    BATCH_SIZE = 64
+
+    def __init__(self, db_path: Path, folder: Path, cached: bool = False, parent=None):
+        super().__init__(parent)
+        self.db_path = Path(db_path)
+        self.folder = Path(folder)
+        self.cached = cached
+
+    def run(self):
+        # SQLite-Verbindungen gehören einem Thread: eigene Verbindung für den Abgleich
+        try:
+            catalog = Catalog(self.db_path, self.folder)
+        except sqlite3.Error as e:
+            print(f"Fehler: Projektkatalog {self.db_path} nicht nutzbar: {e}")
+            return
+        try:
+            if self.cached:
+                rows = catalog.rows()
+                for start in range(0, len(rows), self.BATCH_SIZE):
+                    if self.isInterruptionRequested():
+                        return
+                    self.changed.emit(rows[start:start + self.BATCH_SIZE], [])
+            for rows, removed in catalog.sync(self.BATCH_SIZE, self.isInterruptionRequested):
+                self.changed.emit(rows, removed)
+        except OSError as e:
+            print(f"Fehler: Projektordner {self.folder} nicht lesbar: {e}")
+        except sqlite3.Error as e:
+            print(f"Fehler: Projektkatalog {self.db_path} nicht aktualisierbar: {e}")
+        finally:
+            catalog.close()